@@ -1,11 +1,12 @@
 import os, base64, hashlib, secrets
 from urllib.parse import urlencode
 from flask import Flask, redirect, request, session, jsonify
-import requests
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from services.tiktok.client import ApiError, get_client
+
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET", "dev-secret")  # coloque algo forte no .env
 
@@ -16,7 +17,6 @@ SCOPES = os.getenv("TIKTOK_SCOPES",
     "user.info.basic video.upload video.publish research.video.list research.video.detail research.creator.list")
 
 AUTH_URL = "https://www.tiktok.com/v2/auth/authorize/"
-TOKEN_URL = "https://open.tiktokapis.com/v2/oauth/token/"
 
 def gen_verifier():
     # 43–128 chars, URL-safe
@@ -54,23 +54,16 @@ def callback():
     if not (code and verifier):
         return "Missing code or verifier", 400
 
-    data = {
-        "client_key": CLIENT_ID,
-        "grant_type": "authorization_code",
-        "code": code,
-        "redirect_uri": REDIRECT_URI,
-        "code_verifier": verifier,      # 👈 PKCE
-    }
-    # alguns apps aceitam/precisam também do client_secret; se der 401, inclua:
-    if CLIENT_SECRET:
-        data["client_secret"] = CLIENT_SECRET
-
-    resp = requests.post(TOKEN_URL, data=data)
-    tok = resp.json()
-    # salve com segurança; para demo, só exibimos mascarado
+    # troca o code (PKCE; client_secret vai junto se existir) e persiste o token p/ refresh automático
+    client = get_client()
+    try:
+        tok = client.exchange_code(code, verifier, REDIRECT_URI)
+    except ApiError as e:
+        return jsonify({"error": "token_exchange_failed", "desc": str(e)}), 400
     access = tok.get("access_token", "")
-    masked = access[:6] + "..." if access else None
-    return jsonify({"token_response": tok, "access_token_masked": masked})
+    return jsonify({"access_token_masked": access[:6] + "..." if access else None,
+                    "open_id": tok.get("open_id"), "scope": tok.get("scope"),
+                    "expires_in": tok.get("expires_in"), "saved_to": str(client.store.path)})
 
 if __name__ == "__main__":
     app.run(port=5000, debug=True)
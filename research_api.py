@@ -1,11 +1,49 @@
-import os, requests
+"""Pesquisa de vídeos (Research API) p/ "pesquisar produtos quentes": várias palavras-chave x janelas de data.
+
+Uso: python research_api.py beauty "garrafa termica" [--keywords-file kw.txt] [--days 14] [--window-days 7]
+     [--concurrency 8] [--budget 1000] [--out outputs/research]
+Páginas de janelas já encerradas ficam em cache (RESEARCH_CACHE_DIR): rodar de novo só busca o que é novo.
+"""
+import argparse, json, sys
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
-ACCESS_TOKEN = os.getenv("TIKTOK_ACCESS_TOKEN")
-headers = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
-# endpoint e params podem variar; mostre um request real de pesquisa
-url = "https://open.tiktokapis.com/v2/research/video/list/"
-params = {"max_count": 5, "query": "beauty"}
-r = requests.get(url, headers=headers, params=params)
-print(r.status_code, r.json())
 
+from services.tiktok.research import DAILY_BUDGET, crawl, write_results
+
+def _date(s: str) -> date:
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("keywords", nargs="*")
+    ap.add_argument("--keywords-file", help="uma palavra-chave por linha")
+    ap.add_argument("--days", type=int, default=7, help="últimos N dias (se --start não for dado)")
+    ap.add_argument("--start", type=_date)
+    ap.add_argument("--end", type=_date)
+    ap.add_argument("--window-days", type=int, default=7)
+    ap.add_argument("--max-count", type=int, default=100)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--budget", type=int, default=DAILY_BUDGET, help="máximo de requisições nesta execução")
+    ap.add_argument("--out", default="outputs/research")
+    args = ap.parse_args()
+
+    keywords = list(args.keywords)
+    if args.keywords_file:
+        keywords += Path(args.keywords_file).read_text(encoding="utf-8").splitlines()
+    if not keywords:
+        keywords = ["beauty"]
+    end = args.end or date.today()
+    start = args.start or end - timedelta(days=args.days - 1)
+
+    rows, st = crawl(keywords, start, end, args.window_days, concurrency=args.concurrency,
+                     budget=args.budget, max_count=args.max_count)
+    files = write_results(rows, Path(args.out), f"research_{start:%Y%m%d}_{end:%Y%m%d}")
+    print(json.dumps(asdict(st), ensure_ascii=False, indent=2))
+    print("arquivos:", ", ".join(str(f) for f in files))
+    sys.exit(1 if st.errors else 0)
+
+if __name__ == "__main__":
+    main()
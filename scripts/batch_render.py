@@ -0,0 +1,72 @@
+"""Render noturno em lote: SKUs x templates x CTAs com intermediários compartilhados.
+
+Uso:
+  python scripts/batch_render.py --out outputs/batch
+  python scripts/batch_render.py --skus KT-AIRFRY,EL-TRIMPRO --templates beleza.dor_beneficio \
+      --cta-category conversion --vars vars.json --workers 4
+
+`--vars` é um JSON {"*": {...globais}, "SKU": {"DOR_PRINCIPAL": "...", ...}}; o valor do SKU
+também pode ser uma lista de conjuntos (A/B de variáveis).
+`--window 15,34` descarta variantes cuja fala estimada (pace_wpm) fica fora da janela;
+`--window template` usa o duration_target_sec de cada template.
+Sem `--catalog`, usa o catálogo mock (services/catalog/data.py), o mesmo do bot.
+"""
+import argparse, json, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.catalog.data import CATALOG
+from services.video.batch import plan_matrix, render_batch
+from services.video.variants import VariantStats
+from services.video.templates import get_library, MissingVariables
+
+def _catalog(path: str | None):
+    if path:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    return CATALOG
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="outputs/batch")
+    ap.add_argument("--catalog", help="JSON com lista de produtos {sku, name, ...}")
+    ap.add_argument("--skus", help="filtra SKUs (separados por vírgula)")
+    ap.add_argument("--templates", help="ids de template (vírgula); padrão: todos")
+    ap.add_argument("--cta-category", default="conversion")
+    ap.add_argument("--max-ctas", type=int, default=3)
+    ap.add_argument("--vars", help="JSON de variáveis por SKU")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--window", help="lo,hi em segundos ou 'template' (padrão: sem filtro)")
+    ap.add_argument("--allow-missing", action="store_true", help="variável ausente vira texto vazio (senão aborta listando as faltantes)")
+    ap.add_argument("--profile", help="draft | review | publish (padrão: RENDER_PROFILE ou publish)")
+    args = ap.parse_args()
+
+    products = _catalog(args.catalog)
+    if args.skus:
+        wanted = {s.strip().upper() for s in args.skus.split(",")}
+        products = [p for p in products if p["sku"].upper() in wanted]
+    lib = get_library()
+    ctas = list(lib.ctas(args.cta_category))[:args.max_ctas]
+    variables = json.loads(Path(args.vars).read_text(encoding="utf-8")) if args.vars else {}
+    out_root = Path(args.out)
+
+    window = False
+    if args.window:
+        window = None if args.window == "template" else tuple(float(x) for x in args.window.split(","))
+    stats = VariantStats()
+    try:
+        jobs = plan_matrix(products, out_root,
+                           template_ids=args.templates.split(",") if args.templates else None,
+                           ctas=ctas, variables=variables, library=lib, strict=not args.allow_missing,
+                           window=window, stats=stats)
+    except MissingVariables as e:
+        raise SystemExit(f"{e} (preencha em --vars ou use --allow-missing)")
+    print(f"{len(jobs)} jobs ({len(products)} SKUs) de {stats.combinations} combinações — "
+          f"fora da janela: {stats.too_short + stats.too_long} | quase iguais: {stats.duplicates} | "
+          f"sem variáveis: {stats.missing_vars} | com variável vazia: {stats.blank_filled}")
+    m = render_batch(jobs, out_root, workers=args.workers, profile=args.profile)
+    print(f"ok={m['rendered']} erros={m['errors']} duplicados={m['duplicates']} "
+          f"blocos TTS únicos={m['unique_tts_blocks']} total={m['total_wall']}s")
+    print(f"manifest: {out_root / 'manifest.json'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark do assemble_vertical: passo único vs. dois passos (legenda em encode separado).
+
+Gera um clipe de teste com ffmpeg (testsrc + seno), roda os dois modos e mostra
+tempo de parede e CPU (segundos de usuário+sistema dos processos ffmpeg).
+
+Uso: python scripts/bench_assemble.py [--seconds 15] [--runs 2]
+"""
+import argparse, subprocess, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.video.assamble import assemble_vertical, FFMPEG
+from services.video.srt import build_srt
+
+try:
+    import resource
+except ImportError:  # Windows: só tempo de parede
+    resource = None
+
+def _children_cpu() -> float:
+    if resource is None:
+        return float("nan")
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+def make_fixtures(work: Path, seconds: int):
+    broll = work / "broll.mp4"
+    voice = work / "voice.wav"
+    subprocess.run([
+        FFMPEG, "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", str(broll)
+    ], check=True)
+    subprocess.run([
+        FFMPEG, "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+        "-ar", "48000", "-ac", "1", str(voice)
+    ], check=True)
+    text = " ".join(["palavra"] * int(seconds * 170 / 60))
+    srt = build_srt(text, work / "captions.srt", wpm=170)
+    return broll, voice, srt
+
+def run_mode(work: Path, broll: Path, voice: Path, srt: Path, seconds: int, two_pass: bool):
+    cpu0, t0 = _children_cpu(), time.perf_counter()
+    out = assemble_vertical(voice, srt, work / ("two_pass.mp4" if two_pass else "single.mp4"),
+                            broll=broll, duration=seconds, two_pass=two_pass)
+    wall = time.perf_counter() - t0
+    cpu = _children_cpu() - cpu0
+    return wall, cpu, out.stat().st_size
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=int, default=15)
+    ap.add_argument("--runs", type=int, default=2)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        broll, voice, srt = make_fixtures(work, args.seconds)
+        print(f"clipe: {args.seconds}s | runs: {args.runs}")
+        print(f"{'modo':<10} {'wall(s)':>9} {'cpu(s)':>9} {'bytes':>11}")
+        for two_pass in (False, True):
+            res = [run_mode(work, broll, voice, srt, args.seconds, two_pass) for _ in range(args.runs)]
+            wall = min(r[0] for r in res); cpu = min(r[1] for r in res)
+            name = "two_pass" if two_pass else "single"
+            print(f"{name:<10} {wall:>9.2f} {cpu:>9.2f} {res[-1][2]:>11}")
+
+if __name__ == "__main__":
+    main()
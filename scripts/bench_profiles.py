@@ -0,0 +1,38 @@
+"""Benchmark dos perfis de render (draft/review/publish) num clipe sintético.
+
+Mostra fps de encode, tempo de parede, CPU e tamanho do arquivo por perfil.
+
+Uso: python scripts/bench_profiles.py [--seconds 15] [--profiles draft,publish]
+"""
+import argparse, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.video.assamble import assemble_vertical
+from services.video.profiles import PROFILES
+from scripts.bench_assemble import make_fixtures, _children_cpu
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=int, default=15)
+    ap.add_argument("--profiles", default=",".join(PROFILES))
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        broll, voice, srt = make_fixtures(work, args.seconds)
+        print(f"clipe: {args.seconds}s")
+        print(f"{'perfil':<9} {'res':>9} {'preset':>10} {'fps':>7} {'wall(s)':>8} {'cpu(s)':>8} {'MB':>7}")
+        for name in args.profiles.split(","):
+            prof = PROFILES[name.strip()]
+            cpu0, t0 = _children_cpu(), time.perf_counter()
+            out = assemble_vertical(voice, srt, work / f"{prof.name}.mp4", broll=broll,
+                                    duration=args.seconds, profile=prof)
+            wall = time.perf_counter() - t0
+            cpu = _children_cpu() - cpu0
+            fps = args.seconds * prof.fps / wall
+            print(f"{prof.name:<9} {prof.width}x{prof.height:<5} {prof.preset:>10} {fps:>7.1f} "
+                  f"{wall:>8.2f} {cpu:>8.2f} {out.stat().st_size / 1e6:>7.2f}")
+
+if __name__ == "__main__":
+    main()
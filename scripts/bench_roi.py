@@ -0,0 +1,69 @@
+"""Benchmark do ranking de ROI: loop Python (como o rank_products antigo) vs. RoiEngine (NumPy).
+
+Catálogo sintético com 1% de SKUs com override; confere que o top-k é o mesmo nos dois.
+
+Uso: python scripts/bench_roi.py [--sizes 1000,10000,100000,1000000] [--k 10] [--python-max 200000]
+"""
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.catalog.roi import RoiEngine
+
+GLOBAL = dict(vpd=3, avg_views=5000, ctr=0.04, conv=0.02, margin=0.30, days=30)
+
+def make_catalog(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    products = [{"sku": f"SKU-{i:07d}", "name": f"Produto {i}", "stock": rnd.randint(0, 2000),
+                 "price": round(rnd.uniform(10, 500), 2)} for i in range(n)]
+    per_sku = {p["sku"]: {"ctr": round(rnd.uniform(0.01, 0.08), 3), "vpd": rnd.randint(1, 6)}
+               for p in rnd.sample(products, max(1, n // 100))}
+    return products, per_sku
+
+def rank_python(products, per_sku, k):
+    # mesma conta do calc_product_roi + sort do bot
+    scored = []
+    for p in products:
+        cfg = {**GLOBAL, **per_sku.get(p["sku"], {})}
+        clicks = cfg["vpd"] * cfg["avg_views"] * cfg["days"] * cfg["ctr"]
+        predicted = int(round(clicks * cfg["conv"]))
+        cap = min(p["stock"], predicted)
+        gross = cap * p["price"]
+        scored.append({"sku": p["sku"], "stock": p["stock"], "cap_sales": cap, "profit": gross * cfg["margin"]})
+    scored.sort(key=lambda s: (s["profit"], s["cap_sales"], s["stock"]), reverse=True)
+    return scored[:k]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000,1000000")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--python-max", type=int, default=200000, help="acima disso pula o loop Python")
+    args = ap.parse_args()
+
+    print(f"{'SKUs':>9} {'python(ms)':>11} {'build(ms)':>10} {'compute(ms)':>12} {'top-k(ms)':>10} {'speedup':>8}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        products, per_sku = make_catalog(n)
+        py_ms = None
+        if n <= args.python_max:
+            t = time.perf_counter()
+            ref = rank_python(products, per_sku, args.k)
+            py_ms = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        eng = RoiEngine(products, GLOBAL, per_sku)
+        build_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        eng.compute()
+        compute_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        top = eng.top_k(args.k)
+        topk_ms = (time.perf_counter() - t) * 1000
+
+        if py_ms is not None:
+            assert [s["sku"] for s in top] == [s["sku"] for s in ref], "top-k diverge do loop Python"
+        speed = f"{py_ms / (compute_ms + topk_ms):>7.0f}x" if py_ms else f"{'-':>8}"
+        print(f"{n:>9} {py_ms if py_ms is not None else float('nan'):>11.1f} {build_ms:>10.1f} "
+              f"{compute_ms:>12.2f} {topk_ms:>10.2f} {speed}")
+
+if __name__ == "__main__":
+    main()
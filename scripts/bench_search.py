@@ -0,0 +1,44 @@
+"""Benchmark da busca no catálogo: varredura linear (como o _matches antigo) vs. CatalogIndex.
+
+Uso: python scripts/bench_search.py [--size 300000] [--terms "termica,gluteos mini,sk-00012,fo"]
+"""
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.catalog.index import CatalogIndex
+
+WORDS = ("aparador vaporizador portátil airfryer mini elástico glúteos removedor fiapos escova "
+         "secador câmera fone bluetooth garrafa térmica luminária led tapete yoga").split()
+
+def make_rows(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    return [{"sku": f"SK-{i:07d}", "name": " ".join(rnd.sample(WORDS, 3)) + f" {i % 97}",
+             "stock": rnd.randint(0, 2000)} for i in range(n)]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=300000)
+    ap.add_argument("--terms", default="termica,gluteos mini,sk-00012,luminaria led 5,fo")
+    ap.add_argument("--min-stock", type=int, default=1500)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    rows = make_rows(args.size)
+    t = time.perf_counter()
+    idx = CatalogIndex(rows)
+    print(f"{args.size} produtos | índice em {time.perf_counter() - t:.1f}s")
+    print(f"{'termo':<18} {'achados':>8} {'linear(ms)':>11} {'índice(ms)':>11}")
+    for term in args.terms.split(","):
+        t = time.perf_counter()
+        lin = [p for p in rows if (term in p["sku"].lower() or term in p["name"].lower())
+               and p["stock"] >= args.min_stock]
+        lin_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        for _ in range(args.runs):
+            hits = idx.search(term, min_stock=args.min_stock)
+        idx_ms = (time.perf_counter() - t) * 1000 / args.runs
+        print(f"{term:<18} {len(hits):>8} {lin_ms:>11.1f} {idx_ms:>11.2f}  (linear sem acento: {len(lin)})")
+
+if __name__ == "__main__":
+    main()
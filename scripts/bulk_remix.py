@@ -0,0 +1,45 @@
+"""Remix em lote: lista de URLs do TikTok + um conjunto de parâmetros do autoscript.
+
+Uso:
+  python scripts/bulk_remix.py urls.txt --niche beleza --scenario banho --style "prova social"
+  cat urls.txt | python scripts/bulk_remix.py - --download-workers 6 --workers 3 --profile review
+
+Downloads em paralelo (threads) e renders num pool de processos; grava summary.json em --out.
+"""
+import argparse, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.video.bulk import bulk_remix, parse_urls
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("urls", help="arquivo com as URLs (uma por linha) ou - p/ stdin")
+    ap.add_argument("--out", default="outputs/bulk")
+    ap.add_argument("--niche", default="geral")
+    ap.add_argument("--scenario", default="casa")
+    ap.add_argument("--style", default="demonstração rápida")
+    ap.add_argument("--download-workers", type=int)
+    ap.add_argument("--workers", type=int, help="processos de render (padrão: RENDER_WORKERS)")
+    ap.add_argument("--profile", help="draft | review | publish (padrão: RENDER_PROFILE ou publish)")
+    args = ap.parse_args()
+
+    text = sys.stdin.read() if args.urls == "-" else Path(args.urls).read_text(encoding="utf-8")
+    urls = parse_urls(text)
+    params = dict(niche=args.niche, scenario=args.scenario, style=args.style)
+    print(f"{len(urls)} URLs…")
+
+    def show(item):
+        tag = {"done": "ok ", "duplicate": "dup", "error": "ERR"}.get(item.status, item.status)
+        detail = item.output or item.same_as or (item.error or "").strip().splitlines()[-1:]
+        print(f"[{tag}] {item.url} dl={item.download_s:.1f}s render={item.render_s:.1f}s {detail}", flush=True)
+
+    out_root = Path(args.out)
+    s = bulk_remix(urls, out_root, autoscript_params=params, download_workers=args.download_workers,
+                   render_workers=args.workers, profile=args.profile, on_result=show)
+    print(f"ok={s['done']} erros={s['errors']} duplicados={s['duplicates']} "
+          f"cache={s['download_cache']} total={s['total_wall']}s")
+    print(f"resumo: {out_root / 'summary.json'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Checagem offline do catálogo plugável: feed CSV local como substituto de Shopify/Supabase.
+
+Gera um CSV, carrega no CatalogStore (com índice de busca e ROI inscritos), altera/remove/adiciona
+linhas no arquivo e confere que o segundo refresh só aplica o diff. Também confere preço/estoque em
+formato BR (1.299,90) e US (1,299.90) e que um feed truncado não derruba o catálogo.
+
+Uso: python scripts/check_catalog_source.py [--size 200000]
+"""
+import argparse, csv, random, sys, tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.catalog.source import CatalogStore, CsvFeedProvider, RefreshRefused, _num
+from services.catalog.index import CatalogIndex
+from services.catalog.roi import RoiEngine
+
+GLOBAL = dict(vpd=3, avg_views=5000, ctr=0.04, conv=0.02, margin=0.30, days=30)
+
+def write_feed(path: Path, rows, us: bool = False):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, delimiter="," if us else ";")
+        w.writerow(["codigo", "titulo", "estoque", "preco"])
+        for r in rows:
+            if us:  # 1,299.90
+                w.writerow([r["sku"], r["name"], f"{r['stock']:,}", f"{r['price']:,.2f}"])
+            else:   # 1.299,90
+                w.writerow([r["sku"], r["name"], f"{r['stock']:,}".replace(",", "."),
+                            f"{r['price']:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=200000)
+    args = ap.parse_args()
+    rnd = random.Random(3)
+    rows = [{"sku": f"SK-{i:07d}", "name": f"Produto {i} térmico", "stock": rnd.randint(0, 2000),
+             "price": round(rnd.uniform(10, 5000), 2)} for i in range(args.size)]
+    for s, v in {"1.299,90": 1299.9, "1,299.90": 1299.9, "129,90": 129.9, "129.90": 129.9,
+                 "R$ 12.345.678,01": 12345678.01, "12,345,678.01": 12345678.01}.items():
+        assert abs(_num(s) - v) < 1e-9, (s, _num(s))
+    assert _num("1.200", int) == _num("1,200", int) == 1200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = Path(tmp) / "feed.csv"
+        write_feed(feed, rows)
+        store, index, roi = CatalogStore(), CatalogIndex(), RoiEngine([], GLOBAL)
+        store.subscribe(index.apply); store.subscribe(roi.apply)
+        st = store.refresh(CsvFeedProvider(feed))
+        print(f"carga: {st}")
+        assert st.added == args.size and len(index) == len(roi) == args.size
+
+        for r in rows[:10]:
+            r["stock"] += 1
+        rows[10]["name"] = "Luminária Nova"
+        del rows[20:25]
+        rows += [{"sku": f"NEW-{i}", "name": "Novo", "stock": 1, "price": 9.9} for i in range(3)]
+        write_feed(feed, rows)
+        st = store.refresh(CsvFeedProvider(feed))
+        print(f"diff:  {st}")
+        assert (st.changed, st.removed, st.added) == (11, 5, 3), st
+        assert len(index) == len(roi) == len(rows)
+        assert index.search("luminaria") == [rows[10]["sku"]]
+        assert "SK-0000020" not in index and "SK-0000020" not in roi.row_of
+        assert roi.row(roi.row_of["SK-0000000"])["stock"] == rows[0]["stock"]
+
+        # mesmo feed em formato US: nada muda (preço/estoque idênticos)
+        write_feed(feed, rows, us=True)
+        st = store.refresh(CsvFeedProvider(feed))
+        assert (st.added, st.changed, st.removed) == (0, 0, 0) and st.unchanged == len(rows), st
+        assert any(r["price"] >= 1000 for r in rows)
+        print(f"US:    {st}")
+
+        # feed truncado: remoções recusadas, catálogo inteiro continua
+        write_feed(feed, rows[:len(rows) // 10])
+        try:
+            store.refresh(CsvFeedProvider(feed)); raise AssertionError("feed truncado aplicado")
+        except RefreshRefused as e:
+            print(f"truncado: {e}")
+        assert len(store) == len(index) == len(roi) == len(rows)
+    print("ok")
+
+if __name__ == "__main__":
+    main()
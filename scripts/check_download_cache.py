@@ -0,0 +1,112 @@
+"""Checagem offline do DownloadCache: extractor substituto + servidor HTTP local.
+
+Sobe um http.server servindo arquivos fake, dispara downloads simultâneos do mesmo ID
+(com query strings diferentes, como nos links de compartilhamento) e confere que houve
+um único download, hits nas chamadas seguintes, eviction ao passar do limite, info extraída
+de novo antes de baixar e lock de dono morto (mtime velho) sendo tomado.
+
+Uso: python scripts/check_download_cache.py [--concurrent 8]
+"""
+import argparse, os, sys, tempfile, threading, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.video.download_cache import DownloadCache
+
+class LocalExtractor:
+    """Mesma interface usada do YoutubeDL: extract_info(download=False) + process_ie_result."""
+    downloads = extracts = 0
+    _lock = threading.Lock()
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        with self._lock:
+            LocalExtractor.extracts += 1
+        vid = url.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+        base = url.split("/v/")[0]
+        return {"id": vid, "ext": "mp4", "extractor_key": "Local", "duration": 12.0,
+                "url": f"{base}/{vid}.mp4", "webpage_url": url}
+
+    def process_ie_result(self, info, download=True):
+        out = Path(self.opts["outtmpl"].replace("%(id)s", info["id"]).replace("%(ext)s", info["ext"]))
+        with urllib.request.urlopen(info["url"]) as r, open(out, "wb") as f:
+            f.write(r.read())
+        with self._lock:
+            LocalExtractor.downloads += 1
+        return info
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrent", type=int, default=8)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        www = root / "www"; www.mkdir()
+        for vid in ("111", "222", "333", "444", "555"):
+            (www / f"{vid}.mp4").write_bytes(os.urandom(256 * 1024))
+        srv = ThreadingHTTPServer(("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=str(www)))
+        SimpleHTTPRequestHandler.log_message = lambda *a: None
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{srv.server_port}/v"
+
+        cache = DownloadCache(cache_dir=root / "cache", max_bytes=600 * 1024, ydl_factory=LocalExtractor)
+        urls = [f"{base}/111?share={i}" for i in range(args.concurrent)]
+        with ThreadPoolExecutor(args.concurrent) as ex:
+            paths = {p for p, _ in ex.map(cache.fetch, urls)}
+        assert len(paths) == 1 and LocalExtractor.downloads == 1, (paths, LocalExtractor.downloads)
+        print(f"concorrentes: {args.concurrent} pedidos -> 1 download {cache.stats()}")
+
+        cache.fetch(f"{base}/111")
+        assert LocalExtractor.downloads == 1
+        print(f"repetido: hit {cache.stats()}")
+
+        cache.fetch(f"{base}/222")
+        cache.fetch(f"{base}/333")  # 3 x 256KB > 600KB: o menos usado (111) sai
+        left = sorted(p.name for p in (root / "cache").glob("*.mp4"))
+        assert left == ["local-222.mp4", "local-333.mp4"], left
+        print(f"eviction: restam {left}")
+
+        # miss: info extraída de novo logo antes do download (probe do memo + extração fresca)
+        n = LocalExtractor.extracts
+        cache.fetch(f"{base}/444")
+        assert LocalExtractor.extracts == n + 2, LocalExtractor.extracts - n
+        assert "url" not in cache.probe(f"{base}/444")  # memo guarda só a info resumida
+
+        # lock de um dono morto (mtime velho) é tomado; lock recente faz esperar
+        fast = DownloadCache(cache_dir=root / "cache", max_bytes=10 ** 9, ydl_factory=LocalExtractor,
+                             lock_timeout=1.0)
+        lock = root / "cache" / "local-555.lock"
+        lock.touch()
+        os.utime(lock, (time.time() - 5, time.time() - 5))
+        t = time.perf_counter()
+        fast.fetch(f"{base}/555")
+        assert time.perf_counter() - t < 1.0 and not lock.exists()
+        lock.touch()
+        t = time.perf_counter()
+        fast.fetch(f"{base}/555?again=1")  # hit: nem olha o lock
+        with ThreadPoolExecutor(1) as ex:
+            (root / "cache" / "local-555.info.json").unlink()
+            lock.touch()
+            f = ex.submit(fast.fetch, f"{base}/555")
+            time.sleep(0.5)
+            assert not f.done()  # lock recente: espera
+            waited = f.result(timeout=5)
+        assert waited[0].exists() and time.perf_counter() - t >= 1.0
+        print(f"lock: velho tomado na hora, recente esperou {time.perf_counter() - t:.1f}s")
+        srv.shutdown()
+    print("ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Checagem offline do ResearchCrawler contra o mock local (scripts/mock_tiktok_api.py).
+
+Roda dezenas de palavras-chave x janelas com cursor, confere a contagem/dedupe contra o que o
+mock gera (o mock recusa página seguinte sem o `search_id` da 1ª), repete a execução (só a janela
+de "hoje" vai à rede), refaz do zero janelas cujo search_id em cache expirou e testa o corte por
+orçamento.
+
+Uso: python scripts/check_research.py [--queries 24] [--days 21] [--per-day 40]
+"""
+import argparse, asyncio, sys, tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from mock_tiktok_api import MockTikTokServer, research_videos
+from services.tiktok.client import TikTokClient, TokenStore
+from services.tiktok.research import PageCache, ResearchCrawler, date_windows, write_results
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=24)
+    ap.add_argument("--days", type=int, default=21)
+    ap.add_argument("--per-day", type=int, default=40)
+    ap.add_argument("--max-count", type=int, default=100)
+    args = ap.parse_args()
+
+    srv = MockTikTokServer(videos_per_day=args.per_day).start()
+    today = date.today()
+    start = today - timedelta(days=args.days - 1)
+    queries = [f"kw{i}" for i in range(args.queries)]
+    windows = date_windows(start, today, 7)
+    expected = {v["id"] for q in queries for a, b in windows
+                for v in research_videos(q, f"{a:%Y%m%d}", f"{b:%Y%m%d}", args.per_day)}
+    with tempfile.TemporaryDirectory() as tmp:
+        api = TikTokClient(TokenStore(Path(tmp) / "token.json"), base_url=srv.base_url, client_key="mock",
+                           limits={"/v2/research/": (200.0, 50), "": (50.0, 10)})
+        api.exchange_code("code", "verifier", "http://localhost/callback")
+        cache = PageCache(Path(tmp) / "cache")
+        mk = lambda budget=10_000: ResearchCrawler(api, cache, concurrency=8, budget=budget,
+                                                   max_count=args.max_count, today=today)
+
+        # 1) execução fria
+        rows, st = asyncio.run(mk().crawl(queries, start, today))
+        assert {r["id"] for r in rows} == expected and len(rows) == len(expected), (len(rows), len(expected))
+        assert st.errors == 0 and not st.incomplete
+        print(f"fria: {st.videos} vídeos ({st.duplicates} repetidos) | {st.requests} requisições | "
+              f"{st.pages} páginas | {st.seconds}s")
+
+        # 2) repetição: janelas encerradas vêm do cache, só a de hoje vai à rede
+        rows2, st2 = asyncio.run(mk().crawl(queries, start, today))
+        assert [r["id"] for r in rows2] == [r["id"] for r in rows]
+        open_pages = st.pages - st2.cached_pages
+        assert st2.requests == open_pages, (st2.requests, open_pages)
+        print(f"repetição: {st2.cached_pages} páginas do cache, {st2.requests} requisições (janela aberta) | {st2.seconds}s")
+
+        # 3) cache parcial + servidor esqueceu os search_id: janela é refeita do zero, sem furos
+        dropped = [p for p in cache.root.glob("*/*.json") if p.stem != "0"][::3]
+        for p in dropped:
+            p.unlink()
+        srv.state.searches.clear()
+        rows3, st3 = asyncio.run(mk().crawl(queries, start, today))
+        assert [r["id"] for r in rows3] == [r["id"] for r in rows] and st3.errors == 0
+        print(f"search_id expirado: {len(dropped)} páginas apagadas do cache -> {st3.requests} requisições, "
+              f"{st3.videos} vídeos")
+
+        # 4) orçamento curto: para de pedir e lista o que ficou pendente
+        other = [f"novo{i}" for i in range(6)]
+        _, st4 = asyncio.run(mk(budget=5).crawl(other, start, today))
+        assert st4.requests == 5 and st4.budget_exhausted and st4.incomplete
+        print(f"orçamento 5: {st4.requests} requisições, {len(st4.incomplete)} janelas pendentes")
+
+        files = write_results(rows, Path(tmp) / "out", "research")
+        print("OK:", ", ".join(f"{f.name} ({f.stat().st_size // 1024}KB)" for f in files),
+              f"| conexões: {srv.state.connections}")
+    srv.stop()
+
+if __name__ == "__main__":
+    main()
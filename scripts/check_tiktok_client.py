@@ -0,0 +1,66 @@
+"""Checagem offline do TikTokClient contra o mock local (scripts/mock_tiktok_api.py).
+
+- login (troca de code) persiste o token; um cliente novo lê do arquivo
+- token perto de expirar é renovado antes da chamada; 401 força um refresh e repete
+- rajada concorrente num endpoint limitado (429 + Retry-After) termina sem erro
+- tudo sobre poucas conexões keep-alive
+
+Uso: python scripts/check_tiktok_client.py [--calls 40] [--threads 8] [--max-rps 5]
+"""
+import argparse, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from mock_tiktok_api import MockTikTokServer
+from services.tiktok.client import REFRESH_SKEW_S, TikTokClient, TokenStore
+
+LIST = "/v2/research/video/list/"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=40)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--max-rps", type=float, default=5)
+    args = ap.parse_args()
+
+    srv = MockTikTokServer(max_rps=args.max_rps, token_ttl=REFRESH_SKEW_S + 2).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TokenStore(Path(tmp) / "token.json")
+        # 1) login + persistência
+        first = TikTokClient(store, base_url=srv.base_url, client_key="mock").exchange_code(
+            "code", "verifier", "http://localhost/callback")
+        client = TikTokClient(store, base_url=srv.base_url, client_key="mock", backoff=0.2)
+        assert client.access_token() == first["access_token"]
+        print(f"token persistido em {store.path.name}; novo cliente reaproveitou")
+
+        # 2) refresh antes de expirar (ttl = skew + 2s)
+        time.sleep(2.1)
+        tok = client.access_token()
+        assert tok != first["access_token"] and store.load()["access_token"] == tok
+        print("refresh antecipado OK")
+
+        # 3) servidor invalida o token -> 401 -> refresh forçado -> repete
+        with srv.state.lock:
+            srv.state.tokens[tok] = 0
+        client.get(LIST, params={"query": "beauty", "max_count": 5})
+        assert client.access_token() != tok
+        print("401 -> refresh -> retry OK")
+
+        # 4) rajada: cliente mais agressivo que o servidor, 429 com Retry-After
+        client.limiter.limits[LIST] = (args.max_rps * 3, args.threads)
+        t = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as ex:
+            pages = list(ex.map(lambda i: client.get(LIST, params={"query": f"q{i}", "max_count": 10}),
+                                range(args.calls)))
+        wall = time.perf_counter() - t
+        assert all(len(p["data"]["videos"]) == 10 for p in pages)
+        ideal = args.calls / args.max_rps
+        print(f"{args.calls} chamadas em {wall:.1f}s (mínimo do servidor ~{ideal:.1f}s) | "
+              f"429 recebidos: {client.throttled} | negados no servidor: {srv.state.throttled}")
+        print(f"OK: {sum(srv.state.calls.values())} requisições em {srv.state.connections} conexões")
+    srv.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Checagem offline do gerador de variantes com a biblioteca de templates do repo.
+
+- argumentos padrão (sem filtro de duração) rendem variantes em todos os templates
+- `window=None` (duration_target_sec do template) que não cabe em nada avisa em vez de sumir calado
+- `strict=False` preenche variável ausente com texto vazio
+
+Uso: python scripts/check_variants.py
+"""
+import sys, warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.video.templates import get_library
+from services.video.variants import VariantStats, iter_variants
+
+VARS = {"DOR_PRINCIPAL": "cabelo armado", "BENEFICIO_PRINCIPAL": "fios alinhados", "DIFERENCIAL_CHAVE": "bivolt",
+        "GARANTIA_CURTA": "7 dias pra testar", "OFERTA_CURTA": "frete grátis hoje", "PROVA_SOCIAL_CURTA": "4,8 estrelas",
+        "PROVA_SOCIAL_FONTE": "avaliações da loja", "CENA_DEMO_1": "liga", "CENA_DEMO_2": "passa", "CENA_DEMO_3": "pronto"}
+
+def main():
+    lib = get_library()
+    st = VariantStats()
+    got = list(iter_variants("SK-1", "Escova Secadora", [VARS], stats=st))
+    per_tpl = {v.template_id for v in got}
+    assert got and per_tpl == {t.id for t in lib.templates}, (st, per_tpl)
+    print(f"padrão: {st.yielded} variantes de {st.combinations} combinações, {len(per_tpl)} templates")
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        st2 = VariantStats()
+        inside = list(iter_variants("SK-1", "Escova Secadora", [VARS], window=None, stats=st2))
+    warned = {str(x.message).split(":")[0] for x in w}
+    assert warned.isdisjoint(v.template_id for v in inside)
+    assert len(warned | {v.template_id for v in inside}) == len(lib.templates)
+    print(f"janela do template: {len(inside)} variantes, {len(warned)} templates avisaram que não cabem")
+
+    st3 = VariantStats()
+    blank = list(iter_variants("SK-1", "Escova Secadora", stats=st3, strict=False))
+    assert blank and st3.blank_filled == st3.combinations and st3.missing_vars == 0
+    print(f"strict=False sem variáveis: {len(blank)} variantes (texto vazio)")
+    print("ok")
+
+if __name__ == "__main__":
+    main()
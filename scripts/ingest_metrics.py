@@ -0,0 +1,91 @@
+"""Importa métricas diárias (CSV/JSONL) p/ o MetricsStore (METRICS_DB).
+
+Colunas: video_id, sku, day (ou date, AAAA-MM-DD) e views, likes, shares, clicks, orders, revenue.
+Reimportar o mesmo (vídeo, dia) substitui os valores.
+
+Uso: python scripts/ingest_metrics.py export.csv [mais.jsonl ...] [--db .cache/metrics.db]
+     python scripts/ingest_metrics.py --demo 2000 --days 60 --db /tmp/m.db   # dados sintéticos + conferência
+"""
+import argparse, csv, json, random, sys, tempfile, time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from services.analytics.store import METRICS, METRICS_DB, MetricsStore
+
+def read_rows(path: Path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.suffix.lower() == ".jsonl":
+            recs = (json.loads(l) for l in f if l.strip())
+        else:
+            head = f.readline(); f.seek(0)
+            recs = csv.DictReader(f, delimiter=max((",", ";", "\t"), key=head.count))
+        for r in recs:
+            r = {k.strip().lower(): v for k, v in r.items()}
+            yield {"video_id": r["video_id"], "sku": r["sku"], "day": (r.get("day") or r["date"])[:10],
+                   **{c: float(r.get(c) or 0) if c == "revenue" else int(float(r.get(c) or 0)) for c in METRICS}}
+
+def demo_days(skus: int, days: int, seed: int = 11):
+    """Um lote por dia (como a ingestão diária real): vídeos novos + métricas dos vídeos ativos."""
+    rnd = random.Random(seed)
+    start = date.today() - timedelta(days=days - 1)
+    videos = []
+    for d in range(days):
+        day = (start + timedelta(days=d)).isoformat()
+        for _ in range(max(1, skus // 4)):
+            videos.append((f"v{len(videos)}", f"SK-{rnd.randrange(skus):05d}", d))
+        batch = []
+        for vid, sku, born in videos[-skus * 3:]:
+            age = d - born
+            views = int(rnd.expovariate(1 / 3000) / (1 + age))
+            clicks = int(views * rnd.uniform(0.01, 0.06))
+            orders = int(clicks * rnd.uniform(0.01, 0.05))
+            batch.append({"video_id": vid, "sku": sku, "day": day, "views": views, "likes": views // 20,
+                          "shares": views // 200, "clicks": clicks, "orders": orders,
+                          "revenue": round(orders * rnd.uniform(40, 200), 2)})
+        yield day, batch
+
+def window_snapshot(store: MetricsStore):
+    cur = store.db.execute(f"SELECT sku, win, posts, {', '.join(METRICS)} FROM sku_window ORDER BY sku, win")
+    return {(r[0], r[1]): tuple(round(x, 4) for x in r[2:]) for r in cur if any(r[2:])}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("files", nargs="*")
+    ap.add_argument("--db", default=str(METRICS_DB))
+    ap.add_argument("--demo", type=int, default=0, help="N SKUs sintéticos")
+    ap.add_argument("--days", type=int, default=60)
+    args = ap.parse_args()
+
+    store = MetricsStore(args.db)
+    t = time.perf_counter()
+    n = 0
+    if args.demo:
+        for day, batch in demo_days(args.demo, args.days):
+            n += store.add(batch)
+        # reimporta um dia antigo corrigido (delta) e confere contra o recálculo completo
+        late = list(demo_days(args.demo, args.days, seed=12))[-3][1]
+        n += store.add(late)
+    for f in args.files:
+        n += store.add(read_rows(Path(f)))
+    print(f"{n} linhas em {time.perf_counter() - t:.1f}s | as_of {store.as_of}")
+
+    if args.demo:
+        inc = window_snapshot(store)
+        store.rebuild()
+        assert inc == window_snapshot(store), "rollup incremental divergiu do recálculo"
+        print(f"rollups incrementais == recálculo ({len(inc)} linhas SKU/janela)")
+    top = store.top(7, "views", 5)
+    t = time.perf_counter()
+    for _ in range(100):
+        store.totals(7); store.top(7, "views", 10)
+        if top:
+            store.sku_metrics(top[0]["sku"]); store.observed_cfg(top[0]["sku"])
+    print(f"consulta do bot (totais+top+SKU+observado): {(time.perf_counter() - t) * 10:.2f}ms")
+    tot = store.totals(7)
+    print(f"7d: {tot['views'] or 0} views | ctr {(tot['ctr'] or 0):.2%} | conv {(tot['conv'] or 0):.2%}")
+    for r in top:
+        print(f"  {r['sku']}: {r['views']} views, ctr {(r['ctr'] or 0):.2%}, observado {store.observed_cfg(r['sku'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Servidor local que imita os endpoints da TikTok API usados pelo projeto (testes offline).
+
+- POST /v2/post/publish/inbox/video/init/  -> publish_id + upload_url
+- PUT  /upload/<publish_id>                -> recebe chunks com Content-Range (206 parcial, 201 completo)
+- POST /v2/video/publish/                  -> publica como DRAFT (exige upload completo)
+- POST /v2/oauth/token/                    -> authorization_code / refresh_token (form)
+- GET  /v2/research/video/list/            -> vídeos sintéticos por query/dia (start_date/end_date), paginados por
+                                               cursor; a 1ª página devolve `search_id`, exigido nas seguintes
+
+`fail_every=N` faz o N-ésimo PUT devolver 500 (testa retry/retomada); `max_rps` limita cada
+endpoint da API (429 + Retry-After); `token_ttl` controla o expires_in dos tokens emitidos —
+depois que algum token é emitido, só tokens válidos e não expirados passam (401).
+
+Uso: python scripts/mock_tiktok_api.py [--port 8788]   (depois TIKTOK_API_BASE=http://127.0.0.1:8788)
+"""
+import argparse, json, re, threading, time, uuid, zlib
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+class MockState:
+    def __init__(self, fail_every: int = 0, max_rps: float = 0, token_ttl: int = 86400, videos_per_day: int = 40):
+        self.fail_every, self.max_rps, self.token_ttl = fail_every, max_rps, token_ttl
+        self.videos_per_day = videos_per_day
+        self.lock = threading.Lock()
+        self.uploads: Dict[str, Dict] = {}
+        self.puts = 0
+        self.published: Dict[str, Dict] = {}
+        self.tokens: Dict[str, float] = {}     # access_token -> expira em
+        self.refresh: Dict[str, str] = {}      # refresh_token -> open_id
+        self.hits = defaultdict(deque)         # path -> instantes (janela de 1s)
+        self.calls = defaultdict(int)
+        self.throttled = 0
+        self.connections = 0
+        self.searches: Dict[str, tuple] = {}   # search_id -> (query, start_date, end_date)
+
+    def throttle(self, path: str) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            self.calls[path] += 1
+            if not self.max_rps:
+                return False
+            q = self.hits[path]
+            while q and now - q[0] >= 1.0:
+                q.popleft()
+            if len(q) >= self.max_rps:
+                self.throttled += 1
+                return True
+            q.append(now)
+            return False
+
+    def issue(self, open_id: str = "mock-user") -> Dict:
+        access, refresh = "act." + uuid.uuid4().hex, "rft." + uuid.uuid4().hex
+        with self.lock:
+            self.tokens[access] = time.time() + self.token_ttl
+            self.refresh[refresh] = open_id
+        return {"access_token": access, "expires_in": self.token_ttl, "refresh_token": refresh,
+                "refresh_expires_in": 31536000, "open_id": open_id, "scope": "video.upload,research.video.list",
+                "token_type": "Bearer"}
+
+def research_videos(query: str, start: str | None, end: str | None, per_day: int) -> list:
+    """Vídeos determinísticos por (query, dia); 1 em 10 é compartilhado entre queries (testa dedupe)."""
+    from datetime import date, datetime, timedelta
+    d0 = datetime.strptime(start, "%Y%m%d").date() if start else date.today()
+    d1 = datetime.strptime(end, "%Y%m%d").date() if end else d0
+    out, d = [], d0
+    while d <= d1:
+        day = d.strftime("%Y%m%d")
+        for i in range(per_day):
+            vid = f"shared-{day}-{i}" if i % 10 == 0 else f"{query}-{day}-{i}"
+            h = zlib.crc32(vid.encode())
+            out.append({"id": vid, "create_time": int(datetime(d.year, d.month, d.day).timestamp()) + i * 60,
+                        "view_count": h % 500000, "like_count": h % 20000,
+                        "video_description": f"{query} achadinho #{i}", "hashtag_names": [query, "tiktokshop"]})
+        d += timedelta(days=1)
+    return out
+
+def make_handler(state: MockState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive (o cliente reaproveita a conexão)
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1   # conexões TCP abertas (keep-alive => poucas)
+
+        def _json(self, code: int, payload: Dict, headers: Dict | None = None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def _error(self, code: int, msg: str):
+            self._json(code, {"error": {"code": msg, "message": msg}})
+
+        def _authorized(self) -> bool:
+            auth = self.headers.get("Authorization", "")
+            tok = auth[7:] if auth.startswith("Bearer ") else None
+            if tok is None or (state.tokens and state.tokens.get(tok, 0) < time.time()):
+                self._error(401, "access_token_invalid"); return False
+            return True
+
+        def _gate(self) -> bool:
+            """Auth + limite por endpoint (o corpo já foi lido)."""
+            path = urlparse(self.path).path
+            if state.throttle(path):
+                self._json(429, {"error": {"code": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+                return False
+            return self._authorized()
+
+        def _oauth(self, body: bytes):
+            form = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+            grant = form.get("grant_type")
+            if grant == "authorization_code" and form.get("code") and form.get("code_verifier"):
+                self._json(200, state.issue()); return
+            if grant == "refresh_token" and form.get("refresh_token") in state.refresh:
+                with state.lock:
+                    open_id = state.refresh.pop(form["refresh_token"])
+                self._json(200, state.issue(open_id)); return
+            self._json(400, {"error": "invalid_grant", "error_description": f"{grant} recusado"})
+
+        def do_POST(self):
+            body = self._body()
+            if self.path.startswith("/v2/oauth/token/"):
+                if not state.throttle("/v2/oauth/token/"):
+                    self._oauth(body)
+                else:
+                    self._json(429, {"error": "rate_limit_exceeded"}, {"Retry-After": "1"})
+                return
+            if not self._gate():
+                return
+            payload = json.loads(body or b"{}")
+            if self.path.startswith("/v2/post/publish/inbox/video/init/"):
+                info = payload["source_info"]
+                pid = f"v_inbox_file~v2.{uuid.uuid4().hex[:12]}"
+                with state.lock:
+                    state.uploads[pid] = {"size": info["video_size"], "chunks": info["total_chunk_count"],
+                                          "received": {}, "data": bytearray(info["video_size"]), "done": False}
+                host = self.headers.get("Host")
+                self._json(200, {"data": {"publish_id": pid, "upload_url": f"http://{host}/upload/{pid}"},
+                                 "error": {"code": "ok"}})
+            elif self.path.startswith("/v2/video/publish/"):
+                pid = payload.get("video_id")
+                up = state.uploads.get(pid)
+                if not up or not up["done"]:
+                    self._error(400, "upload_incomplete"); return
+                state.published[pid] = {"post_mode": payload.get("post_mode")}
+                self._json(200, {"data": {"publish_id": pid, "status": payload.get("post_mode")},
+                                 "error": {"code": "ok"}})
+            else:
+                self._error(404, "not_found")
+
+        def do_GET(self):
+            if not self._gate():
+                return
+            u = urlparse(self.path)
+            if u.path.startswith("/v2/research/video/list/"):
+                q = {k: v[0] for k, v in parse_qs(u.query).items()}
+                cursor, n = int(q.get("cursor", 0)), min(int(q.get("max_count", 20)), 100)
+                search = (q.get("query", ""), q.get("start_date"), q.get("end_date"))
+                sid = q.get("search_id")
+                if cursor and state.searches.get(sid) != search:
+                    self._error(400, "invalid_params"); return   # página seguinte sem o search_id da 1ª
+                if not sid:
+                    sid = uuid.uuid4().hex
+                    with state.lock:
+                        state.searches[sid] = search
+                videos = research_videos(*search, state.videos_per_day)
+                page = videos[cursor:cursor + n]
+                self._json(200, {"data": {"videos": page, "cursor": cursor + len(page), "search_id": sid,
+                                          "has_more": cursor + len(page) < len(videos)}, "error": {"code": "ok"}})
+            else:
+                self._error(404, "not_found")
+
+        def do_PUT(self):
+            m = re.match(r"^/upload/([^/?]+)", self.path)
+            body = self._body()
+            with state.lock:
+                state.puts += 1
+                fail = state.fail_every and state.puts % state.fail_every == 0
+            if fail:
+                self._error(500, "internal_error"); return
+            up = state.uploads.get(m.group(1)) if m else None
+            if not up:
+                self._error(404, "upload_not_found"); return
+            rng = re.match(r"bytes (\d+)-(\d+)/(\d+)", self.headers.get("Content-Range", ""))
+            if not rng or int(rng.group(3)) != up["size"] or len(body) != int(rng.group(2)) - int(rng.group(1)) + 1:
+                self._error(400, "invalid_content_range"); return
+            with state.lock:
+                start = int(rng.group(1))
+                up["data"][start:start + len(body)] = body
+                up["received"][start] = len(body)
+                got = sum(up["received"].values())
+                up["done"] = got == up["size"]
+            self._json(201 if up["done"] else 206, {})
+
+    return Handler
+
+class MockTikTokServer:
+    def __init__(self, port: int = 0, fail_every: int = 0, max_rps: float = 0, token_ttl: int = 86400,
+                 videos_per_day: int = 40):
+        self.state = MockState(fail_every, max_rps, token_ttl, videos_per_day)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), make_handler(self.state))
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def start(self) -> "MockTikTokServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8788)
+    ap.add_argument("--fail-every", type=int, default=0)
+    ap.add_argument("--max-rps", type=float, default=0)
+    ap.add_argument("--token-ttl", type=int, default=86400)
+    args = ap.parse_args()
+    srv = MockTikTokServer(args.port, args.fail_every, args.max_rps, args.token_ttl)
+    print(f"mock TikTok API em {srv.base_url}")
+    srv.httpd.serve_forever()
+
+if __name__ == "__main__":
+    main()
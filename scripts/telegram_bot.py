@@ -1,9 +1,9 @@
-import os, json, html
-from dataclasses import dataclass, asdict
-from typing import List, Dict
+import os, json, html, time, asyncio
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Iterable, List
 from pathlib import Path
 
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, InputMediaVideo, Update
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, CallbackQueryHandler, MessageHandler,
     ContextTypes, filters
@@ -33,6 +33,7 @@ ASK_REMIX_SCRIPT = "ASK_REMIX_SCRIPT"
 ASK_REMIX_NICHE = "ASK_REMIX_NICHE"
 ASK_REMIX_SCENARIO = "ASK_REMIX_SCENARIO"
 ASK_REMIX_STYLE = "ASK_REMIX_STYLE"
+ASK_BULK_URLS = "ASK_BULK_URLS"
 
 # ==== modelos de config ====
 @dataclass
@@ -48,29 +49,82 @@ class GlobalCfg:
 class State:
     global_cfg: GlobalCfg
     per_sku: Dict[str, Dict]
+    uncertainty: Dict[str, float] = field(default_factory=dict)  # cv global p/ /forecast (ctr_cv=0.3…)
 
 def load_state() -> State:
     if CONFIG_PATH.exists():
         data = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
         gc = GlobalCfg(**data.get("global_cfg", {}))
         per = data.get("per_sku", {})
-        return State(global_cfg=gc, per_sku=per)
+        return State(global_cfg=gc, per_sku=per, uncertainty=data.get("uncertainty", {}))
     return State(global_cfg=GlobalCfg(), per_sku={})
 
 def save_state(st: State):
     payload = {"global_cfg": asdict(st.global_cfg), "per_sku": st.per_sku}
+    if st.uncertainty:
+        payload["uncertainty"] = st.uncertainty
     CONFIG_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
 STATE = load_state()
 
 # ==== catálogo MOCK ====
-CATALOG: List[Dict] = [
-    {"sku": "EL-TRIMPRO", "name": "Aparador Pro 5-em-1", "stock": 520, "price": 129.90},
-    {"sku": "HM-STEAMX", "name": "Vaporizador Portátil X", "stock": 140, "price": 189.00},
-    {"sku": "KT-AIRFRY", "name": "AirFryer Mini 2L",       "stock": 980, "price": 249.00},
-    {"sku": "SP-GLUTES", "name": "Elástico Glúteos Pro",   "stock": 85,  "price": 69.90 },
-    {"sku": "PT-LINTGO", "name": "Removedor de Fiapos",    "stock": 360, "price": 79.90 },
-]
+from services.catalog.data import CATALOG
+
+# ROI em colunas NumPy (catálogos reais têm 200k+ SKUs); recalcula só quando a config muda.
+# O catálogo real (CATALOG_SOURCE no .env) carrega em background depois do start; até lá vale o mock.
+from services.catalog.roi import RoiEngine
+from services.catalog.index import CatalogIndex
+from services.catalog.source import CatalogStore, StaticProvider, provider_from_env
+from services.analytics.store import WINDOWS, get_metrics_store, layered_cfg
+
+# métricas reais (scripts/ingest_metrics.py): ctr/conv/vpd/avg_views observados entram entre a
+# config global e os overrides manuais do /configsku
+METRICS_STORE = get_metrics_store()
+OBSERVED: Dict[str, Dict] = METRICS_STORE.observed_all()
+METRICS_REFRESH_MIN = float(os.getenv("METRICS_REFRESH_MIN", "30"))
+
+def effective_per_sku() -> Dict[str, Dict]:
+    return layered_cfg(OBSERVED, STATE.per_sku)
+
+ROI_ENGINE = RoiEngine([], asdict(STATE.global_cfg), effective_per_sku())
+from services.catalog.forecast import CV_FIELDS, Forecaster, parse_quantile
+FORECASTER = Forecaster(ROI_ENGINE, {k[:-3]: v for k, v in STATE.uncertainty.items()})
+CATALOG_INDEX = CatalogIndex()
+CATALOG_STORE = CatalogStore()
+CATALOG_STORE.subscribe(CATALOG_INDEX.apply)
+CATALOG_STORE.subscribe(ROI_ENGINE.apply)
+CATALOG_STORE.refresh(StaticProvider(CATALOG))
+CATALOG_REFRESH_MIN = float(os.getenv("CATALOG_REFRESH_MIN", "60"))
+
+def apply_config(save: bool = True):
+    if save:
+        save_state(STATE)
+    with CATALOG_STORE.lock:
+        ROI_ENGINE.set_config(asdict(STATE.global_cfg), effective_per_sku())
+        FORECASTER.set_cv({k[:-3]: v for k, v in STATE.uncertainty.items()})
+
+async def metrics_refresher():
+    """Relê os valores observados (a ingestão roda fora do bot) e reaplica no ROI."""
+    global OBSERVED
+    while METRICS_REFRESH_MIN > 0:
+        await asyncio.sleep(METRICS_REFRESH_MIN * 60)
+        try:
+            OBSERVED = await asyncio.to_thread(METRICS_STORE.observed_all)
+            apply_config(save=False)
+        except Exception as e:
+            print(f"falha ao ler métricas: {e!r}")
+
+async def catalog_refresher(provider):
+    """Refresh incremental periódico (só linhas alteradas chegam ao índice/ROI)."""
+    while True:
+        try:
+            st = await asyncio.to_thread(CATALOG_STORE.refresh, provider)
+            print(f"catálogo {st.source}: {len(CATALOG_STORE)} SKUs (+{st.added} ~{st.changed} -{st.removed}) em {st.seconds}s")
+        except Exception as e:
+            print(f"falha ao carregar catálogo ({provider.name}): {e!r}")
+        if CATALOG_REFRESH_MIN <= 0:
+            return
+        await asyncio.sleep(CATALOG_REFRESH_MIN * 60)
 
 # ==== helpers ====
 def esc(s: str) -> str:
@@ -80,7 +134,7 @@ def fmt_money(v: float) -> str:
     return f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 def cfg_for_sku(sku: str):
-    override = STATE.per_sku.get(sku.upper(), {})
+    override = {**OBSERVED.get(sku.upper(), {}), **STATE.per_sku.get(sku.upper(), {})}
     base = STATE.global_cfg
     return GlobalCfg(
         vpd=override.get("vpd", base.vpd),
@@ -106,10 +160,17 @@ def calc_product_roi(p: Dict) -> Dict:
         "gross": gross, "profit": profit, "cfg": cfg
     }
 
-def rank_products(catalog: List[Dict]) -> List[Dict]:
-    scored = [calc_product_roi(p) for p in catalog]
-    scored.sort(key=lambda s: (s["profit"], s["cap_sales"], s["stock"]), reverse=True)
-    return scored
+def search_products(term: str, k: int = 10, min_stock: int | None = None) -> List[Dict]:
+    """Busca no índice (substring em SKU/nome, sem acento) + top-k por ROI."""
+    with CATALOG_STORE.lock:
+        return rank_products(CATALOG_INDEX.search(term, min_stock=min_stock), k=k)
+
+def rank_products(skus: Iterable[str], k: int | None = None) -> List[Dict]:
+    rows = ROI_ENGINE.rows_for(skus)
+    ranked = ROI_ENGINE.top_k(k or len(rows), rows=rows)
+    for s in ranked:
+        s["cfg"] = GlobalCfg(**s["cfg"])
+    return ranked
 
 def pct(x: float) -> str:
     return f"{x*100:.1f}%"
@@ -127,25 +188,116 @@ def parse_kv(text: str) -> Dict:
         if "=" in chunk:
             k, v = chunk.strip().split("=", 1)
             k = k.strip().lower()
-            v = v.strip().lower().replace("%", "")
+            v = v.strip().lower()
+            pct = "%" in v
+            v = v.replace("%", "")
             try:
                 if k in {"vpd", "avg_views", "days"}:
                     out[k] = int(float(v))
-                elif k in {"ctr", "conv", "margin"}:
+                elif k in {"ctr", "conv", "margin"} or (k.endswith("_cv") and k[:-3] in CV_FIELDS):
+                    # fração: "4%" / "4" -> 0.04, "0.5%" -> 0.005; _cv é a incerteza do /forecast
+                    # (0.3 = ±30%; cv acima de 1 só com %, ex. "150%")
                     val = float(v)
-                    out[k] = val/100 if val > 1 else val
+                    out[k] = val/100 if pct or val > 1 else val
             except:
                 pass
     return out
 
-def _matches(p: Dict, term: str) -> bool:
-    t = term.lower()
-    return t in p["sku"].lower() or t in p["name"].lower()
-
 # ==== pipeline de vídeo ====
 from services.video.generate import generate_video
-from services.video.autoscript import build_auto_script
+from services.video.autoscript import auto_script_blocks
 from services.video.remix import remix_from_tiktok
+from services.video.bulk import bulk_remix, parse_urls
+from services.video.jobs import RenderQueue, RenderJob, QueueFull, new_job_id
+from services.video.profiles import PROFILES, get_profile
+from services.video.instrument import stats_summary, read_progress
+
+RENDER_QUEUE = RenderQueue(max_queue=int(os.getenv("RENDER_MAX_QUEUE", "32")))
+
+async def enqueue_render(update: Update, context: ContextTypes.DEFAULT_TYPE, fn, kwargs: Dict,
+                         caption: str, job_id: str | None = None):
+    """Enfileira o render e devolve na hora; o vídeo é enviado pelo callback ao terminar."""
+    chat_id = update.effective_chat.id
+    kwargs.setdefault("profile", context.user_data.get("render_profile"))
+
+    async def deliver(job: RenderJob):
+        if job.status == "done":
+            try:
+                with open(job.result, "rb") as f:
+                    await context.bot.send_video(chat_id=chat_id, video=f, caption=f"{caption} · job {job.id} · {job.elapsed:.0f}s")
+            except Exception:
+                await context.bot.send_message(chat_id=chat_id, text=f"{caption}: {job.result}")
+        else:
+            err = (job.error or "").strip().splitlines()[-1:] or ["erro desconhecido"]
+            await context.bot.send_message(chat_id=chat_id, text=f"❌ Falha no job {job.id}: {err[0]}")
+
+    try:
+        job = RENDER_QUEUE.submit(fn, kwargs, owner=chat_id, on_done=deliver, job_id=job_id)
+    except QueueFull:
+        await update.message.reply_text("🚦 Fila de render cheia. Tente de novo em alguns minutos."); return None
+    await update.message.reply_text(
+        f"⏱️ Na fila: job <code>{job.id}</code> (posição {RENDER_QUEUE.position(job)}). "
+        f"Acompanhe com /job {job.id}", parse_mode="HTML")
+    return job
+
+PREVIEW_FIRST = os.getenv("PREVIEW_FIRST", "1") != "0"
+
+async def enqueue_preview_first(update: Update, context: ContextTypes.DEFAULT_TYPE, fn, kwargs: Dict,
+                                out_key: str, caption: str):
+    """Prévia draft (540p ultrafast) primeiro; o render final segue em background,
+    substitui a prévia quando termina e pode ser cancelado pelo botão da prévia."""
+    profile = get_profile(context.user_data.get("render_profile"))
+    if not PREVIEW_FIRST or profile.name == "draft":
+        job_id = new_job_id()
+        return await enqueue_render(update, context, fn, {**kwargs, out_key: Path(kwargs[out_key]) / job_id},
+                                    caption=caption, job_id=job_id)
+
+    chat_id = update.effective_chat.id
+    full_id = new_job_id()
+    base = Path(kwargs[out_key]) / full_id
+    state = {"preview": None, "final": False}
+    cancel_kb = InlineKeyboardMarkup([[InlineKeyboardButton("❌ Cancelar render final", callback_data=f"cancel:{full_id}")]])
+
+    async def on_preview(job: RenderJob):
+        if state["final"]:
+            return  # final chegou antes da prévia
+        if job.status != "done":
+            await context.bot.send_message(chat_id=chat_id, text=f"⚠️ Prévia falhou (job {job.id}); render final continua."); return
+        with open(job.result, "rb") as f:
+            state["preview"] = await context.bot.send_video(
+                chat_id=chat_id, video=f, reply_markup=cancel_kb,
+                caption=f"👀 Prévia ({caption}) · {job.elapsed:.0f}s — render final em andamento (job {full_id})")
+
+    async def on_final(job: RenderJob):
+        state["final"] = True
+        preview = state["preview"]
+        if job.status == "cancelled":
+            if preview:
+                await preview.edit_caption(caption="👀 Prévia — render final cancelado.")
+            return
+        if job.status != "done":
+            err = (job.error or "").strip().splitlines()[-1:] or ["erro desconhecido"]
+            await context.bot.send_message(chat_id=chat_id, text=f"❌ Falha no render final {job.id}: {err[0]}"); return
+        final_caption = f"{caption} · job {job.id} · {job.elapsed:.0f}s"
+        try:
+            with open(job.result, "rb") as f:
+                if preview:
+                    await preview.edit_media(media=InputMediaVideo(media=f, caption=final_caption))
+                else:
+                    await context.bot.send_video(chat_id=chat_id, video=f, caption=final_caption)
+        except Exception:
+            await context.bot.send_message(chat_id=chat_id, text=f"{final_caption}: {job.result}")
+
+    try:
+        RENDER_QUEUE.submit(fn, {**kwargs, out_key: base / "preview", "profile": "draft"},
+                            owner=chat_id, on_done=on_preview)
+        RENDER_QUEUE.submit(fn, {**kwargs, out_key: base, "profile": profile.name},
+                            owner=chat_id, on_done=on_final, job_id=full_id, cancellable=True)
+    except QueueFull:
+        await update.message.reply_text("🚦 Fila de render cheia. Tente de novo em alguns minutos."); return None
+    await update.message.reply_text(
+        f"⏱️ Gerando prévia rápida… render final: job <code>{full_id}</code> (/job {full_id})", parse_mode="HTML")
+    return full_id
 
 # ==== handlers ====
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -158,7 +310,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     ]
     await update.message.reply_text(
         "Bem-vindo ao TikTokShop AI Bot. Escolha uma opção:\n"
-        "Comandos: /search termo  |  /remix URL  |  /showconfig  |  /config  |  /configsku",
+        "Comandos: /search termo  |  /remix URL  |  /bulkremix  |  /job ID  |  /profile  |  /stats  |  /catalog  |  /metrics  |  /forecast  |  /showconfig  |  /config  |  /configsku",
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
@@ -191,8 +343,16 @@ async def button(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif q.data == 'post':
         await q.edit_message_text(text="🚀 Preparando postagem no TikTok… (placeholder)", parse_mode="HTML"); return
 
+    elif q.data.startswith('cancel:'):
+        job_id = q.data.split(":", 1)[1]
+        if RENDER_QUEUE.cancel(job_id, owner=update.effective_chat.id):
+            await q.edit_message_caption(caption=f"🛑 Cancelando render final (job {job_id})…")
+        else:
+            await q.message.reply_text("Render final já terminou ou não pode ser cancelado.")
+        return
+
     elif q.data == 'metrics':
-        await q.edit_message_text(text="📊 Métricas mock: Views=5.000 | CTR=4% | Conv=2% | ROI=positivo (placeholder)", parse_mode="HTML"); return
+        await q.edit_message_text(text=metrics_summary(), parse_mode="HTML"); return
 
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     msg = (update.message.text or "").strip()
@@ -212,11 +372,10 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         term = context.user_data.get("term", "")
         context.user_data.pop(ASK_STOCK, None)
 
-        subset = [p for p in CATALOG if _matches(p, term) and p["stock"] >= stock_min]
-        if not subset:
+        ranked = search_products(term, k=10, min_stock=stock_min)
+        if not ranked:
             await update.message.reply_text(f"🔎 Nada encontrado para <b>{esc(term)}</b> com estoque ≥ <b>{stock_min}</b>.", parse_mode="HTML"); return
 
-        ranked = rank_products(subset)[:10]
         lines = [f"<b>🔍 Resultados</b> para “{esc(term)}” com estoque ≥ {stock_min}"]
         for i, s in enumerate(ranked, 1):
             cfg = s["cfg"]; flag = "⚠️" if s["stock"] < s["predicted_sales"] else "✅"
@@ -256,10 +415,9 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data.pop(ASK_SCRIPT_MANUAL, None)
         sku = context.user_data.get("sku_for_video", "SKU")
         script_text = msg.strip()
-        await update.message.reply_text("⏱️ Renderizando…")
-        out = generate_video(product_name=sku, script_text=script_text, out_dir=Path(f"outputs/{sku}"))
-        try: await update.message.reply_video(video=open(out, "rb"), caption=f"✅ Vídeo gerado ({sku})")
-        except Exception: await update.message.reply_text(f"✅ Vídeo gerado: {out}")
+        await enqueue_preview_first(update, context, generate_video,
+                                    dict(product_name=sku, script_text=script_text, out_dir=Path(f"outputs/{sku}")),
+                                    out_key="out_dir", caption=f"✅ Vídeo gerado ({sku})")
         return
 
     # roteiro IA p/ geração normal
@@ -281,11 +439,14 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         niche = context.user_data.get("niche", "geral")
         scenario = context.user_data.get("scenario", "casa")
         style = msg.lower().strip()
-        script_text = build_auto_script(sku, sku, niche, scenario, style, seconds=35)
-        await update.message.reply_text(f"🧾 Roteiro IA:\n\n<code>{esc(script_text)}</code>\n\nRenderizando…", parse_mode="HTML")
-        out = generate_video(product_name=sku, script_text=script_text, out_dir=Path(f"outputs/{sku}"))
-        try: await update.message.reply_video(video=open(out, "rb"), caption=f"✅ Vídeo gerado ({sku})")
-        except Exception: await update.message.reply_text(f"✅ Vídeo gerado: {out}")
+        # blocos + visual_cues do template: TTS por bloco, legenda karaokê e estilos Hook/CTA do nicho
+        tpl, blocks = auto_script_blocks(sku, sku, niche, scenario, style)
+        script_text = "\n".join(b["text"] for b in blocks)
+        await update.message.reply_text(f"🧾 Roteiro IA:\n\n<code>{esc(script_text)}</code>", parse_mode="HTML")
+        await enqueue_preview_first(update, context, generate_video,
+                                    dict(product_name=sku, script_text=script_text, out_dir=Path(f"outputs/{sku}"),
+                                         script_blocks=blocks, visual_cues=list(tpl.visual_cues), niche=tpl.niche),
+                                    out_key="out_dir", caption=f"✅ Vídeo gerado ({sku})")
         return
 
     # ==== REMIX ====
@@ -312,10 +473,9 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data.pop(ASK_REMIX_SCRIPT, None)
         url = context.user_data.get("remix_url")
         sku = "REMIX-" + (url.split("/")[-1][:10] if url else "SKU")
-        await update.message.reply_text("⏱️ Baixando e renderizando remix…")
-        out = remix_from_tiktok(url=url, sku=sku, out_root=Path(f"outputs/{sku}"), script_text=msg.strip())
-        try: await update.message.reply_video(video=open(out, "rb"), caption=f"✅ Remix gerado")
-        except Exception: await update.message.reply_text(f"✅ Remix gerado: {out}")
+        await enqueue_preview_first(update, context, remix_from_tiktok,
+                                    dict(url=url, sku=sku, out_root=Path(f"outputs/{sku}"), script_text=msg.strip()),
+                                    out_key="out_root", caption="✅ Remix gerado")
         return
 
     if context.user_data.get(ASK_REMIX_NICHE):
@@ -338,15 +498,17 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             product_name=sku,
             niche=context.user_data.get("remix_niche","geral"),
             scenario=context.user_data.get("remix_scenario","casa"),
-            style=msg.lower().strip(),
-            seconds=35
+            style=msg.lower().strip()
         )
-        await update.message.reply_text("⏱️ Baixando e renderizando remix com IA…")
-        out = remix_from_tiktok(url=url, sku=sku, out_root=Path(f"outputs/{sku}"), autoscript_params=params)
-        try: await update.message.reply_video(video=open(out, "rb"), caption=f"✅ Remix gerado (IA)")
-        except Exception: await update.message.reply_text(f"✅ Remix gerado: {out}")
+        await enqueue_preview_first(update, context, remix_from_tiktok,
+                                    dict(url=url, sku=sku, out_root=Path(f"outputs/{sku}"), autoscript_params=params),
+                                    out_key="out_root", caption="✅ Remix gerado (IA)")
         return
 
+    if ASK_BULK_URLS in context.user_data:
+        params = context.user_data.pop(ASK_BULK_URLS)
+        await run_bulk_remix(update, context, msg, params); return
+
     # detecção automática de link do tiktok
     if "tiktok.com" in msg.lower():
         context.user_data["remix_url"] = msg.strip()
@@ -375,9 +537,13 @@ async def cmd_config(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "Valores de % aceitam <code>0.05</code> ou <code>5%</code>.",
             parse_mode="HTML"); return
     for k, v in kv.items():
-        setattr(STATE.global_cfg, k, v)
-    save_state(STATE)
-    await update.message.reply_text("✅ Config global atualizada:\n" + esc(fmt_cfg(STATE.global_cfg)), parse_mode="HTML")
+        if k.endswith("_cv"):
+            STATE.uncertainty[k] = v
+        else:
+            setattr(STATE.global_cfg, k, v)
+    apply_config()
+    await update.message.reply_text("✅ Config global atualizada:\n" + esc(fmt_cfg(STATE.global_cfg)) +
+                                    (f"\nIncerteza: {esc(fmt_cv())}" if STATE.uncertainty else ""), parse_mode="HTML")
 
 async def cmd_configsku(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
@@ -387,22 +553,21 @@ async def cmd_configsku(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode="HTML"); return
     sku = context.args[0].upper()
     if len(context.args) == 2 and context.args[1].lower() == "clear":
-        STATE.per_sku.pop(sku, None); save_state(STATE)
+        STATE.per_sku.pop(sku, None); apply_config()
         await update.message.reply_text(f"♻️ Overrides removidos para {esc(sku)}.", parse_mode="HTML"); return
     kv = parse_kv(" ".join(context.args[1:]))
     if not kv:
         await update.message.reply_text("Nenhuma chave válida. Ex.: <code>ctr=0.05, conv=0.02</code>", parse_mode="HTML"); return
-    STATE.per_sku[sku] = {**STATE.per_sku.get(sku, {}), **kv}; save_state(STATE)
+    STATE.per_sku[sku] = {**STATE.per_sku.get(sku, {}), **kv}; apply_config()
     await update.message.reply_text(f"✅ Override salvo para {esc(sku)}: {esc(STATE.per_sku[sku])}", parse_mode="HTML")
 
 async def cmd_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
         await update.message.reply_text("Use: <code>/search airfryer</code>", parse_mode="HTML"); return
     term = " ".join(context.args)
-    subset = [p for p in CATALOG if _matches(p, term)]
-    if not subset:
+    ranked = search_products(term, k=10)
+    if not ranked:
         await update.message.reply_text(f"🔎 Nada encontrado para <b>{esc(term)}</b>.", parse_mode="HTML"); return
-    ranked = rank_products(subset)[:10]
     lines = [f"<b>🔍 Resultados</b> para “{esc(term)}”"]
     for i, s in enumerate(ranked, 1):
         cfg = s["cfg"]; flag = "⚠️" if s["stock"] < s["predicted_sales"] else "✅"
@@ -424,18 +589,252 @@ async def cmd_remix(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data[ASK_REMIX_URL] = True
         await update.message.reply_text("🌀 Envie a URL do TikTok.", parse_mode="HTML")
 
+BULK_MAX_URLS = int(os.getenv("BULK_MAX_URLS", "100"))
+BULK_KEYS = {"niche", "scenario", "style"}
+
+def parse_bulk_params(text: str) -> Dict:
+    """Linhas sem URL no formato `chave=valor` (separadas por linha ou `;`) -> params do autoscript."""
+    out = {}
+    for line in text.splitlines():
+        if "://" in line:
+            continue
+        for chunk in line.split(";"):
+            k, sep, v = chunk.partition("=")
+            k = k.strip().lower()
+            if sep and k in BULK_KEYS and v.strip():
+                out[k] = v.strip().lower()
+    return out
+
+async def run_bulk_remix(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, params: Dict):
+    urls = parse_urls(text)
+    params = {**params, **parse_bulk_params(text)}
+    if not urls:
+        await update.message.reply_text("Nenhuma URL encontrada.", parse_mode="HTML"); return
+    if len(urls) > BULK_MAX_URLS:
+        await update.message.reply_text(f"Máximo de {BULK_MAX_URLS} URLs por lote.", parse_mode="HTML"); return
+    chat_id = update.effective_chat.id
+    batch_id = new_job_id()
+    out_root = Path(f"outputs/BULK-{batch_id}")
+    await update.message.reply_text(
+        f"📥 Lote <code>{batch_id}</code>: {len(urls)} URLs · "
+        f"{esc(', '.join(f'{k}={v}' for k, v in params.items()) or 'params padrão')}\n"
+        f"Baixando em paralelo; cada render entra na fila ({RENDER_QUEUE.workers} workers) — acompanhe com /job.",
+        parse_mode="HTML")
+
+    async def work():
+        try:
+            summary = await asyncio.to_thread(
+                bulk_remix, urls, out_root, autoscript_params=params,
+                profile=context.user_data.get("render_profile"), render_queue=RENDER_QUEUE, owner=chat_id)
+        except Exception as e:
+            await context.bot.send_message(chat_id=chat_id, text=f"❌ Lote {batch_id} falhou: {e!r}"); return
+        lines = [f"<b>🌀 Lote {batch_id}</b> — ok {summary['done']} | erros {summary['errors']} | "
+                 f"cancelados {summary['cancelled']} | duplicados {summary['duplicates']} | {summary['total_wall']:.0f}s"]
+        for r in summary["results"]:
+            if r["status"] == "done":
+                lines.append(f"✅ {esc(r['sku'])} · job {r['job_id']} · dl {r['download_s']:.0f}s · render {r['render_s']:.0f}s")
+            elif r["status"] == "duplicate":
+                lines.append(f"♻️ {esc(r['url'])} (mesmo vídeo de outra URL)")
+            elif r["status"] == "cancelled":
+                lines.append(f"🛑 {esc(r['sku'])} · job {r['job_id']} cancelado")
+            else:
+                err = (r["error"] or "").strip().splitlines()[-1:] or ["erro desconhecido"]
+                lines.append(f"❌ {esc(r['url'])} — {esc(err[0][:120])}")
+        lines.append(f"Saída: <code>{esc(str(out_root))}</code>")
+        chunk = ""
+        for line in lines:  # limite de 4096 caracteres por mensagem
+            if len(chunk) + len(line) > 3800:
+                await context.bot.send_message(chat_id=chat_id, text=chunk, parse_mode="HTML"); chunk = ""
+            chunk += line + "\n"
+        await context.bot.send_message(chat_id=chat_id, text=chunk, parse_mode="HTML")
+
+    context.application.create_task(work())
+
+async def cmd_bulkremix(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    text = (update.message.text or "").partition(" ")[2]
+    if parse_urls(text):
+        await run_bulk_remix(update, context, text, {}); return
+    context.user_data[ASK_BULK_URLS] = parse_bulk_params(text)
+    await update.message.reply_text(
+        "🌀 Envie as URLs (uma por linha) ou um arquivo .txt com a lista.\n"
+        "Opcional: <code>niche=beleza; scenario=banho; style=prova social</code>",
+        parse_mode="HTML")
+
+async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    caption = update.message.caption or ""
+    if ASK_BULK_URLS not in context.user_data and not caption.startswith("/bulkremix"):
+        return
+    params = context.user_data.pop(ASK_BULK_URLS, None) or {}
+    f = await update.message.document.get_file()
+    data = await f.download_as_bytearray()
+    await run_bulk_remix(update, context, caption + "\n" + data.decode("utf-8", "replace"), params)
+
+async def cmd_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if context.args:
+        job = RENDER_QUEUE.get(context.args[0].strip(), owner=update.effective_chat.id)  # só jobs deste chat
+        if not job:
+            await update.message.reply_text("Job não encontrado.", parse_mode="HTML"); return
+        if len(context.args) > 1 and context.args[1].lower() == "cancel":
+            ok = RENDER_QUEUE.cancel(job.id, owner=job.owner)
+            await update.message.reply_text(f"🛑 Cancelando job {job.id}…" if ok else "Job já terminou ou não pode ser cancelado.")
+            return
+        jobs = [job]
+    else:
+        jobs = RENDER_QUEUE.for_owner(update.effective_chat.id)[-10:]
+        if not jobs:
+            await update.message.reply_text("Nenhum job seu na fila. Use: <code>/job ID</code> ou <code>/job ID cancel</code>", parse_mode="HTML"); return
+    lines = ["<b>🎞️ Jobs de render</b>"]
+    for j in jobs:
+        extra = f" (posição {RENDER_QUEUE.position(j)})" if j.status == "queued" else f" · {j.elapsed:.0f}s"
+        if j.status == "running":
+            out = j.kwargs.get("out_dir") or j.kwargs.get("out_root")
+            prog = read_progress(Path(out) / "progress.json") if out else None
+            if prog and "percent" in prog:
+                extra += f" · {prog['percent']:.0f}% ({prog['fps']:.0f} fps, {prog['speed']:.1f}x)"
+        lines.append(f"<code>{j.id}</code> — {esc(j.status)}{extra}")
+    await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+
+async def cmd_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    hours = 24.0
+    if context.args:
+        try:
+            hours = float(context.args[0])
+        except ValueError:
+            pass
+    summary = stats_summary(since=time.time() - hours * 3600)
+    queued = sum(j.status == "queued" for j in RENDER_QUEUE.jobs.values())
+    running = sum(j.status == "running" for j in RENDER_QUEUE.jobs.values())
+    lines = [f"<b>⏱️ Tempo por etapa</b> (últimas {hours:g}h) — fila: {queued} | rodando: {running} | workers: {RENDER_QUEUE.workers}"]
+    if not summary:
+        lines.append("Sem medições ainda.")
+    for name, st in summary.items():
+        lines.append(
+            f"<b>{esc(name)}</b>: n={st['n']} | média {st['wall_mean']:.2f}s | p95 {st['wall_p95']:.2f}s | "
+            f"CPU {st['cpu_mean']:.2f}s | total {st['wall_total']:.0f}s" + (f" | erros {st['errors']}" if st['errors'] else "")
+        )
+    await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+
+async def cmd_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        cur = get_profile(context.user_data.get("render_profile"))
+        opts = "\n".join(f"• <b>{p.name}</b>: {p.width}x{p.height}, {p.preset}, crf {p.crf}" for p in PROFILES.values())
+        await update.message.reply_text(
+            f"🎚️ Perfil atual: <b>{cur.name}</b>\n{opts}\nUse: <code>/profile draft</code>", parse_mode="HTML"); return
+    name = context.args[0].lower()
+    if name not in PROFILES:
+        await update.message.reply_text(f"Perfil inválido. Opções: {esc(', '.join(PROFILES))}", parse_mode="HTML"); return
+    context.user_data["render_profile"] = name
+    await update.message.reply_text(f"✅ Perfil de render: <b>{esc(name)}</b>", parse_mode="HTML")
+
+def fmt_rate(x) -> str:
+    return "—" if x is None else pct(x)
+
+def fmt_int(n) -> str:
+    return f"{int(n or 0):,}".replace(",", ".")
+
+def metrics_summary() -> str:
+    if METRICS_STORE.as_of is None:
+        return "📊 Sem métricas ainda. Importe com <code>python scripts/ingest_metrics.py export.csv</code>."
+    lines = [f"<b>📊 Métricas</b> (até {esc(METRICS_STORE.as_of)})"]
+    for w in WINDOWS:
+        t = METRICS_STORE.totals(w)
+        lines.append(f"<b>{w}d</b>: {fmt_int(t['views'])} views | CTR {fmt_rate(t['ctr'])} | Conv {fmt_rate(t['conv'])} | "
+                     f"{fmt_int(t['orders'])} pedidos | {esc(fmt_money(t['revenue'] or 0))}")
+    top = METRICS_STORE.top(7, "views", 5)
+    if top:
+        lines.append("\n<b>Top 7d por views</b>")
+        lines += [f"• {esc(r['sku'])}: {fmt_int(r['views'])} views | CTR {fmt_rate(r['ctr'])} | Conv {fmt_rate(r['conv'])}"
+                  for r in top]
+    lines.append("\nDetalhe: <code>/metrics SKU</code>")
+    return "\n".join(lines)
+
+def fmt_cv() -> str:
+    return " | ".join(f"{f}_cv={FORECASTER.cv[f]:g}" for f in CV_FIELDS)
+
+async def cmd_forecast(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    args = list(context.args)
+    q = parse_quantile(args[0]) if args else None
+    if q is not None:
+        args = args[1:]
+    q = q or 0.5
+    term = " ".join(args)
+    with CATALOG_STORE.lock:
+        rows = ROI_ENGINE.rows_for(CATALOG_INDEX.search(term)) if term else None
+        ranked = FORECASTER.top_k(10, q=q, rows=rows)
+    if not ranked:
+        await update.message.reply_text(
+            "Use: <code>/forecast [p10|p50|p90] [termo]</code>" + (f"\nNada encontrado para <b>{esc(term)}</b>." if term else ""),
+            parse_mode="HTML"); return
+    lines = [f"<b>🎲 Previsão</b> (ranking por P{round(q * 100)}, {FORECASTER.draws:,} cenários)".replace(",", ".") +
+             (f" para “{esc(term)}”" if term else ""), esc(fmt_cv())]
+    for i, s in enumerate(ranked, 1):
+        flag = "⚠️" if s["stockout"] >= 0.5 else "✅"
+        lines.append(
+            f"<b>{i}.</b> {esc(s['name'])} ({esc(s['sku'])})\n"
+            f"  Lucro P10 {esc(fmt_money(s['p10']))} | P50 {esc(fmt_money(s['p50']))} | P90 {esc(fmt_money(s['p90']))}\n"
+            f"  Estoque: {s['stock']} {flag} ruptura {s['stockout']:.0%}")
+    await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+
+async def cmd_metrics(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await update.message.reply_text(metrics_summary(), parse_mode="HTML"); return
+    sku = context.args[0].upper()
+    m = METRICS_STORE.sku_metrics(sku)
+    if not m:
+        await update.message.reply_text(f"Sem métricas para {esc(sku)}.", parse_mode="HTML"); return
+    lines = [f"<b>📊 {esc(sku)}</b>"]
+    for w in WINDOWS:
+        r = m.get(w)
+        if r:
+            lines.append(f"<b>{w}d</b>: {fmt_int(r['views'])} views | {r['posts']} vídeos | CTR {fmt_rate(r['ctr'])} | "
+                         f"Conv {fmt_rate(r['conv'])} | {fmt_int(r['orders'])} pedidos | {esc(fmt_money(r['revenue']))}")
+    trend = m.get(7, {}).get("trend_7d")
+    if trend is not None:
+        lines.append(f"Tendência 7d vs. 7d anteriores: {trend:+.0%}")
+    obs = OBSERVED.get(sku, {})
+    lines.append("Config no ROI: " + esc(fmt_cfg(cfg_for_sku(sku))) +
+                 (f"\n(observado: {esc(', '.join(obs))}" + ("; override manual vence" if sku in STATE.per_sku else "") + ")"
+                  if obs else "\n(amostra pequena: vale a config)"))
+    await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+
+async def cmd_catalog(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    st = CATALOG_STORE.last
+    msg = f"🗂️ Catálogo: <b>{len(CATALOG_STORE)}</b> SKUs"
+    if st:
+        msg += (f"\nÚltimo refresh ({esc(st.source)}): {st.seen} lidos | +{st.added} novos | "
+                f"~{st.changed} alterados | -{st.removed} removidos | {st.seconds:.1f}s")
+    await update.message.reply_text(msg, parse_mode="HTML")
+
+async def _post_init(app):
+    await RENDER_QUEUE.start()
+    provider = provider_from_env()
+    if provider:
+        app.create_task(catalog_refresher(provider))
+    app.create_task(metrics_refresher())
+
+async def _post_shutdown(app):
+    await RENDER_QUEUE.stop()
+
 def main():
     if not TOKEN:
         raise SystemExit("TELEGRAM_BOT_TOKEN ausente no .env")
-    app = ApplicationBuilder().token(TOKEN).build()
+    app = ApplicationBuilder().token(TOKEN).post_init(_post_init).post_shutdown(_post_shutdown).build()
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("showconfig", cmd_showconfig))
     app.add_handler(CommandHandler("config", cmd_config))
     app.add_handler(CommandHandler("configsku", cmd_configsku))
     app.add_handler(CommandHandler("search", cmd_search))
     app.add_handler(CommandHandler("remix", cmd_remix))
+    app.add_handler(CommandHandler("bulkremix", cmd_bulkremix))
+    app.add_handler(CommandHandler("job", cmd_job))
+    app.add_handler(CommandHandler("profile", cmd_profile))
+    app.add_handler(CommandHandler("stats", cmd_stats))
+    app.add_handler(CommandHandler("catalog", cmd_catalog))
+    app.add_handler(CommandHandler("metrics", cmd_metrics))
+    app.add_handler(CommandHandler("forecast", cmd_forecast))
     app.add_handler(CallbackQueryHandler(button))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
+    app.add_handler(MessageHandler(filters.Document.ALL, handle_document))
     app.run_polling()
 
 if __name__ == '__main__':
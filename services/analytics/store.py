@@ -0,0 +1,218 @@
+from pathlib import Path
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+import os, sqlite3, threading
+
+METRICS_DB = Path(os.getenv("METRICS_DB", ".cache/metrics.db"))  # estado local, fora do git
+METRICS = ("views", "likes", "shares", "clicks", "orders", "revenue")
+WINDOWS = (1, 7, 30)
+# amostra mínima p/ confiar no observado (abaixo disso fica o valor da config)
+MIN_VIEWS_CTR = 2000
+MIN_CLICKS_CONV = 50
+MIN_POSTS = 3
+
+_COLS = ", ".join(METRICS)
+_ZERO = (0,) * len(METRICS)
+
+def _day(d) -> str:
+    return d if isinstance(d, str) else d.isoformat()
+
+def _shift(day: str, n: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=n)).isoformat()
+
+def derive(m: Mapping) -> Dict:
+    """Taxas a partir dos totais (None sem base)."""
+    views, clicks = m.get("views") or 0, m.get("clicks") or 0
+    return {**m, "ctr": clicks / views if views else None, "conv": (m.get("orders") or 0) / clicks if clicks else None}
+
+class MetricsStore:
+    """Métricas diárias por vídeo/SKU em SQLite com rollups mantidos no insert.
+
+    - video_daily: uma linha por (vídeo, dia) — reenviar o mesmo dia substitui (entra só o delta)
+    - sku_daily:   soma por (SKU, dia) + `posts` (vídeos vistos pela primeira vez no dia)
+    - sku_window:  totais dos últimos 1/7/30 dias até `as_of` (último dia visto); quando `as_of`
+                   avança, só os dias que saem da janela são subtraídos
+    Consultas do bot leem sku_window direto (uma linha por SKU/janela).
+    """
+    def __init__(self, path: Path | str = METRICS_DB):
+        self.path = path
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        m = ", ".join(f"{c} {'REAL' if c == 'revenue' else 'INTEGER'} NOT NULL DEFAULT 0" for c in METRICS)
+        self.db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS videos (video_id TEXT PRIMARY KEY, sku TEXT NOT NULL, posted TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS video_daily (video_id TEXT NOT NULL, sku TEXT NOT NULL, day TEXT NOT NULL, {m},
+                PRIMARY KEY (video_id, day));
+            CREATE TABLE IF NOT EXISTS sku_daily (sku TEXT NOT NULL, day TEXT NOT NULL, posts INTEGER NOT NULL DEFAULT 0, {m},
+                PRIMARY KEY (sku, day));
+            CREATE INDEX IF NOT EXISTS sku_daily_day ON sku_daily(day);
+            CREATE TABLE IF NOT EXISTS sku_window (sku TEXT NOT NULL, win INTEGER NOT NULL, posts INTEGER NOT NULL DEFAULT 0, {m},
+                PRIMARY KEY (sku, win));
+            CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def as_of(self) -> Optional[str]:
+        r = self.db.execute("SELECT v FROM meta WHERE k = 'as_of'").fetchone()
+        return r[0] if r else None
+
+    # ---- escrita ----
+    def _advance(self, old: Optional[str], new: str):
+        """Move as_of: tira das janelas os dias (old-w, new-w] de cada uma."""
+        if old is not None:
+            for w in WINDOWS:
+                lo, hi = _shift(old, -w), _shift(new, -w)
+                gone = self.db.execute(
+                    f"SELECT sku, sum(posts), {', '.join(f'sum({c})' for c in METRICS)} FROM sku_daily "
+                    "WHERE day > ? AND day <= ? GROUP BY sku", (lo, hi)).fetchall()
+                self.db.executemany(
+                    f"UPDATE sku_window SET posts = posts - ?, {', '.join(f'{c} = {c} - ?' for c in METRICS)} "
+                    "WHERE sku = ? AND win = ?", [(*r[1:], r[0], w) for r in gone])
+        self.db.execute("INSERT INTO meta VALUES ('as_of', ?) ON CONFLICT(k) DO UPDATE SET v = excluded.v", (new,))
+
+    def add(self, rows: Iterable[Mapping]) -> int:
+        """Grava métricas diárias: dicts com video_id, sku, day (AAAA-MM-DD) e os campos de METRICS."""
+        rows = [{**r, "sku": str(r["sku"]).upper(), "day": _day(r["day"])} for r in rows]
+        if not rows:
+            return 0
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                old_asof = self.as_of
+                asof = max([old_asof or ""] + [r["day"] for r in rows])
+                if asof != old_asof:
+                    self._advance(old_asof, asof)
+                deltas: Dict[Tuple[str, str], List[float]] = {}
+                for r in rows:
+                    vals = tuple(r.get(c) or 0 for c in METRICS)
+                    key = (r["video_id"], r["day"])
+                    prev = self.db.execute(f"SELECT {_COLS} FROM video_daily WHERE video_id = ? AND day = ?", key).fetchone()
+                    self.db.execute(
+                        f"INSERT INTO video_daily (video_id, sku, day, {_COLS}) VALUES (?, ?, ?, {', '.join('?' * len(METRICS))}) "
+                        f"ON CONFLICT(video_id, day) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in METRICS)}",
+                        (r["video_id"], r["sku"], r["day"], *vals))
+                    new_video = self.db.execute("INSERT OR IGNORE INTO videos VALUES (?, ?, ?)",
+                                                (r["video_id"], r["sku"], r["day"])).rowcount
+                    d = deltas.setdefault((r["sku"], r["day"]), [0] * (len(METRICS) + 1))
+                    d[0] += new_video
+                    for i, (v, p) in enumerate(zip(vals, prev or _ZERO)):
+                        d[i + 1] += v - p
+                sets = ", ".join(f"{c} = {c} + excluded.{c}" for c in ("posts",) + METRICS)
+                ph = ", ".join("?" * (len(METRICS) + 3))
+                self.db.executemany(
+                    f"INSERT INTO sku_daily (sku, day, posts, {_COLS}) VALUES ({ph}) "
+                    f"ON CONFLICT(sku, day) DO UPDATE SET {sets}", [(s, dy, *d) for (s, dy), d in deltas.items()])
+                win: Dict[Tuple[str, int], List[float]] = {}
+                for (s, dy), d in deltas.items():
+                    for w in WINDOWS:
+                        if dy > _shift(asof, -w):
+                            acc = win.setdefault((s, w), [0] * len(d))
+                            for i, v in enumerate(d):
+                                acc[i] += v
+                self.db.executemany(
+                    f"INSERT INTO sku_window (sku, win, posts, {_COLS}) VALUES ({ph}) "
+                    f"ON CONFLICT(sku, win) DO UPDATE SET {sets}", [(s, w, *d) for (s, w), d in win.items()])
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def rebuild(self):
+        """Recalcula sku_window do zero a partir de sku_daily (conferência/reparo)."""
+        with self.lock:
+            asof = self.as_of
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM sku_window")
+            if asof:
+                for w in WINDOWS:
+                    self.db.execute(
+                        f"INSERT INTO sku_window (sku, win, posts, {_COLS}) SELECT sku, ?, sum(posts), "
+                        f"{', '.join(f'sum({c})' for c in METRICS)} FROM sku_daily WHERE day > ? AND day <= ? GROUP BY sku",
+                        (w, _shift(asof, -w), asof))
+            self.db.execute("COMMIT")
+
+    # ---- leitura ----
+    def _window_rows(self, where: str = "", args: tuple = ()) -> List[Dict]:
+        cur = self.db.execute(f"SELECT sku, win, posts, {_COLS} FROM sku_window {where}", args)
+        names = [c[0] for c in cur.description]
+        return [dict(zip(names, r)) for r in cur.fetchall()]
+
+    def sku_metrics(self, sku: str) -> Dict[int, Dict]:
+        """{janela: totais + ctr/conv} e `trend_7d` (views 7d vs. 7d anteriores)."""
+        sku = sku.upper()
+        with self.lock:
+            out = {r["win"]: derive(r) for r in self._window_rows("WHERE sku = ?", (sku,))}
+            asof = self.as_of
+            prev = self.db.execute("SELECT sum(views) FROM sku_daily WHERE sku = ? AND day > ? AND day <= ?",
+                                   (sku, _shift(asof, -14), _shift(asof, -7))).fetchone()[0] if asof else None
+        if 7 in out:
+            out[7]["trend_7d"] = (out[7]["views"] / prev - 1) if prev else None
+        return out
+
+    def totals(self, win: int = 7) -> Dict:
+        with self.lock:
+            cur = self.db.execute(f"SELECT count(*) AS skus, sum(posts) AS posts, "
+                                  f"{', '.join(f'sum({c}) AS {c}' for c in METRICS)} FROM sku_window WHERE win = ?", (win,))
+            r = dict(zip([c[0] for c in cur.description], cur.fetchone()))
+        return derive(r)
+
+    def top(self, win: int = 7, by: str = "views", k: int = 10) -> List[Dict]:
+        if by not in METRICS + ("posts",):
+            raise ValueError(f"métrica inválida: {by}")
+        with self.lock:
+            rows = self._window_rows(f"WHERE win = ? ORDER BY {by} DESC, sku LIMIT ?", (win, k))
+        return [derive(r) for r in rows]
+
+    @staticmethod
+    def _cfg_from(r: Mapping, win: int) -> Dict:
+        cfg = {}
+        if r["views"] >= MIN_VIEWS_CTR:
+            cfg["ctr"] = r["clicks"] / r["views"]
+        if r["clicks"] >= MIN_CLICKS_CONV:
+            cfg["conv"] = r["orders"] / r["clicks"]
+        if r["posts"] >= MIN_POSTS:
+            # vpd é inteiro no modelo: avg_views compensa p/ vpd*avg_views = views/dia observadas
+            cfg["vpd"] = max(1, round(r["posts"] / win))
+            cfg["avg_views"] = int(r["views"] / (cfg["vpd"] * win))
+        return cfg
+
+    def observed_cfg(self, sku: str, win: int = 30) -> Dict:
+        """Campos de config (ctr, conv, vpd, avg_views) medidos, só os com amostra suficiente."""
+        with self.lock:
+            rows = self._window_rows("WHERE sku = ? AND win = ?", (sku.upper(), win))
+        return self._cfg_from(rows[0], win) if rows else {}
+
+    def observed_all(self, win: int = 30) -> Dict[str, Dict]:
+        with self.lock:
+            rows = self._window_rows("WHERE win = ?", (win,))
+        out = {}
+        for r in rows:
+            cfg = self._cfg_from(r, win)
+            if cfg:
+                out[r["sku"]] = cfg
+        return out
+
+def layered_cfg(observed: Mapping[str, Mapping], manual: Mapping[str, Mapping]) -> Dict[str, Dict]:
+    """Overrides por SKU efetivos: global -> observado -> manual (/configsku vence)."""
+    out = {k: dict(v) for k, v in observed.items()}
+    for sku, ov in manual.items():
+        out[sku.upper()] = {**out.get(sku.upper(), {}), **ov}
+    return out
+
+_stores: Dict[str, MetricsStore] = {}
+_stores_lock = threading.Lock()
+
+def get_metrics_store(path: Path | str = METRICS_DB) -> MetricsStore:
+    with _stores_lock:
+        key = str(path)
+        if key not in _stores:
+            _stores[key] = MetricsStore(path)
+        return _stores[key]
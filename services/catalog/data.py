@@ -0,0 +1,11 @@
+from typing import Dict, List
+
+# catálogo MOCK: vale no bot até o CATALOG_SOURCE real carregar e é o padrão do batch_render.
+# Módulo só de dados — importar daqui não puxa telegram nem o estado do bot.
+CATALOG: List[Dict] = [
+    {"sku": "EL-TRIMPRO", "name": "Aparador Pro 5-em-1", "stock": 520, "price": 129.90},
+    {"sku": "HM-STEAMX", "name": "Vaporizador Portátil X", "stock": 140, "price": 189.00},
+    {"sku": "KT-AIRFRY", "name": "AirFryer Mini 2L",       "stock": 980, "price": 249.00},
+    {"sku": "SP-GLUTES", "name": "Elástico Glúteos Pro",   "stock": 85,  "price": 69.90 },
+    {"sku": "PT-LINTGO", "name": "Removedor de Fiapos",    "stock": 360, "price": 79.90 },
+]
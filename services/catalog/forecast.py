@@ -0,0 +1,138 @@
+from typing import Dict, List, Mapping, Optional, Sequence
+import numpy as np
+
+from services.catalog.roi import RoiEngine
+
+CV_FIELDS = ("avg_views", "ctr", "conv")
+DEFAULT_CV = {"avg_views": 0.8, "ctr": 0.35, "conv": 0.4}   # coeficiente de variação de cada parâmetro
+N_DRAWS = 10_000
+
+def sigma2(cv) -> np.ndarray:
+    """Variância do log de uma lognormal com média preservada e coeficiente de variação `cv`."""
+    return np.log1p(np.square(cv))
+
+def parse_quantile(s: str) -> Optional[float]:
+    """'p10' -> 0.10, 'p95' -> 0.95; None se não for quantil."""
+    s = s.strip().lower()
+    if len(s) > 1 and s[0] == "p" and s[1:].isdigit() and 0 < int(s[1:]) < 100:
+        return int(s[1:]) / 100
+    return None
+
+class Forecaster:
+    """Previsão de lucro por Monte Carlo sobre as colunas do RoiEngine.
+
+    avg_views, ctr e conv viram lognormais independentes (média = valor da config, cv global ou
+    `<campo>_cv` nos overrides por SKU); demanda = vpd*days*avg_views*ctr*conv e vendas = min(estoque,
+    demanda). O produto de lognormais é lognormal, então a demanda de cada SKU é exp(mu + s*Z) com um
+    único Z. Com números aleatórios comuns (os mesmos N_DRAWS valores de Z, ordenados, p/ todos os
+    SKUs) o lucro é monótono em Z: o quantil q dos 10k sorteios é o lucro no Z de posição q e a chance
+    de ruptura é um searchsorted — resultado idêntico ao da matriz SKUs x sorteios, em O(SKUs).
+    `simulate` faz a matriz completa em blocos (sorteios independentes por campo) p/ conferência.
+    """
+    def __init__(self, engine: RoiEngine, cv: Mapping[str, float] | None = None,
+                 draws: int = N_DRAWS, seed: int = 42):
+        self.engine = engine
+        self.draws, self.seed = draws, seed
+        self.z = np.sort(np.random.default_rng(seed).standard_normal(draws))
+        self.set_cv(cv)
+
+    def set_cv(self, cv: Mapping[str, float] | None):
+        self.cv = {**DEFAULT_CV, **{f: float(v) for f, v in (cv or {}).items() if f in DEFAULT_CV}}
+        self._key = None
+
+    def _params(self):
+        """(mu, s) do log da demanda por SKU; recalcula só quando o engine/cv mudam."""
+        e = self.engine
+        if self._key != e.version:
+            n = len(e)
+            s2 = {f: np.full(n, sigma2(self.cv[f])) for f in CV_FIELDS}
+            for sku, ov in e.per_sku.items():
+                row = e.row_of.get(sku)
+                if row is None:
+                    continue
+                for f in CV_FIELDS:
+                    if f"{f}_cv" in ov:
+                        s2[f][row] = sigma2(float(ov[f"{f}_cv"]))
+            c = e.cfg
+            base = (c["vpd"] * c["days"]).astype(np.float64) * c["avg_views"] * c["ctr"] * c["conv"]
+            self._s2 = s2
+            total = s2["avg_views"] + s2["ctr"] + s2["conv"]
+            with np.errstate(divide="ignore"):
+                self._mu = np.log(base) - total / 2
+            self._s = np.sqrt(total)
+            self._key = e.version
+        return self._mu, self._s
+
+    def _profit(self, demand: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        e = self.engine
+        return np.minimum(e.stock[rows], demand) * e.price[rows] * e.cfg["margin"][rows]
+
+    def _rows(self, rows) -> np.ndarray:
+        return np.arange(len(self.engine)) if rows is None else np.asarray(rows, dtype=np.int64)
+
+    def quantile(self, q: float, rows: Sequence[int] | np.ndarray | None = None) -> np.ndarray:
+        """Lucro no quantil q (0–1) de cada SKU."""
+        rows = self._rows(rows)
+        mu, s = self._params()
+        zq = self.z[min(int(np.ceil(q * self.draws)) - 1, self.draws - 1) if q > 0 else 0]  # inverted_cdf
+        return self._profit(np.exp(mu[rows] + s[rows] * zq), rows)
+
+    def stockout(self, rows: Sequence[int] | np.ndarray | None = None) -> np.ndarray:
+        """P(demanda > estoque)."""
+        rows = self._rows(rows)
+        mu, s = self._params()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (np.log(self.engine.stock[rows]) - mu[rows]) / s[rows]
+        t = np.where(s[rows] > 0, t, np.where(np.exp(mu[rows]) > self.engine.stock[rows], -np.inf, np.inf))
+        return (self.draws - np.searchsorted(self.z, t, side="right")) / self.draws
+
+    def forecast(self, rows: Sequence[int] | np.ndarray | None = None,
+                 quantiles: Sequence[float] = (0.1, 0.5, 0.9)) -> Dict[str, np.ndarray]:
+        out = {f"p{round(q * 100)}": self.quantile(q, rows) for q in quantiles}
+        out["stockout"] = self.stockout(rows)
+        return out
+
+    def simulate(self, rows: Sequence[int] | np.ndarray | None = None, quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+                 chunk: int = 512, common: bool = False, seed: int | None = None) -> Dict[str, np.ndarray]:
+        """Matriz completa SKUs x sorteios em blocos de `chunk` SKUs. `common=True` usa o Z comum
+        (mesmo resultado de `forecast`); senão sorteia cada campo independente por SKU."""
+        rows = self._rows(rows)
+        mu, s = self._params()
+        rng = np.random.default_rng(self.seed + 1 if seed is None else seed)
+        e = self.engine
+        out = {f"p{round(q * 100)}": np.empty(len(rows)) for q in quantiles}
+        out["stockout"] = np.empty(len(rows))
+        for a in range(0, len(rows), chunk):
+            r = rows[a:a + chunk]
+            if common:
+                demand = np.exp(mu[r, None] + s[r, None] * self.z[None, :])
+            else:
+                c = e.cfg
+                demand = ((c["vpd"][r] * c["days"][r]).astype(np.float64) * c["avg_views"][r]
+                          * c["ctr"][r] * c["conv"][r])[:, None] * np.ones((1, self.draws))
+                for f in CV_FIELDS:
+                    s2 = self._s2[f][r][:, None]
+                    demand *= np.exp(np.sqrt(s2) * rng.standard_normal((len(r), self.draws)) - s2 / 2)
+            stock = e.stock[r][:, None]
+            profit = np.minimum(stock, demand) * (e.price[r] * e.cfg["margin"][r])[:, None]
+            for q in quantiles:
+                out[f"p{round(q * 100)}"][a:a + len(r)] = np.quantile(profit, q, axis=1, method="inverted_cdf")
+            out["stockout"][a:a + len(r)] = (demand > stock).mean(axis=1)
+        return out
+
+    def top_k(self, k: int = 10, q: float = 0.5, rows: Sequence[int] | np.ndarray | None = None) -> List[Dict]:
+        """Os k melhores pelo lucro no quantil q; empate: menor chance de ruptura, depois ordem do catálogo."""
+        idx = self._rows(rows)
+        if len(idx) == 0 or k <= 0:
+            return []
+        score = self.quantile(q, idx)
+        risk = self.stockout(idx)
+        order = np.lexsort((idx, risk, -score))[:k]
+        sel = idx[order]
+        fc = self.forecast(sel)
+        out = []
+        for j, i in enumerate(sel):
+            row = self.engine.row(int(i))
+            row.update({name: float(v[j]) for name, v in fc.items()}, score=float(score[order][j]))
+            out.append(row)
+        return out
@@ -0,0 +1,180 @@
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Mapping
+import unicodedata
+
+# acima disso um lote reordena o índice de estoque uma vez (≈ O(n)) em vez de n inserções
+# ordenadas (cada uma O(n) de memmove); o ponto de troca medido fica perto de 2k linhas
+BULK_MIN_ROWS = 2000
+
+def normalize(s: str) -> str:
+    """minúsculas, sem acento, espaços únicos (feito uma vez por produto, não por busca)."""
+    s = str(s)
+    if s.isascii():
+        return " ".join(s.lower().split())
+    s = unicodedata.normalize("NFKD", s)
+    return " ".join("".join(c for c in s if not unicodedata.combining(c)).lower().split())
+
+def trigrams(s: str) -> set:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+class CatalogIndex:
+    """Busca por substring em SKU/nome + filtro de estoque sem varrer o catálogo.
+
+    - Índice invertido de trigramas (texto normalizado): a busca pega a lista do trigrama
+      mais raro do termo e só confirma o substring nesses candidatos.
+    - Termos de 1–2 letras casam com início de palavra (índice de prefixos curtos).
+    - Lista ordenada (estoque, doc) + bisect p/ `estoque >= N`.
+    - `upsert`/`remove` atualizam no lugar; doc alterado ganha id novo e o antigo vira lápide
+      (descartada na verificação e compactada quando passa de 25%).
+    """
+    def __init__(self, rows: Iterable[Mapping] = ()):
+        self._clear()
+        self.bulk_load(rows)
+
+    def bulk_load(self, rows: Iterable[Mapping]):
+        """Carga em lote: mesmo que upsert, mas o índice de estoque é filtrado (pares antigos)
+        e ordenado uma vez só no fim."""
+        self._stock_sorted = False
+        self._stale = Counter()
+        try:
+            for r in rows:
+                self.upsert(r)
+        finally:
+            if self._stale:
+                stale = self._stale
+                keep = []
+                for p in self._by_stock:
+                    if stale[p]:
+                        stale[p] -= 1
+                    else:
+                        keep.append(p)
+                self._by_stock = keep
+            self._by_stock.sort()
+            self._stale = Counter()
+            self._stock_sorted = True
+
+    def apply(self, upserts: Iterable[Mapping], removed: Iterable[str] = ()):
+        """Listener do CatalogStore: linhas novas/alteradas e SKUs removidos. Lote pequeno
+        (refresh incremental) vai linha a linha no índice ordenado; lote grande (carga inicial)
+        reordena uma vez no fim."""
+        upserts = list(upserts)
+        if len(upserts) >= BULK_MIN_ROWS or len(upserts) * 8 > len(self._by_stock):
+            self.bulk_load(upserts)
+        else:
+            for r in upserts:
+                self.upsert(r)
+        for sku in removed:
+            self.remove(sku)
+
+    def _clear(self):
+        self._sku: List[str] = []
+        self._sku_n: List[str] = []
+        self._name_n: List[str] = []
+        self._stock: List[int] = []
+        self._alive = bytearray()
+        self._doc_of: Dict[str, int] = {}
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        self._prefix: Dict[str, List[int]] = defaultdict(list)
+        self._by_stock: List[tuple] = []
+        self._dead = 0
+        self._stock_sorted = True
+        self._stale: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def __contains__(self, sku: str) -> bool:
+        return sku.upper() in self._doc_of
+
+    def upsert(self, row: Mapping):
+        sku = row["sku"].upper()
+        sku_n, name_n, stock = normalize(sku), normalize(row.get("name", "")), int(row.get("stock", 0))
+        old = self._doc_of.get(sku)
+        if old is not None:
+            if self._sku_n[old] == sku_n and self._name_n[old] == name_n:
+                if self._stock[old] != stock:  # só estoque mudou: mexe só no índice ordenado
+                    self._drop_stock(old)
+                    self._stock[old] = stock
+                    self._add_stock(stock, old)
+                return
+            self._kill(old)
+        doc = len(self._sku)
+        self._sku.append(sku); self._sku_n.append(sku_n); self._name_n.append(name_n)
+        self._stock.append(stock); self._alive.append(1)
+        self._doc_of[sku] = doc
+        # \0 separa SKU e nome: nenhum trigrama atravessa os dois campos
+        grams, prefix = self._grams, self._prefix
+        for g in trigrams(f"{sku_n}\0{name_n}"):
+            grams[g].append(doc)
+        for p in {w[:n] for w in f"{sku_n} {name_n}".replace("-", " ").split() for n in (1, 2)}:
+            prefix[p].append(doc)
+        self._add_stock(stock, doc)
+
+    def remove(self, sku: str) -> bool:
+        doc = self._doc_of.pop(sku.upper(), None)
+        if doc is None:
+            return False
+        self._kill(doc, popped=True)
+        return True
+
+    def _add_stock(self, stock: int, doc: int):
+        if self._stock_sorted:
+            insort(self._by_stock, (stock, doc))
+        else:  # bulk_load ordena uma vez no fim
+            self._by_stock.append((stock, doc))
+
+    def _drop_stock(self, doc: int):
+        if not self._stock_sorted:  # bulk_load filtra no fim (list.remove seria O(n) por linha)
+            self._stale[(self._stock[doc], doc)] += 1; return
+        i = bisect_left(self._by_stock, (self._stock[doc], doc))
+        del self._by_stock[i]
+
+    def _kill(self, doc: int, popped: bool = False):
+        if not popped:
+            self._doc_of.pop(self._sku[doc], None)
+        self._drop_stock(doc)
+        self._alive[doc] = 0
+        self._dead += 1
+        if self._dead > 1000 and self._dead * 4 > len(self._sku):
+            self._compact()
+
+    def _compact(self):
+        live = [{"sku": self._sku[d], "name": self._name_n[d], "stock": self._stock[d]}
+                for d in range(len(self._sku)) if self._alive[d]]
+        self._clear()
+        self.bulk_load(live)  # nome já normalizado: normalize() é idempotente
+
+    def _candidates(self, term: str) -> List[int]:
+        if len(term) >= 3:
+            lists = [self._grams.get(g) for g in trigrams(term)]  # .get: não cria chave vazia
+            if any(l is None for l in lists):
+                return []
+            return min(lists, key=len)
+        return self._prefix.get(term, ())
+
+    def search(self, term: str = "", min_stock: int | None = None, limit: int | None = None) -> List[str]:
+        """SKUs que casam com `term` (substring em SKU ou nome) e têm estoque >= `min_stock`,
+        na ordem de inserção no índice."""
+        t = normalize(term)
+        alive, stock = self._alive, self._stock
+        if t:
+            cands = self._candidates(t)
+            sku_n, name_n = self._sku_n, self._name_n
+            if len(t) >= 3:
+                docs = [d for d in cands if alive[d] and (t in sku_n[d] or t in name_n[d])]
+            else:
+                docs = [d for d in cands if alive[d]]
+            if min_stock is not None:
+                docs = [d for d in docs if stock[d] >= min_stock]
+        elif min_stock is not None:
+            i = bisect_left(self._by_stock, (min_stock, -1))
+            docs = sorted(d for _, d in self._by_stock[i:])
+        else:
+            docs = [d for d in range(len(self._sku)) if alive[d]]
+        if limit is not None:
+            docs = docs[:limit]
+        return [self._sku[d] for d in docs]
+
+    def count_in_stock(self, min_stock: int) -> int:
+        return len(self._by_stock) - bisect_left(self._by_stock, (min_stock, -1))
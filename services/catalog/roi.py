@@ -0,0 +1,152 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+import numpy as np
+
+CFG_FIELDS = ("vpd", "avg_views", "ctr", "conv", "margin", "days")
+INT_FIELDS = {"vpd", "avg_views", "days"}
+
+class RoiEngine:
+    """ROI do catálogo em colunas NumPy: uma passada vetorizada p/ todos os SKUs.
+
+    Mesma conta do `calc_product_roi` do bot (views -> cliques -> vendas previstas ->
+    teto de estoque -> faturamento -> lucro), com config global + overrides por SKU
+    também em colunas. Os resultados ficam em cache até mudar catálogo ou config.
+    """
+    def __init__(self, products: Iterable[Mapping], global_cfg: Mapping, per_sku: Mapping[str, Mapping] | None = None):
+        products = list(products)
+        n = len(products)
+        # colunas com folga (capacidade dobra): carga em lotes anexa no fim sem recopiar o catálogo;
+        # self.skus/stock/price/cfg[...] são views [:n] desses buffers
+        self._buf = {
+            "skus": np.array([p["sku"].upper() for p in products], dtype=object),
+            "names": np.array([p["name"] for p in products], dtype=object),
+            "stock": np.fromiter((p["stock"] for p in products), dtype=np.int64, count=n),
+            "price": np.fromiter((p["price"] for p in products), dtype=np.float64, count=n),
+            **{f: np.zeros(n, dtype=np.int64 if f in INT_FIELDS else np.float64) for f in CFG_FIELDS},
+        }
+        self._views(n)
+        self.row_of: Dict[str, int] = {s: i for i, s in enumerate(self.skus)}
+        self.version = 0  # muda a cada alteração de catálogo/config (cache de quem lê as colunas)
+        self.set_config(global_cfg, per_sku or {})
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def _views(self, n: int):
+        b = self._buf
+        self.skus, self.names, self.stock, self.price = b["skus"][:n], b["names"][:n], b["stock"][:n], b["price"][:n]
+        self.cfg = {f: b[f][:n] for f in CFG_FIELDS}
+
+    def _reserve(self, need: int):
+        cap = len(self._buf["skus"])
+        if need <= cap:
+            return
+        cap = max(need, 2 * cap, 1024)
+        for c, a in self._buf.items():
+            grown = np.empty(cap, dtype=a.dtype) if a.dtype != object else np.full(cap, None, dtype=object)
+            grown[:len(a)] = a
+            self._buf[c] = grown
+
+    def _fill_cfg(self, lo: int, hi: int, skus: Iterable[str]):
+        """Config global nas linhas [lo, hi) + overrides dos `skus` que tiverem."""
+        for f in CFG_FIELDS:
+            self._buf[f][lo:hi] = self.global_cfg[f]
+        for sku in skus:
+            ov = self.per_sku.get(sku)
+            if ov:
+                row = self.row_of[sku]
+                for f, v in ov.items():
+                    if f in self.cfg:
+                        self._buf[f][row] = v
+
+    def set_config(self, global_cfg: Mapping, per_sku: Mapping[str, Mapping]):
+        self.global_cfg = {f: global_cfg[f] for f in CFG_FIELDS}
+        self.per_sku = {k.upper(): dict(v) for k, v in per_sku.items()}
+        self._fill_cfg(0, len(self.skus), (s for s in self.per_sku if s in self.row_of))
+        self._result: Optional[Dict[str, np.ndarray]] = None
+        self.version += 1
+
+    def apply(self, upserts: Iterable[Mapping], removed: Iterable[str] = ()):
+        """Atualização incremental (listener do CatalogStore): altera linhas existentes no lugar,
+        anexa as novas no fim dos buffers (O(lote) amortizado) e compacta só quando há remoções
+        (o CatalogStore manda as remoções uma vez, no último lote do refresh)."""
+        new = []
+        for p in upserts:
+            i = self.row_of.get(p["sku"].upper())
+            if i is None:
+                new.append(p)
+            else:
+                self.names[i], self.stock[i], self.price[i] = p["name"], p["stock"], p["price"]
+        gone = [self.row_of[s.upper()] for s in removed if s.upper() in self.row_of]
+        n = len(self.skus)
+        if gone:
+            keep = np.ones(n, dtype=bool)
+            keep[gone] = False
+            m = int(keep.sum())
+            for c, a in self._buf.items():
+                a[:m] = a[:n][keep]
+                if a.dtype == object:
+                    a[m:n] = None
+            n = m
+            self.row_of = {s: i for i, s in enumerate(self._buf["skus"][:n])}
+        if new:
+            k = len(new)
+            self._reserve(n + k)
+            b = self._buf
+            b["skus"][n:n + k] = [p["sku"].upper() for p in new]
+            b["names"][n:n + k] = [p["name"] for p in new]
+            b["stock"][n:n + k] = np.fromiter((p["stock"] for p in new), dtype=np.int64, count=k)
+            b["price"][n:n + k] = np.fromiter((p["price"] for p in new), dtype=np.float64, count=k)
+            self.row_of.update((s, n + j) for j, s in enumerate(b["skus"][n:n + k]))
+            n += k
+            self._fill_cfg(n - k, n, b["skus"][n - k:n])
+        self._views(n)
+        self._result = None
+        self.version += 1
+
+    def compute(self) -> Dict[str, np.ndarray]:
+        if self._result is None:
+            c = self.cfg
+            monthly_views = (c["vpd"] * c["avg_views"] * c["days"]).astype(np.float64)
+            clicks = monthly_views * c["ctr"]
+            # np.rint arredonda meio p/ par, igual ao round() do Python
+            predicted = np.rint(clicks * c["conv"]).astype(np.int64)
+            cap = np.minimum(self.stock, predicted)
+            gross = cap * self.price
+            self._result = {"predicted_sales": predicted, "cap_sales": cap, "gross": gross,
+                            "profit": gross * c["margin"]}
+        return self._result
+
+    def rows_for(self, skus: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.row_of[s.upper()] for s in skus if s.upper() in self.row_of), dtype=np.int64)
+
+    def top_k(self, k: int = 10, rows: Sequence[int] | np.ndarray | None = None, min_stock: int | None = None) -> List[Dict]:
+        """Os k melhores por (lucro, vendas com teto, estoque) desc; empate mantém a ordem do catálogo.
+        `rows` restringe a um subconjunto (ex.: resultado da busca)."""
+        r = self.compute()
+        idx = np.arange(len(self.skus)) if rows is None else np.asarray(rows, dtype=np.int64)
+        if min_stock is not None:
+            idx = idx[self.stock[idx] >= min_stock]
+        if len(idx) == 0 or k <= 0:
+            return []
+        profit = r["profit"][idx]
+        if len(idx) > k:
+            # argpartition acha o k-ésimo lucro em O(n); empates no corte entram todos p/ o desempate
+            kth = profit[np.argpartition(-profit, k - 1)[k - 1]]
+            keep = profit >= kth
+            idx, profit = idx[keep], profit[keep]
+        order = np.lexsort((idx, -self.stock[idx], -r["cap_sales"][idx], -profit))[:k]
+        return [self.row(int(i)) for i in idx[order]]
+
+    def rank(self, rows: Sequence[int] | np.ndarray | None = None) -> List[Dict]:
+        n = len(self.skus) if rows is None else len(rows)
+        return self.top_k(n, rows=rows)
+
+    def row(self, i: int) -> Dict:
+        r = self.compute()
+        return {
+            "sku": self.skus[i], "name": self.names[i], "stock": int(self.stock[i]),
+            "price": float(self.price[i]),
+            "predicted_sales": int(r["predicted_sales"][i]), "cap_sales": int(r["cap_sales"][i]),
+            "gross": float(r["gross"][i]), "profit": float(r["profit"][i]),
+            "cfg": {f: self.cfg[f][i].item() for f in CFG_FIELDS},
+        }
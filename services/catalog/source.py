@@ -0,0 +1,299 @@
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+import csv, json, os, re, threading, time
+
+# ==== registro compacto ====
+
+class ProductRow:
+    """Produto do catálogo com __slots__ (sem __dict__ por linha); lê como dict (`row["sku"]`)."""
+    __slots__ = ("sku", "name", "stock", "price", "digest")
+
+    def __init__(self, sku: str, name: str, stock: int, price: float):
+        self.sku, self.name, self.stock, self.price = sku.strip().upper(), name.strip(), int(stock), float(price)
+        self.digest = hash((self.name, self.stock, self.price))  # só em memória: basta o hash do processo
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict:
+        return {"sku": self.sku, "name": self.name, "stock": self.stock, "price": self.price}
+
+    def __repr__(self) -> str:
+        return f"ProductRow({self.sku!r}, {self.name!r}, stock={self.stock}, price={self.price})"
+
+# nomes de coluna comuns em feeds de fornecedor -> campo
+FIELD_ALIASES = {
+    "sku": ("sku", "codigo", "código", "id", "product_id", "variant_sku"),
+    "name": ("name", "nome", "title", "titulo", "título", "product_name"),
+    "stock": ("stock", "estoque", "qty", "quantity", "inventory_quantity", "quantidade"),
+    "price": ("price", "preco", "preço", "sale_price", "valor"),
+}
+
+def _num(v, cast=float):
+    if isinstance(v, (int, float)):
+        return cast(v)
+    s = str(v or "0").strip().replace("R$", "").replace("$", "").replace(" ", "")
+    if cast is int and re.fullmatch(r"-?\d{1,3}([.,]\d{3})+", s):
+        s = re.sub(r"[.,]", "", s)  # estoque "1.200" / "1,200" = milhar
+    elif "," in s and s.rfind(",") > s.rfind("."):  # 1.299,90 / 129,90 -> 1299.90 / 129.90
+        s = s.replace(".", "").replace(",", ".")
+    else:  # 1,299.90 -> 1299.90 (último separador é o ponto)
+        s = s.replace(",", "")
+        if s.count(".") > 1:  # 1.234.567
+            s = s.replace(".", "")
+    return cast(float(s or 0))
+
+def resolve_columns(columns: Iterable[str], mapping: Mapping[str, str] | None = None) -> Dict[str, str]:
+    cols = {c.strip().lower(): c for c in columns}
+    out = {}
+    for field, aliases in FIELD_ALIASES.items():
+        if mapping and field in mapping:
+            out[field] = mapping[field]; continue
+        hit = next((cols[a] for a in aliases if a in cols), None)
+        if hit is None:
+            raise ValueError(f"coluna de '{field}' não encontrada ({', '.join(cols)})")
+        out[field] = hit
+    return out
+
+def row_from(rec: Mapping, cols: Mapping[str, str]) -> Optional[ProductRow]:
+    sku = rec.get(cols["sku"])
+    if not sku:
+        return None
+    return ProductRow(str(sku), str(rec.get(cols["name"]) or ""), _num(rec.get(cols["stock"]), int),
+                      _num(rec.get(cols["price"])))
+
+# ==== provedores ====
+
+class CatalogProvider:
+    """Fonte de catálogo: `iter_rows()` devolve ProductRow em streaming (nunca o feed inteiro em memória)."""
+    name = "base"
+
+    def iter_rows(self) -> Iterator[ProductRow]:
+        raise NotImplementedError
+
+class StaticProvider(CatalogProvider):
+    """Lista em memória (catálogo mock do bot)."""
+    name = "static"
+
+    def __init__(self, products: Iterable[Mapping]):
+        self.products = list(products)
+
+    def iter_rows(self) -> Iterator[ProductRow]:
+        for p in self.products:
+            yield ProductRow(p["sku"], p["name"], p["stock"], p["price"])
+
+class CsvFeedProvider(CatalogProvider):
+    """CSV de fornecedor lido linha a linha; delimitador detectado (`,`/`;`/tab)."""
+    name = "csv"
+
+    def __init__(self, path: Path, mapping: Mapping[str, str] | None = None, encoding: str = "utf-8-sig"):
+        self.path, self.mapping, self.encoding = Path(path), mapping, encoding
+
+    def iter_rows(self) -> Iterator[ProductRow]:
+        with open(self.path, newline="", encoding=self.encoding) as f:
+            head = f.readline()
+            f.seek(0)
+            delim = max((",", ";", "\t"), key=head.count)
+            reader = csv.DictReader(f, delimiter=delim)
+            cols = resolve_columns(reader.fieldnames or [], self.mapping)
+            for rec in reader:
+                row = row_from(rec, cols)
+                if row:
+                    yield row
+
+class JsonlFeedProvider(CatalogProvider):
+    """Um objeto JSON por linha."""
+    name = "jsonl"
+
+    def __init__(self, path: Path, mapping: Mapping[str, str] | None = None):
+        self.path, self.mapping = Path(path), mapping
+
+    def iter_rows(self) -> Iterator[ProductRow]:
+        cols = None
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                cols = cols or resolve_columns(rec.keys(), self.mapping)
+                row = row_from(rec, cols)
+                if row:
+                    yield row
+
+class ShopifyProvider(CatalogProvider):
+    """Admin REST da loja (SHOPIFY_SHOP / SHOPIFY_ACCESS_TOKEN): uma linha por variante, paginado por `Link`."""
+    name = "shopify"
+
+    def __init__(self, shop: str | None = None, token: str | None = None, api_version: str = "2024-07",
+                 page_size: int = 250, session=None):
+        self.shop = shop or os.getenv("SHOPIFY_SHOP")
+        self.token = token or os.getenv("SHOPIFY_ACCESS_TOKEN")
+        self.api_version, self.page_size, self.session = api_version, page_size, session
+
+    def iter_rows(self) -> Iterator[ProductRow]:
+        import requests
+        s = self.session or requests.Session()
+        base = self.shop if self.shop.startswith("http") else f"https://{self.shop}"
+        url = f"{base}/admin/api/{self.api_version}/products.json"
+        params = {"limit": self.page_size, "fields": "id,title,variants"}
+        while url:
+            r = s.get(url, params=params, headers={"X-Shopify-Access-Token": self.token}, timeout=30)
+            r.raise_for_status()
+            for p in r.json().get("products", []):
+                for v in p.get("variants", []):
+                    vt = v.get("title")
+                    name = p["title"] if not vt or vt == "Default Title" else f"{p['title']} - {vt}"
+                    yield ProductRow(v.get("sku") or f"{p['id']}-{v['id']}", name,
+                                     v.get("inventory_quantity") or 0, _num(v.get("price")))
+            m = re.search(r'<([^>]+)>;\s*rel="next"', r.headers.get("Link", ""))
+            url, params = (m.group(1), None) if m else (None, None)
+
+class SupabaseProvider(CatalogProvider):
+    """Tabela via PostgREST (SUPABASE_URL / SUPABASE_KEY), paginada por `Range`."""
+    name = "supabase"
+
+    def __init__(self, url: str | None = None, key: str | None = None, table: str | None = None,
+                 page_size: int = 1000, mapping: Mapping[str, str] | None = None, session=None):
+        self.url = (url or os.getenv("SUPABASE_URL", "")).rstrip("/")
+        self.key = key or os.getenv("SUPABASE_KEY")
+        self.table = table or os.getenv("SUPABASE_CATALOG_TABLE", "products")
+        self.page_size, self.mapping, self.session = page_size, mapping, session
+
+    def iter_rows(self) -> Iterator[ProductRow]:
+        import requests
+        s = self.session or requests.Session()
+        headers = {"apikey": self.key, "Authorization": f"Bearer {self.key}"}
+        start, cols = 0, None
+        while True:
+            r = s.get(f"{self.url}/rest/v1/{self.table}", params={"select": "*", "order": (self.mapping or {}).get("sku", "sku")},
+                      headers={**headers, "Range": f"{start}-{start + self.page_size - 1}"}, timeout=30)
+            r.raise_for_status()
+            page = r.json()
+            for rec in page:
+                cols = cols or resolve_columns(rec.keys(), self.mapping)
+                row = row_from(rec, cols)
+                if row:
+                    yield row
+            if len(page) < self.page_size:
+                return
+            start += self.page_size
+
+def provider_from_env() -> Optional[CatalogProvider]:
+    """CATALOG_SOURCE = csv:caminho | jsonl:caminho | shopify | supabase; vazio/mock = catálogo mock."""
+    src = os.getenv("CATALOG_SOURCE", "").strip()
+    kind, _, arg = src.partition(":")
+    kind = kind.lower()
+    if kind == "csv":
+        return CsvFeedProvider(Path(arg))
+    if kind == "jsonl":
+        return JsonlFeedProvider(Path(arg))
+    if kind == "shopify":
+        return ShopifyProvider()
+    if kind == "supabase":
+        return SupabaseProvider(table=arg or None)
+    if kind in ("", "mock"):
+        return None
+    raise ValueError(f"CATALOG_SOURCE inválido: {src}")
+
+# ==== store com refresh incremental ====
+
+@dataclass
+class RefreshStats:
+    source: str
+    seen: int = 0
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    seconds: float = 0.0
+    refused: int = 0   # remoções barradas pelo limite (feed truncado/vazio?)
+
+class RefreshRefused(RuntimeError):
+    """Refresh completo removeria fração grande demais do catálogo; as remoções não foram aplicadas."""
+    def __init__(self, stats: "RefreshStats", total: int):
+        self.stats = stats
+        super().__init__(f"{stats.source}: feed removeria {stats.refused} de {total} SKUs — remoções ignoradas "
+                         f"(refresh(force=True) p/ aplicar)")
+
+MAX_REMOVED_FRAC = float(os.getenv("CATALOG_MAX_REMOVED", "0.2"))
+
+Listener = Callable[[List[ProductRow], List[str]], None]
+
+class CatalogStore:
+    """Catálogo em memória (sku -> ProductRow) atualizado por diff de hash por linha.
+
+    `refresh` percorre o provedor em streaming e só repassa aos listeners (índice de busca,
+    motor de ROI) as linhas novas/alteradas, em lotes, e no fim os SKUs que sumiram.
+    Listeners rodam sob `lock` — quem lê os índices de outra thread usa o mesmo lock.
+    Um refresh completo da mesma fonte que removeria mais de `max_removed` do catálogo (feed
+    truncado ou vazio) aplica as linhas novas/alteradas mas recusa as remoções (RefreshRefused).
+    """
+    def __init__(self, batch_size: int = 5000, max_removed: float = MAX_REMOVED_FRAC):
+        self.rows: Dict[str, ProductRow] = {}
+        self.batch_size = batch_size
+        self.max_removed = max_removed
+        self.lock = threading.RLock()
+        self.listeners: List[Listener] = []
+        self.last: Optional[RefreshStats] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def subscribe(self, fn: Listener):
+        self.listeners.append(fn)
+
+    def _notify(self, upserts: List[ProductRow], removed: List[str]):
+        with self.lock:
+            for fn in self.listeners:
+                fn(upserts, removed)
+
+    def refresh(self, provider: CatalogProvider, full: bool = True, force: bool = False) -> RefreshStats:
+        """`full=True`: SKUs ausentes do provedor são removidos (feed completo). `force` ignora o
+        limite de remoções (troca de fonte, por exemplo, nunca é barrada)."""
+        t0 = time.perf_counter()
+        st = RefreshStats(source=provider.name)
+        seen = set()
+        batch: List[ProductRow] = []
+        for row in provider.iter_rows():
+            if row.sku in seen:  # SKU repetido no feed: vale a primeira linha
+                continue
+            st.seen += 1
+            seen.add(row.sku)
+            old = self.rows.get(row.sku)
+            if old is not None and old.digest == row.digest:
+                st.unchanged += 1; continue
+            if old is None:
+                st.added += 1
+            else:
+                st.changed += 1
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._apply(batch, []); batch = []
+        gone = [s for s in self.rows if s not in seen] if full else []
+        total = len(self.rows)
+        same_source = self.last is not None and self.last.source == st.source
+        if gone and not force and same_source and len(gone) > self.max_removed * total:
+            st.refused, gone = len(gone), []
+        st.removed = len(gone)
+        if batch or gone:
+            self._apply(batch, gone)
+        st.seconds = round(time.perf_counter() - t0, 3)
+        self.last = st
+        if st.refused:
+            raise RefreshRefused(st, total)
+        return st
+
+    def _apply(self, upserts: List[ProductRow], removed: List[str]):
+        with self.lock:
+            for r in upserts:
+                self.rows[r.sku] = r
+            for s in removed:
+                self.rows.pop(s, None)
+            self._notify(upserts, removed)
+
+    def products(self) -> List[ProductRow]:
+        return list(self.rows.values())
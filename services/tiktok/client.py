@@ -0,0 +1,231 @@
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+import json, os, threading, time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = os.getenv("TIKTOK_API_BASE", "https://open.tiktokapis.com")
+TOKEN_PATH = "/v2/oauth/token/"
+TOKEN_FILE = Path(os.getenv("TIKTOK_TOKEN_FILE", ".cache/tiktok_token.json"))
+REFRESH_SKEW_S = 300  # renova o access_token 5 min antes de expirar
+IDEMPOTENT = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})  # 5xx pode repetir sem duplicar
+
+# (requisições/s, rajada) por prefixo de endpoint; o prefixo mais longo vence.
+# Uploads (upload_url) não passam pelo limitador: a API limita por init, não por chunk.
+RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "/v2/oauth/": (1.0, 5),
+    "/v2/research/": (2.0, 5),
+    "/v2/post/publish/": (1.0, 6),
+    "/v2/video/": (1.0, 6),
+    "": (5.0, 10),
+}
+
+class ApiError(RuntimeError):
+    def __init__(self, status: int, msg: str):
+        super().__init__(f"HTTP {status}: {msg}")
+        self.status = status
+
+class AuthError(ApiError):
+    """Sem token válido (nenhum salvo, refresh recusado): refaça o login em app.py."""
+
+def pooled_session(pool_size: int = 8) -> requests.Session:
+    """Session com pool keep-alive: reaproveita a conexão TCP/TLS entre chamadas e threads."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+# ==== tokens ====
+
+class TokenStore:
+    """Token OAuth em JSON (gravação atômica). `expires_at`/`refresh_expires_at` em epoch."""
+    def __init__(self, path: Path = TOKEN_FILE):
+        self.path = Path(path)
+
+    def load(self) -> Optional[Dict]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, tok: Mapping) -> Dict:
+        now = time.time()
+        data = dict(tok)
+        if "expires_in" in data:
+            data["expires_at"] = now + int(data["expires_in"])
+        if "refresh_expires_in" in data:
+            data["refresh_expires_at"] = now + int(data["refresh_expires_in"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+        return data
+
+# ==== rate limit ====
+
+class TokenBucket:
+    """Balde de fichas thread-safe; `pause` segura todo mundo após um 429 (Retry-After)."""
+    def __init__(self, rate: float, burst: int):
+        self.rate, self.burst = rate, burst
+        self.tokens = float(burst)
+        self.t = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.t) * self.rate)
+                self.t = now
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+class RateLimiter:
+    def __init__(self, limits: Mapping[str, Tuple[float, int]] = RATE_LIMITS):
+        self.limits = dict(limits)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, path: str) -> TokenBucket:
+        prefix = max((p for p in self.limits if path.startswith(p)), key=len)
+        with self.lock:
+            if prefix not in self.buckets:
+                self.buckets[prefix] = TokenBucket(*self.limits[prefix])
+            return self.buckets[prefix]
+
+def retry_after(r: requests.Response, attempt: int, backoff: float) -> float:
+    try:
+        return max(0.0, float(r.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return backoff * 2 ** attempt
+
+# ==== cliente ====
+
+class TikTokClient:
+    """Camada única p/ a API: Session com pool, token persistido com refresh automático
+    e limitador por endpoint com backoff em 429. Thread-safe (compartilhado por uploads/pesquisa)."""
+    def __init__(self, store: TokenStore | None = None, base_url: str | None = None,
+                 client_key: str | None = None, client_secret: str | None = None,
+                 session: requests.Session | None = None, pool_size: int = 16,
+                 limits: Mapping[str, Tuple[float, int]] = RATE_LIMITS,
+                 max_retries: int = 4, backoff: float = 1.0, timeout: float = 30.0):
+        self.store = store or TokenStore()
+        self.base_url = (base_url or API_BASE).rstrip("/")
+        self.client_key = client_key or os.getenv("TIKTOK_CLIENT_ID")
+        self.client_secret = client_secret or os.getenv("TIKTOK_CLIENT_SECRET")
+        self.session = session or pooled_session(pool_size)
+        self.limiter = RateLimiter(limits)
+        self.max_retries, self.backoff, self.timeout = max_retries, backoff, timeout
+        self._tok: Optional[Dict] = None
+        self._tok_lock = threading.Lock()
+        self.throttled = 0
+
+    # ---- tokens ----
+    def _token_request(self, data: Dict) -> Dict:
+        data = {"client_key": self.client_key, **data}
+        if self.client_secret:
+            data["client_secret"] = self.client_secret
+        r = self.request("POST", TOKEN_PATH, auth=False, data=data,
+                         headers={"Content-Type": "application/x-www-form-urlencoded"})
+        tok = r.json()
+        if "access_token" not in tok:
+            raise AuthError(r.status_code, tok.get("error_description") or tok.get("error") or r.text[:200])
+        return self.store.save(tok)
+
+    def exchange_code(self, code: str, verifier: str, redirect_uri: str) -> Dict:
+        """Troca o code do /callback (PKCE) e persiste o token."""
+        with self._tok_lock:
+            self._tok = self._token_request({"grant_type": "authorization_code", "code": code,
+                                             "redirect_uri": redirect_uri, "code_verifier": verifier})
+            return self._tok
+
+    def access_token(self, force_refresh: bool = False) -> str:
+        with self._tok_lock:
+            tok = self._tok = self._tok or self.store.load()
+            if tok is None:
+                env = os.getenv("TIKTOK_ACCESS_TOKEN")
+                if env:  # token fixo do .env (sem refresh)
+                    return env
+                raise AuthError(401, f"nenhum token em {self.store.path}; faça login pelo app.py")
+            if force_refresh or tok.get("expires_at", float("inf")) - time.time() < REFRESH_SKEW_S:
+                if not tok.get("refresh_token") or tok.get("refresh_expires_at", float("inf")) < time.time():
+                    raise AuthError(401, "refresh_token expirado; faça login pelo app.py")
+                self._tok = self._token_request({"grant_type": "refresh_token",
+                                                 "refresh_token": tok["refresh_token"]})
+            return self._tok["access_token"]
+
+    # ---- chamadas ----
+    def url(self, path: str) -> str:
+        return path if path.startswith("http") else self.base_url + path
+
+    def request(self, method: str, path: str, auth: bool = True, limit: bool = True,
+                raise_for_status: bool = True, retry_5xx: bool | None = None, **kw) -> requests.Response:
+        """Chamada com limitador do endpoint, retry em 429 (Retry-After) e um refresh forçado em 401.
+        5xx só é repetido em método idempotente (ou `retry_5xx=True` explícito): um POST de init/publish
+        que o servidor aceitou antes de falhar criaria sessão/rascunho duplicado.
+        `path` pode ser URL absoluta (ex.: upload_url)."""
+        if retry_5xx is None:
+            retry_5xx = method.upper() in IDEMPOTENT
+        bucket = self.limiter.bucket(path) if limit and not path.startswith("http") else None
+        kw.setdefault("timeout", self.timeout)
+        headers = dict(kw.pop("headers", None) or {})
+        refreshed = False
+        for attempt in range(self.max_retries + 1):
+            if bucket:
+                bucket.acquire()
+            if auth:
+                headers["Authorization"] = f"Bearer {self.access_token()}"
+            r = self.session.request(method, self.url(path), headers=headers, **kw)
+            if r.status_code == 401 and auth and not refreshed and self.store.load():
+                refreshed = True
+                self.access_token(force_refresh=True)
+                continue
+            if r.status_code == 429 or (retry_5xx and r.status_code >= 500):
+                if attempt == self.max_retries:
+                    break
+                wait = retry_after(r, attempt, self.backoff)
+                if r.status_code == 429:
+                    self.throttled += 1
+                    if bucket:
+                        bucket.pause(wait)
+                        continue
+                time.sleep(wait)
+                continue
+            break
+        if raise_for_status and r.status_code >= 400:
+            err = AuthError if r.status_code == 401 else ApiError
+            raise err(r.status_code, r.text[:200])
+        return r
+
+    def get(self, path: str, **kw) -> Dict:
+        return self.request("GET", path, **kw).json()
+
+    def post(self, path: str, payload: Dict | None = None, **kw) -> Dict:
+        return self.request("POST", path, json=payload,
+                            headers={"Content-Type": "application/json; charset=UTF-8"}, **kw).json()
+
+_client: Optional[TikTokClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> TikTokClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TikTokClient()
+        return _client
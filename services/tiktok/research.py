@@ -0,0 +1,171 @@
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio, hashlib, json, os, time
+
+from services.tiktok.client import ApiError, TikTokClient, get_client
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sem pyarrow: só JSONL
+    pa = pq = None
+
+LIST_PATH = "/v2/research/video/list/"
+CACHE_DIR = Path(os.getenv("RESEARCH_CACHE_DIR", ".cache/research"))
+DAILY_BUDGET = int(os.getenv("RESEARCH_DAILY_BUDGET", "1000"))  # cota diária de requisições da Research API
+MAX_WINDOW_DAYS = 30   # a API não aceita janelas maiores que 30 dias
+MAX_COUNT = 100
+
+def date_windows(start: date, end: date, days: int = 7) -> List[Tuple[date, date]]:
+    """[start, end] em janelas fechadas de `days` dias (a última pode ser menor)."""
+    days = min(max(days, 1), MAX_WINDOW_DAYS)
+    out, d = [], start
+    while d <= end:
+        w_end = min(d + timedelta(days=days - 1), end)
+        out.append((d, w_end))
+        d = w_end + timedelta(days=1)
+    return out
+
+def _ymd(d: date) -> str:
+    return d.strftime("%Y%m%d")
+
+@dataclass
+class CrawlStats:
+    queries: int = 0
+    windows: int = 0
+    pages: int = 0
+    cached_pages: int = 0
+    requests: int = 0
+    errors: int = 0
+    videos: int = 0
+    duplicates: int = 0
+    budget_exhausted: bool = False
+    incomplete: List[str] = field(default_factory=list)   # "query:AAAAMMDD-AAAAMMDD" não terminadas
+    seconds: float = 0.0
+
+class PageCache:
+    """Páginas de (query, janela, cursor) em JSON, com o `search_id` da busca junto. Só janelas
+    já encerradas (fim < hoje) são gravadas — elas não mudam mais; a janela de hoje é sempre
+    buscada de novo."""
+    def __init__(self, root: Path = CACHE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, query: str, start: date, end: date, max_count: int, cursor: int) -> Path:
+        k = hashlib.sha1(f"{query.strip().lower()}|{_ymd(start)}|{_ymd(end)}|{max_count}".encode()).hexdigest()[:16]
+        return self.root / k / f"{cursor}.json"
+
+    def get(self, *key) -> Optional[Dict]:
+        try:
+            return json.loads(self.path(*key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, page: Dict, *key):
+        p = self.path(*key)
+        p.parent.mkdir(exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        tmp.write_text(json.dumps(page, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+
+class ResearchCrawler:
+    """Crawler assíncrono da Research API: cada (query, janela) é uma tarefa que segue o cursor
+    página a página; `concurrency` limita chamadas simultâneas e `budget` o total de requisições
+    da execução. O limitador por endpoint do TikTokClient segura o ritmo (429/Retry-After)."""
+    def __init__(self, client: TikTokClient | None = None, cache: PageCache | None = None,
+                 concurrency: int = 8, budget: int = DAILY_BUDGET, max_count: int = MAX_COUNT,
+                 today: date | None = None):
+        self.client = client or get_client()
+        self.cache = cache or PageCache()
+        self.concurrency, self.budget = concurrency, budget
+        self.max_count = min(max_count, MAX_COUNT)
+        self.today = today or date.today()
+
+    def _fetch(self, query: str, start: date, end: date, cursor: int, search_id: str | None = None) -> Dict:
+        params = {"query": query, "start_date": _ymd(start), "end_date": _ymd(end),
+                  "max_count": self.max_count, "cursor": cursor}
+        if search_id:  # a API só pagina a mesma busca com o search_id devolvido na 1ª página
+            params["search_id"] = search_id
+        return self.client.get(LIST_PATH, params=params)["data"]
+
+    async def _window(self, query: str, start: date, end: date, sem: asyncio.Semaphore,
+                      st: CrawlStats, sink: List[Dict]):
+        closed = use_cache = end < self.today
+        cursor, search_id, from_cache, first = 0, None, False, len(sink)
+        while True:
+            key = (query, start, end, self.max_count, cursor)
+            page = self.cache.get(*key) if use_cache else None
+            if page is not None:
+                st.cached_pages += 1
+                from_cache = True
+            else:
+                if st.requests >= self.budget:
+                    st.budget_exhausted = True
+                    st.incomplete.append(f"{query}:{_ymd(start)}-{_ymd(end)}")
+                    return
+                st.requests += 1
+                async with sem:
+                    try:
+                        page = await asyncio.to_thread(self._fetch, query, start, end, cursor, search_id)
+                    except ApiError as e:
+                        if from_cache and cursor:
+                            # search_id do cache expirou no servidor: refaz a janela do zero
+                            del sink[first:]
+                            cursor, search_id, from_cache, use_cache = 0, None, False, False
+                            continue
+                        st.errors += 1
+                        st.incomplete.append(f"{query}:{_ymd(start)}-{_ymd(end)} ({e})")
+                        return
+                if closed:
+                    self.cache.put(page, *key)
+            st.pages += 1
+            for v in page.get("videos", []):
+                sink.append({**v, "query": query, "window_start": _ymd(start), "window_end": _ymd(end)})
+            if not page.get("has_more") or not page.get("videos"):
+                return
+            cursor, search_id = page["cursor"], page.get("search_id") or search_id
+
+    async def crawl(self, queries: Iterable[str], start: date, end: date,
+                    window_days: int = 7) -> Tuple[List[Dict], CrawlStats]:
+        """Vídeos de todas as queries x janelas, sem repetir id (vale a primeira query que achou)."""
+        t0 = time.perf_counter()
+        queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+        windows = date_windows(start, end, window_days)
+        st = CrawlStats(queries=len(queries), windows=len(queries) * len(windows))
+        sem = asyncio.Semaphore(self.concurrency)
+        sinks = [[] for _ in range(st.windows)]
+        await asyncio.gather(*(self._window(q, a, b, sem, st, sinks[i * len(windows) + j])
+                               for i, q in enumerate(queries) for j, (a, b) in enumerate(windows)))
+        seen, rows = set(), []
+        for sink in sinks:  # ordem estável: query, depois janela
+            for v in sink:
+                if v["id"] in seen:
+                    st.duplicates += 1; continue
+                seen.add(v["id"])
+                rows.append(v)
+        st.videos = len(rows)
+        st.seconds = round(time.perf_counter() - t0, 3)
+        return rows, st
+
+def write_results(rows: List[Dict], out_dir: Path, stem: str) -> List[Path]:
+    """JSONL sempre; Parquet (colunar) também quando o pyarrow está instalado."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jsonl = out_dir / f"{stem}.jsonl"
+    with open(jsonl, "w", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    written = [jsonl]
+    if pa is not None and rows:
+        cols = list(dict.fromkeys(k for r in rows for k in r))
+        table = pa.table({c: [r.get(c) for r in rows] for c in cols})
+        pq.write_table(table, out_dir / f"{stem}.parquet")
+        written.append(out_dir / f"{stem}.parquet")
+    return written
+
+def crawl(queries: Iterable[str], start: date, end: date, window_days: int = 7,
+          **kw) -> Tuple[List[Dict], CrawlStats]:
+    """Atalho síncrono (scripts/CLI)."""
+    return asyncio.run(ResearchCrawler(**kw).crawl(queries, start, end, window_days))
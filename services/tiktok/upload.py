@@ -0,0 +1,194 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+import io, json, mmap, os, time
+
+import requests
+
+from services.tiktok.client import ApiError, TikTokClient, get_client, retry_after
+
+INIT_PATH = "/v2/post/publish/inbox/video/init/"
+PUBLISH_PATH = "/v2/video/publish/"
+MIN_CHUNK = 5 * 1024 * 1024
+DEFAULT_CHUNK = 10 * 1024 * 1024
+MAX_CHUNK = 64 * 1024 * 1024
+
+class UploadError(RuntimeError):
+    pass
+
+class UploadExpired(UploadError):
+    """upload_url expirou/foi recusada (ex.: retomada depois de horas): precisa de novo init."""
+
+def plan_chunks(size: int, chunk_size: int = DEFAULT_CHUNK) -> List[tuple]:
+    """[(início, fim_inclusivo)]. Regra da API: chunks de 5–64MB, o último absorve o resto;
+    arquivo menor que 5MB vai num chunk só."""
+    if size <= MIN_CHUNK:
+        return [(0, size - 1)]
+    chunk_size = min(max(chunk_size, MIN_CHUNK), MAX_CHUNK)
+    n = max(1, size // chunk_size)
+    return [(i * chunk_size, (size if i == n - 1 else (i + 1) * chunk_size) - 1) for i in range(n)]
+
+class _ChunkReader(io.RawIOBase):
+    """Fatia do mmap lida em blocos pelo http.client (sem copiar o chunk inteiro p/ memória)."""
+    def __init__(self, mm: mmap.mmap, start: int, end: int):
+        self.mm, self.pos, self.end = mm, start, end + 1
+
+    def __len__(self) -> int:
+        return self.end - self.pos
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, n: int = -1) -> bytes:
+        stop = self.end if n is None or n < 0 else min(self.end, self.pos + n)
+        data = self.mm[self.pos:stop]
+        self.pos = stop
+        return data
+
+@dataclass
+class UploadResult:
+    path: str
+    status: str = "pending"        # published | uploaded | error
+    publish_id: Optional[str] = None
+    chunks: int = 0
+    resumed_from: int = 0          # chunks já confirmados de uma tentativa anterior
+    retries: int = 0
+    seconds: float = 0.0
+    publish: Dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+class UploadClient:
+    """Upload em chunks (Content-Range) a partir de um mmap, com retomada e publicação em DRAFT.
+
+    O progresso fica em `{arquivo}.upload.json` (publish_id, upload_url, chunks confirmados):
+    se a conexão cair, a próxima chamada continua do último chunk aceito. init/publish passam
+    pelo TikTokClient (token, limitador); os PUTs usam a mesma Session com pool.
+    """
+    def __init__(self, client: TikTokClient | None = None, chunk_size: int = DEFAULT_CHUNK,
+                 max_retries: int = 5, backoff: float = 1.0, timeout: float = 120.0):
+        self.client = client or get_client()
+        self.chunk_size, self.max_retries, self.backoff, self.timeout = chunk_size, max_retries, backoff, timeout
+
+    # ---- estado de retomada ----
+    @staticmethod
+    def state_path(path: Path) -> Path:
+        return path.with_name(path.name + ".upload.json")
+
+    def _load_state(self, path: Path, size: int, mtime: int) -> Optional[Dict]:
+        sp = self.state_path(path)
+        try:
+            st = json.loads(sp.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if st.get("size") != size or st.get("mtime_ns") != mtime:
+            return None  # arquivo mudou: recomeça
+        return st
+
+    def _save_state(self, path: Path, st: Dict):
+        sp = self.state_path(path)
+        tmp = sp.with_suffix(".tmp")
+        tmp.write_text(json.dumps(st), encoding="utf-8")
+        os.replace(tmp, sp)
+
+    # ---- chamadas ----
+    def _post(self, path: str, payload: Dict) -> Dict:
+        try:
+            return self.client.post(path, payload)
+        except ApiError as e:
+            raise UploadError(f"{path}: {e}") from e
+
+    def init_upload(self, size: int, chunks: List[tuple]) -> Dict:
+        chunk_size = chunks[0][1] - chunks[0][0] + 1
+        data = self._post(INIT_PATH, {"source_info": {
+            "source": "FILE_UPLOAD", "video_size": size,
+            "chunk_size": chunk_size, "total_chunk_count": len(chunks)}})["data"]
+        return {"publish_id": data["publish_id"], "upload_url": data["upload_url"]}
+
+    def _put_chunk(self, mm: mmap.mmap, url: str, start: int, end: int, size: int, res: UploadResult):
+        # direto na Session (o corpo é um stream: não dá p/ reenviar via retry genérico do cliente)
+        for attempt in range(self.max_retries + 1):
+            wait = self.backoff * 2 ** attempt
+            try:
+                r = self.client.session.put(url, data=_ChunkReader(mm, start, end), timeout=self.timeout, headers={
+                    "Content-Type": "video/mp4", "Content-Length": str(end - start + 1),
+                    "Content-Range": f"bytes {start}-{end}/{size}"})
+                if r.status_code in (200, 201, 206):
+                    return
+                if r.status_code in (403, 404, 410):
+                    raise UploadExpired(f"chunk {start}-{end}: HTTP {r.status_code}")
+                if r.status_code < 500 and r.status_code != 429:
+                    raise UploadError(f"chunk {start}-{end}: HTTP {r.status_code} {r.text[:200]}")
+                wait = retry_after(r, attempt, self.backoff)
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+            if attempt == self.max_retries:
+                raise UploadError(f"chunk {start}-{end}: falhou após {self.max_retries} tentativas")
+            res.retries += 1
+            time.sleep(wait)
+
+    def publish(self, publish_id: str) -> Dict:
+        return self._post(PUBLISH_PATH, {"video_id": publish_id, "post_mode": "DRAFT"})
+
+    def upload(self, path: Path, publish: bool = True,
+               on_chunk: Callable[[int, int], None] | None = None) -> UploadResult:
+        """Sobe um arquivo (retomando se houver estado salvo) e publica como DRAFT."""
+        path = Path(path)
+        res = UploadResult(path=str(path))
+        t0 = time.perf_counter()
+        try:
+            stat = path.stat()
+            size = stat.st_size
+            st = self._load_state(path, size, stat.st_mtime_ns)
+            if st is None:
+                chunks = plan_chunks(size, self.chunk_size)
+                st = {"size": size, "mtime_ns": stat.st_mtime_ns, "chunk_size": self.chunk_size, "acked": 0,
+                      **self.init_upload(size, chunks)}
+                self._save_state(path, st)
+            else:  # mesmo plano de chunks informado no init
+                chunks = plan_chunks(size, st["chunk_size"])
+                res.resumed_from = st["acked"]
+            res.publish_id, res.chunks = st["publish_id"], len(chunks)
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for i in range(st["acked"], len(chunks)):
+                    start, end = chunks[i]
+                    self._put_chunk(mm, st["upload_url"], start, end, size, res)
+                    st["acked"] = i + 1
+                    self._save_state(path, st)
+                    if on_chunk:
+                        on_chunk(i + 1, len(chunks))
+            res.status = "uploaded"
+        except UploadExpired as e:
+            if not res.resumed_from:
+                res.status, res.error = "error", repr(e)
+                res.seconds = round(time.perf_counter() - t0, 3)
+                return res
+            self.state_path(path).unlink(missing_ok=True)  # recomeça do zero com upload_url nova
+            return self.upload(path, publish=publish, on_chunk=on_chunk)
+        except (OSError, UploadError, requests.RequestException, KeyError, ValueError) as e:
+            res.status, res.error = "error", repr(e)
+            res.seconds = round(time.perf_counter() - t0, 3)
+            return res
+        try:
+            if publish and not st.get("published"):
+                res.publish = self.publish(st["publish_id"])
+                st["published"] = True
+                self._save_state(path, st)
+            if publish:
+                res.status = "published"
+                self.state_path(path).unlink(missing_ok=True)
+        except (OSError, UploadError, requests.RequestException, KeyError, ValueError) as e:
+            res.status, res.error = "error", repr(e)
+        res.seconds = round(time.perf_counter() - t0, 3)
+        return res
+
+    def upload_many(self, paths: Iterable[Path], workers: int = 3, publish: bool = True,
+                    on_result: Callable[[UploadResult], None] | None = None) -> List[UploadResult]:
+        """Vários arquivos em paralelo na mesma Session do cliente (pool de conexões keep-alive)."""
+        def one(p):
+            r = self.upload(Path(p), publish=publish)
+            if on_result:
+                on_result(r)
+            return r
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(one, paths))
@@ -0,0 +1,105 @@
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+from services.video.srt import Cue, parse_visual_cues
+from services.video.templates import niche_key
+
+PLAY_RES = (1080, 1920)
+
+# cores ASS: &HAABBGGRR (destaque do karaokê por nicho)
+COLORWAYS: Dict[str, str] = {
+    "beleza": "&H00B469FF",   # rosa
+    "saude":  "&H0071D67A",   # verde
+    "tech":   "&H00FFD200",   # ciano
+}
+DEFAULT_HIGHLIGHT = "&H0000E5FF"  # amarelo
+WHITE = "&H00FFFFFF"
+OUTLINE_COLOR = "&H00000000"
+BACK_COLOR = "&H64000000"
+
+def _niche_key(niche: str | None) -> str:
+    # mesma tabela da escolha de template (templates.NICHE_TEMPLATES); sem nicho = destaque padrão
+    return niche_key(niche) if niche else ""
+
+def ass_ts(ms: int) -> str:
+    cs = ms // 10
+    h = cs // 360000; m = (cs % 360000) // 6000; s = (cs % 6000) // 100
+    return f"{h}:{m:02}:{s:02}.{cs % 100:02}"
+
+@lru_cache(maxsize=64)
+def style_header(niche_key: str, cues_items: Tuple[Tuple[str, object], ...]) -> str:
+    """[Script Info] + [V4+ Styles] compilados uma vez por (nicho, visual_cues)."""
+    cues = dict(cues_items)
+    w, h = PLAY_RES
+    scale = float(cues.get("FONT_SCALE", 1.0))
+    outline = int(cues.get("OUTLINE", 2))
+    margin = float(cues.get("SAFE_MARGINS", 0.05))
+    mh, mv = int(w * margin), int(h * margin)
+    hi = COLORWAYS.get(niche_key, DEFAULT_HIGHLIGHT) if cues.get("COLORWAY_BY_NICHE", True) else DEFAULT_HIGHLIGHT
+    fmt = ("Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+           "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+           "Alignment, MarginL, MarginR, MarginV, Encoding")
+
+    def style(name, size, align, mv_):
+        # karaokê: Secondary = ainda não falado, Primary = já falado (destaque)
+        return (f"Style: {name},Arial,{int(size * scale)},{hi},{WHITE},{OUTLINE_COLOR},{BACK_COLOR},"
+                f"-1,0,0,0,100,100,0,0,1,{outline},0,{align},{mh},{mh},{mv_},1")
+
+    return "\n".join([
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {w}",
+        f"PlayResY: {h}",
+        "WrapStyle: 2",            # linhas já vêm quebradas (\N); libass não re-quebra
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        fmt,
+        style("Caption", 72, 2, int(h * 0.30)),   # meio-baixo (mid_caption)
+        style("Hook", 84, 8, mv + 180),          # topo (top_title)
+        style("CTA", 76, 2, mv),                 # base (bottom_cta)
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ])
+
+def _clean(word: str) -> str:
+    return word.replace("\\", "/").replace("{", "(").replace("}", ")")
+
+def karaoke_text(cue: Cue) -> str:
+    """Linhas pré-quebradas com \\k por palavra (duração proporcional ao tamanho da palavra)."""
+    total_cs = max(1, (cue.end_ms - cue.start_ms) // 10)
+    words = [w for line in cue.lines for w in line.split()]
+    weights = [len(w) + 1 for w in words]
+    acc, out_lines, i, used = 0, [], 0, 0
+    total_w = sum(weights) or 1
+    for line in cue.lines:
+        parts = []
+        for w in line.split():
+            acc += weights[i]; i += 1
+            k = round(total_cs * acc / total_w) - used  # cumulativo: sem drift de arredondamento
+            used += k
+            parts.append(f"{{\\k{k}}}{_clean(w)}")
+        out_lines.append(" ".join(parts))
+    return "\\N".join(out_lines)
+
+def _style_for(role: str) -> str:
+    return {"hook": "Hook", "cta": "CTA"}.get(role, "Caption")
+
+def build_ass(
+    cues: Sequence[Cue],
+    out_path: Path,
+    visual_cues: Sequence[str] | Dict | None = None,
+    niche: str | None = None
+) -> Path:
+    """Legenda .ass com estilos nomeados do template; entra direto no grafo único (`ass=`)."""
+    vc = visual_cues if isinstance(visual_cues, dict) else parse_visual_cues(visual_cues)
+    header = style_header(_niche_key(niche), tuple(sorted(vc.items())))
+    karaoke = vc.get("LEGENDAS_KARAOKE", True)
+    events: List[str] = []
+    for c in cues:
+        text = karaoke_text(c) if karaoke else "\\N".join(_clean(l) for l in c.lines)
+        events.append(f"Dialogue: 0,{ass_ts(c.start_ms)},{ass_ts(c.end_ms)},{_style_for(c.role)},,0,0,0,,{text}")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(header + "\n" + "\n".join(events) + "\n", encoding="utf-8")
+    return out_path
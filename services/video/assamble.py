@@ -1,61 +1,111 @@
 from pathlib import Path
-import subprocess
+from typing import Callable
+from services.video.loudness import linear_loudnorm
+from services.video.instrument import run_ffmpeg, stage, ProgressEvent, RenderCancelled
+from services.video.profiles import RenderProfile, get_profile
 
 FFMPEG = "ffmpeg"
 
+SUB_STYLE = "FontName=Arial,FontSize=32,OutlineColour=&H40000000,BorderStyle=3,Outline=2,Shadow=0,MarginV=80"
+
+def _escape_filter_path(path: Path) -> str:
+    # ffmpeg filtergraph: barras normais e ':' escapado (C:/... no Windows)
+    return str(path).replace("\\", "/").replace(":", "\\:")
+
+def subtitle_filter(sub_file: Path) -> str:
+    """Filtro de legenda: `ass=` p/ .ass (estilo embutido), `subtitles=` + force_style p/ .srt."""
+    p = _escape_filter_path(sub_file)
+    if sub_file.suffix.lower() == ".ass":
+        return f"ass='{p}'"
+    return f"subtitles='{p}':force_style='{SUB_STYLE}'"
+
 def assemble_vertical(
     voice_wav: Path,
     srt_file: Path,
     out_mp4: Path,
     broll: Path,
     music: Path = None,
-    duration: int = 35
+    duration: int = 35,
+    two_pass: bool = False,
+    broll_prepared: bool = False,
+    music_prepared: bool = False,
+    profile: "str | RenderProfile | None" = None,
+    cancel_file: Path | None = None,
+    on_progress: Callable[[ProgressEvent], None] | None = None
 ):
+    """Monta o vertical (resolução/encoder do `profile`: draft, review, publish).
+    Padrão: um único grafo (legenda queimada junto com scale/crop/mix).
+    `two_pass=True` mantém o fluxo antigo (render + segundo encode só p/ legendas).
+    `*_prepared`: assets do cache (services.video.assets) já no tamanho do perfil — pula
+    scale/crop/volume; no primeiro passo do two_pass o vídeo vai em stream copy.
+    `cancel_file`: se o arquivo aparecer, o ffmpeg é interrompido (RenderCancelled).
+    `on_progress`: recebe os eventos do `-progress` do ffmpeg."""
+    prof = get_profile(profile)
+    w, h = prof.width, prof.height
     out_mp4.parent.mkdir(parents=True, exist_ok=True)
 
-    # audio filters
+    # audio filters (loudnorm em 2 passos: medição cacheada + modo linear)
     af = [
-      "[0:a]loudnorm=I=-16:TP=-1.5:LRA=11:print_format=summary,",
+      f"[0:a]{linear_loudnorm(voice_wav)},",
       "equalizer=f=6500:t=h:width=200:g=-6[a0]"  # de-ess simples
     ]
     if music:
-        a_complex = "".join(af) + f";[1:a]volume=0.15[a1];[a0][a1]amix=inputs=2:duration=longest[aout]"
+        # trilha preparada já vem normalizada e com volume aplicado
+        mix = "[a0][1:a]" if music_prepared else f"[1:a]{linear_loudnorm(music)},volume=0.15[a1];[a0][a1]"
+        a_complex = "".join(af) + f";{mix}amix=inputs=2:duration=longest[aout]"
         inputs = ["-i", str(voice_wav), "-i", str(music)]
         map_audio = ["-map", "[aout]"]
     else:
         a_complex = "".join(af) + "[aout]"
         inputs = ["-i", str(voice_wav)]
         map_audio = ["-map", "[aout]"]
+    broll_idx = len(inputs) // 2
 
-    vf = (
-      "[2:v]scale=1080:1920:force_original_aspect_ratio=increase,"
-      "crop=1080:1920,setsar=1,format=yuv420p[vf];"
-    )
+    vchain = [] if broll_prepared else [
+      f"scale={w}:{h}:force_original_aspect_ratio=increase",
+      f"crop={w}:{h}", "setsar=1",
+    ]
+    if not two_pass:
+        vchain.append(subtitle_filter(srt_file))
+    if not broll_prepared:
+        vchain.append("format=yuv420p")
+
+    if vchain:
+        filter_complex = f"[{broll_idx}:v]" + ",".join(vchain) + "[vf];" + a_complex
+        map_video = ["-map", "[vf]"]
+        vcodec = prof.x264_args()
+    else:
+        # two_pass + b-roll preparado: nada a filtrar no vídeo -> stream copy
+        filter_complex = a_complex
+        map_video = ["-map", f"{broll_idx}:v"]
+        vcodec = ["-c:v", "copy"]
 
     cmd = [
-      FFMPEG,
+      FFMPEG, "-y",
       *inputs,
       "-stream_loop", "-1", "-t", str(duration), "-i", str(broll),
-      "-filter_complex", vf + a_complex,
-      *map_audio, "-map", "[vf]",
-      "-c:v", "libx264", "-profile:v", "high", "-pix_fmt", "yuv420p",
-      "-preset", "medium", "-crf", "19",
-      "-c:a", "aac", "-b:a", "192k",
+      "-filter_complex", filter_complex,
+      *map_audio, *map_video,
+      *vcodec,
+      *prof.audio_args(),
       "-movflags", "+faststart",
       str(out_mp4)
     ]
+    with stage("assemble", profile=prof.name, two_pass=two_pass):
+        run_ffmpeg(cmd, cancel_file, on_progress)
+    if not two_pass:
+        return out_mp4
 
     # aplicar legendas (passo 2) — estilo independente
+    cc_mp4 = out_mp4.with_name(out_mp4.stem + '_cc.mp4')
     cmd_sub = [
-      FFMPEG, "-i", str(out_mp4),
-      "-vf", f"subtitles='{str(srt_file).replace('\\','/')}':force_style="
-             f"'FontName=Arial,FontSize=32,OutlineColour=&H40000000,BorderStyle=3,Outline=2,Shadow=0,MarginV=80'",
-      "-c:v", "libx264", "-crf", "19", "-preset", "medium",
+      FFMPEG, "-y", "-i", str(out_mp4),
+      "-vf", subtitle_filter(srt_file),
+      *prof.x264_args(),
       "-c:a", "copy",
-      str(out_mp4.with_name(out_mp4.stem + '_cc.mp4'))
+      "-movflags", "+faststart",
+      str(cc_mp4)
     ]
-
-    subprocess.run(cmd, check=True)
-    subprocess.run(cmd_sub, check=True)
-    return out_mp4.with_name(out_mp4.stem + '_cc.mp4')
-
+    with stage("subtitle_pass", profile=prof.name):
+        run_ffmpeg(cmd_sub, cancel_file, on_progress)
+    return cc_mp4
@@ -0,0 +1,61 @@
+from pathlib import Path
+from typing import Dict, Tuple
+import hashlib, json, os, subprocess
+
+FFMPEG = "ffmpeg"
+CACHE_DIR = Path(os.getenv("ASSET_CACHE_DIR", ".cache/assets"))
+
+_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+def file_digest(path: Path, chunk: int = 1 << 20) -> str:
+    """sha256 do conteúdo; memorizado por (caminho, mtime, tamanho) p/ não reler o arquivo."""
+    st = path.stat()
+    memo = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    if memo not in _DIGESTS:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for b in iter(lambda: f.read(chunk), b""):
+                h.update(b)
+        _DIGESTS[memo] = h.hexdigest()
+    return _DIGESTS[memo]
+
+def asset_key(src: Path, **params) -> str:
+    raw = json.dumps([file_digest(src), params], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+def _build(cmd: list, out: Path) -> Path:
+    # escreve em .tmp e renomeia: render concorrente nunca pega arquivo pela metade
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f"{out.stem}.{os.getpid()}.tmp{out.suffix}")
+    subprocess.run([*cmd, str(tmp)], check=True)
+    os.replace(tmp, out)
+    return out
+
+def prepare_broll(src: Path, width: int = 1080, height: int = 1920, fps: int = 30) -> Path:
+    """B-roll -> intermediário WxH yuv420p no fps alvo (sem áudio, GOP de 1s p/ loop/corte em copy)."""
+    params = dict(kind="broll", w=width, h=height, fps=fps)
+    out = CACHE_DIR / f"broll-{asset_key(src, **params)}.mp4"
+    if out.exists():
+        return out
+    vf = (f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+          f"crop={width}:{height},setsar=1,fps={fps},format=yuv420p")
+    return _build([
+        FFMPEG, "-y", "-v", "error", "-i", str(src), "-an", "-vf", vf,
+        "-c:v", "libx264", "-profile:v", "high", "-preset", "slow", "-crf", "14",
+        "-g", str(fps), "-keyint_min", str(fps), "-sc_threshold", "0",
+        "-movflags", "+faststart",
+    ], out)
+
+def prepare_music(src: Path, volume: float = 0.15, sample_rate: int = 48000) -> Path:
+    """Trilha -> PCM s16 estéreo normalizado (loudnorm linear) e com volume aplicado.
+    Decodifica o mp3 uma vez só."""
+    from services.video.loudness import linear_loudnorm, TARGET  # evita import circular
+    params = dict(kind="music", volume=volume, sr=sample_rate, **TARGET)
+    out = CACHE_DIR / f"music-{asset_key(src, **params)}.wav"
+    if out.exists():
+        return out
+    return _build([
+        FFMPEG, "-y", "-v", "error", "-i", str(src), "-vn",
+        "-af", f"{linear_loudnorm(src, sample_rate=sample_rate)},volume={volume}",
+        "-ar", str(sample_rate), "-ac", "2", "-c:a", "pcm_s16le",
+    ], out)
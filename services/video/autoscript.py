@@ -0,0 +1,60 @@
+from typing import Dict, List, Mapping, Tuple
+import zlib
+
+from services.video.templates import CompiledTemplate, fold, get_library, niche_key
+
+STYLE_HOOKS = (("dor", "dor_beneficio"), ("benef", "dor_beneficio"), ("prova", "prova_social"),
+               ("social", "prova_social"), ("depoimento", "prova_social"), ("demo", "demo_rapida"),
+               ("rapid", "demo_rapida"))
+
+# preenchimento padrão quando o pedido só traz nicho/cenário/estilo (sem briefing do produto)
+DEFAULT_VARS: Dict[str, Dict[str, str]] = {
+    "beleza": dict(DOR_PRINCIPAL="pele sem viço e rotina corrida", BENEFICIO_PRINCIPAL="cuidar de você em poucos minutos",
+                   DIFERENCIAL_CHAVE="textura leve e aplicação prática",
+                   PROVA_SOCIAL_CURTA="Milhares de avaliações positivas", PROVA_SOCIAL_FONTE="avaliações da loja"),
+    "saude": dict(DOR_PRINCIPAL="falta de tempo pra se cuidar", BENEFICIO_PRINCIPAL="manter a constância",
+                  DIFERENCIAL_CHAVE="uso simples, cabe em qualquer rotina",
+                  PROVA_SOCIAL_CURTA="Entre os mais vendidos da categoria", PROVA_SOCIAL_FONTE="ranking da loja"),
+    "tech": dict(DOR_PRINCIPAL="perder tempo com tarefa repetitiva", BENEFICIO_PRINCIPAL="resolver mais rápido",
+                 DIFERENCIAL_CHAVE="prático, compacto e fácil de usar",
+                 PROVA_SOCIAL_CURTA="Nota alta de quem já comprou", PROVA_SOCIAL_FONTE="avaliações da loja"),
+}
+COMMON_VARS = dict(GARANTIA_CURTA="Tem garantia de 7 dias", OFERTA_CURTA="Hoje com frete rápido")
+
+def hook_key(style: str | None) -> str:
+    s = fold(style or "")
+    return next((v for k, v in STYLE_HOOKS if k in s), "demo_rapida")
+
+def default_variables(product_name: str, niche: str | None, scenario: str | None) -> Dict[str, str]:
+    nk = niche_key(niche)
+    scen = (scenario or "casa").strip()
+    return {
+        "PRODUTO": product_name, "NICHO": niche or nk, **COMMON_VARS, **DEFAULT_VARS[nk],
+        "CENA_DEMO_1": f"tira da caixa na {scen}", "CENA_DEMO_2": "liga e usa em segundos",
+        "CENA_DEMO_3": "resultado na hora",
+    }
+
+def pick_cta(key: str, category: str = "conversion") -> str:
+    ctas = get_library().ctas(category)
+    return ctas[zlib.crc32(key.encode("utf-8")) % len(ctas)] if ctas else ""
+
+def auto_script_blocks(
+    product_sku: str, product_name: str, niche: str | None, scenario: str | None, style: str | None,
+    variables: Mapping[str, str] | None = None
+) -> Tuple[CompiledTemplate, List[Dict[str, str]]]:
+    """Template (nicho x gancho) + blocos {role, text} já preenchidos."""
+    lib = get_library()
+    nk, hk = niche_key(niche), hook_key(style)
+    tpl = (lib.find(niche=nk, hook=hk) or lib.find(niche=nk) or list(lib.templates))[0]
+    vars_ = {**default_variables(product_name, niche, scenario),
+             "CTA_VARIACAO": pick_cta(product_sku), **(variables or {})}
+    return tpl, tpl.render(vars_)
+
+def build_auto_script(
+    product_sku: str, product_name: str, niche: str | None, scenario: str | None, style: str | None,
+    variables: Mapping[str, str] | None = None
+) -> str:
+    """Roteiro pronto p/ TTS: um bloco por linha (o segments trata cada linha como um bloco).
+    A duração vem do template (todos miram 28–34s)."""
+    _, blocks = auto_script_blocks(product_sku, product_name, niche, scenario, style, variables)
+    return "\n".join(b["text"] for b in blocks)
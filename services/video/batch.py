@@ -0,0 +1,164 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib, json, os, time, traceback
+
+from services.video.generate import generate_video
+from services.video.segments import warm_cache
+from services.video.assets import prepare_broll, prepare_music
+from services.video.jobs import default_workers
+from services.video.profiles import get_profile
+from services.video.templates import MissingVariables, TemplateLibrary, get_library
+from services.video.variants import VariantStats, iter_variants
+
+@dataclass
+class BatchJob:
+    sku: str
+    template_id: str
+    cta: str
+    blocks: List[Dict]
+    visual_cues: List[str]
+    niche: str
+    out_dir: str
+    key: str = ""
+
+@dataclass
+class BatchResult:
+    key: str
+    sku: str
+    template_id: str
+    cta: str
+    out_dir: str
+    status: str = "pending"        # ok | error | duplicate
+    output: Optional[str] = None
+    error: Optional[str] = None
+    same_as: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+def _variant_key(blocks: List[Dict], visual_cues: List[str]) -> str:
+    raw = json.dumps([blocks, visual_cues], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+def plan_matrix(
+    products: Iterable[Dict],
+    out_root: Path,
+    template_ids: List[str] | None = None,
+    ctas: List[str] | None = None,
+    variables: Dict[str, Dict[str, str] | List[Dict[str, str]]] | None = None,
+    library: TemplateLibrary | None = None,
+    strict: bool = True,
+    window: Tuple[float, float] | None | bool = False,
+    stats: VariantStats | None = None
+) -> List[BatchJob]:
+    """SKUs x templates x CTAs x conjuntos de variáveis -> jobs com diretório único por variante.
+
+    `variables[SKU]` pode ser um dict ou uma lista de dicts (um conjunto por variante).
+    `strict`: variável faltando levanta MissingVariables antes de renderizar; senão vira texto vazio.
+    `window`: filtro de duração estimada (ver variants.iter_variants); padrão sem filtro.
+    """
+    lib = library or get_library()
+    stats = stats if stats is not None else VariantStats()
+    variables = variables or {}
+    jobs = []
+    for p in products:
+        sku = p["sku"].upper()
+        per_sku = variables.get(sku, {})
+        sets = [{**variables.get("*", {}), **vs} for vs in (per_sku if isinstance(per_sku, list) else [per_sku])]
+        sku_stats = VariantStats()
+        for v in iter_variants(sku, p.get("name", sku), sets, template_ids=template_ids,
+                               ctas=ctas or lib.ctas("conversion"), library=lib, window=window, stats=sku_stats,
+                               strict=strict):
+            key = _variant_key(v.blocks, v.visual_cues)
+            jobs.append(BatchJob(
+                sku=sku, template_id=v.template_id, cta=v.cta, blocks=v.blocks,
+                visual_cues=v.visual_cues, niche=v.niche,
+                out_dir=str(out_root / sku / v.template_id / key), key=key,
+            ))
+        if strict and sku_stats.missing:
+            tid, miss = next(iter(sku_stats.missing.items()))
+            raise MissingVariables(f"{sku}/{tid}", miss)
+        stats.merge(sku_stats)
+    return jobs
+
+def _cpu() -> float:
+    # CPU do worker + filhos (ffmpeg); no Windows os campos de filhos vêm zerados
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+def _render_job(job: Dict, profile: str | None = None) -> Dict:
+    # roda no worker: todos os blocos já estão no cache de TTS e os assets já preparados
+    t0, c0 = time.perf_counter(), _cpu()
+    try:
+        out = generate_video(
+            product_name=job["sku"], script_text="\n".join(b["text"] for b in job["blocks"]),
+            out_dir=Path(job["out_dir"]), script_blocks=job["blocks"],
+            visual_cues=job["visual_cues"], niche=job["niche"], profile=profile,
+        )
+        return {"status": "ok", "output": str(out), "wall": time.perf_counter() - t0,
+                "cpu": _cpu() - c0}
+    except Exception:
+        return {"status": "error", "error": traceback.format_exc(limit=5), "wall": time.perf_counter() - t0,
+                "cpu": _cpu() - c0}
+
+def render_batch(jobs: List[BatchJob], out_root: Path, workers: int | None = None,
+                 profile: str | None = None) -> Dict:
+    """Renderiza a matriz: intermediários compartilhados uma vez, depois um pool de processos.
+    Grava `manifest.json` em out_root com status e timings por job."""
+    t_start = time.perf_counter()
+    results: List[BatchResult] = []
+    stages: Dict[str, float] = {}
+
+    # 1) assets compartilhados (b-roll/trilha) uma vez, antes do pool
+    t = time.perf_counter()
+    default_broll, bed = Path("assets/broll/default.mp4"), Path("assets/music/bed.mp3")
+    prof = get_profile(profile)
+    if default_broll.exists():
+        prepare_broll(default_broll, width=prof.width, height=prof.height, fps=prof.fps)
+    if bed.exists():
+        prepare_music(bed)
+    stages["assets"] = time.perf_counter() - t
+
+    # 2) variantes idênticas renderizam uma vez só
+    unique: Dict[str, BatchJob] = {}
+    for j in jobs:
+        r = BatchResult(key=j.key, sku=j.sku, template_id=j.template_id, cta=j.cta, out_dir=j.out_dir)
+        if j.key in unique:
+            r.status, r.same_as = "duplicate", unique[j.key].out_dir
+        else:
+            unique[j.key] = j
+        results.append(r)
+
+    # 3) TTS: cada bloco distinto da matriz inteira sintetizado uma vez
+    t = time.perf_counter()
+    texts = list(dict.fromkeys(b["text"] for j in unique.values() for b in j.blocks))
+    warm_cache(texts)
+    stages["tts"] = time.perf_counter() - t
+
+    # 4) renders
+    t = time.perf_counter()
+    by_key = {r.key: r for r in results if r.status == "pending"}
+    with ProcessPoolExecutor(max_workers=workers or default_workers()) as pool:
+        futs = {pool.submit(_render_job, asdict(j), prof.name): key for key, j in unique.items()}
+        for f in as_completed(futs):
+            r = by_key[futs[f]]
+            res = f.result()
+            r.status, r.output, r.error = res["status"], res.get("output"), res.get("error")
+            r.timings = {"wall": round(res["wall"], 3), "cpu": round(res["cpu"], 3)}
+    stages["render"] = time.perf_counter() - t
+
+    manifest = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "profile": prof.name,
+        "jobs": len(results),
+        "rendered": sum(r.status == "ok" for r in results),
+        "errors": sum(r.status == "error" for r in results),
+        "duplicates": sum(r.status == "duplicate" for r in results),
+        "unique_tts_blocks": len(texts),
+        "stages": {k: round(v, 3) for k, v in stages.items()},
+        "total_wall": round(time.perf_counter() - t_start, 3),
+        "results": [asdict(r) for r in results],
+    }
+    out_root.mkdir(parents=True, exist_ok=True)
+    (out_root / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
@@ -0,0 +1,154 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, as_completed
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, List, Optional
+import json, os, re, threading, time, traceback
+
+from services.video.download_cache import DownloadCache, get_download_cache, normalize_url, video_key
+from services.video.instrument import stage
+from services.video.jobs import RenderJob, RenderQueue, default_workers
+from services.video.remix import remix_from_file
+
+_URL = re.compile(r"https?://[^\s<>\"']+")
+
+def parse_urls(text: str) -> List[str]:
+    """URLs de uma mensagem/arquivo (uma por linha ou soltas no texto), sem repetidas."""
+    seen, out = set(), []
+    for m in _URL.finditer(text):
+        url = m.group(0).rstrip(".,;)")
+        norm = normalize_url(url)
+        if norm not in seen:
+            seen.add(norm)
+            out.append(url)
+    return out
+
+def default_download_workers() -> int:
+    return max(1, int(os.getenv("DOWNLOAD_WORKERS", "4")))
+
+def remix_sku(info: Dict) -> str:
+    return f"REMIX-{info['id']}"[:32]
+
+@dataclass
+class BulkItem:
+    url: str
+    status: str = "pending"          # done | error | cancelled | duplicate
+    sku: Optional[str] = None
+    job_id: Optional[str] = None     # job na RenderQueue (quando o lote roda pelo bot)
+    output: Optional[str] = None
+    error: Optional[str] = None
+    same_as: Optional[str] = None    # url já renderizada com o mesmo vídeo
+    download_s: float = 0.0
+    render_s: float = 0.0
+
+def _render_one(kwargs: Dict) -> Dict:
+    # roda no worker do pool de processos
+    t0 = time.perf_counter()
+    try:
+        out = remix_from_file(**kwargs)
+        return {"status": "done", "output": str(out), "wall": time.perf_counter() - t0}
+    except Exception:
+        return {"status": "error", "error": traceback.format_exc(limit=5), "wall": time.perf_counter() - t0}
+
+def bulk_remix(
+    urls: Iterable[str],
+    out_root: Path,
+    autoscript_params: Dict | None = None,
+    download_workers: int | None = None,
+    render_workers: int | None = None,
+    profile: str | None = None,
+    render_queue: RenderQueue | None = None,
+    owner: int | None = None,
+    download_cache: DownloadCache | None = None,
+    on_result: Callable[[BulkItem], None] | None = None
+) -> Dict:
+    """Remix de várias URLs com o mesmo conjunto de parâmetros do autoscript.
+
+    Downloads em threads (I/O, paralelismo limitado por `download_workers`); cada vídeo
+    baixado vai na hora p/ o render, então download e render se sobrepõem. Com `render_queue`
+    (bot) cada render vira um job cancelável da fila, que respeita `max_queue` (o download
+    espera vaga); sem ela, usa um pool de processos próprio. Roda fora do event loop.
+    Grava `summary.json` em out_root e devolve o resumo com status por URL.
+    """
+    t_start = time.perf_counter()
+    cache = download_cache or get_download_cache()
+    items = [BulkItem(url=u) for u in urls]
+    params = autoscript_params or {}
+    rendered_by_key: Dict[str, BulkItem] = {}
+    lock = threading.Lock()
+    item_of: Dict[Future, BulkItem] = {}
+
+    pool = None if render_queue else ProcessPoolExecutor(max_workers=render_workers or default_workers())
+
+    def finish(item: BulkItem):
+        if on_result:
+            on_result(item)
+
+    def rendered(item: BulkItem, fut: Future):
+        try:
+            res = fut.result()
+        except Exception as e:  # pool quebrado, pickle etc.
+            res = {"status": "error", "error": repr(e), "wall": 0.0}
+        if isinstance(res, RenderJob):
+            item.job_id = res.id
+            res = {"status": res.status, "output": str(res.result) if res.result else None,
+                   "error": res.error, "wall": res.elapsed}
+        item.status, item.output, item.error = res["status"], res.get("output"), res.get("error")
+        item.render_s = round(res["wall"], 3)
+        finish(item)
+
+    def download(item: BulkItem):
+        t0 = time.perf_counter()
+        try:
+            with stage("download", bulk=True):
+                broll, info = cache.fetch(item.url)
+        except Exception:
+            item.status, item.error = "error", traceback.format_exc(limit=3)
+            item.download_s = round(time.perf_counter() - t0, 3)
+            finish(item); return
+        item.download_s = round(time.perf_counter() - t0, 3)
+        item.sku = remix_sku(info)
+        with lock:
+            first = rendered_by_key.setdefault(video_key(info), item)
+        if first is not item:
+            item.status, item.same_as, item.output = "duplicate", first.url, first.output
+            finish(item); return
+        kwargs = dict(broll=broll, sku=item.sku, out_root=out_root / item.sku,
+                      broll_duration=info.get("duration"),
+                      autoscript_params={"product_name": item.sku, **params}, profile=profile)
+        if render_queue:
+            fut = render_queue.submit_threadsafe(remix_from_file, kwargs, owner=owner, cancellable=True)
+        else:
+            fut = pool.submit(_render_one, kwargs)
+        with lock:
+            item_of[fut] = item
+
+    try:
+        with ThreadPoolExecutor(max_workers=download_workers or default_download_workers()) as dl:
+            list(dl.map(download, items))
+        # coleta nesta thread: o resumo só é montado depois de todos os itens atualizados
+        for fut in as_completed(item_of):
+            rendered(item_of[fut], fut)
+    finally:
+        if pool:
+            pool.shutdown(wait=True)
+
+    # duplicados apontam p/ a saída da primeira URL com o mesmo vídeo
+    by_url = {i.url: i for i in items}
+    for i in items:
+        if i.status == "duplicate":
+            i.output = by_url[i.same_as].output
+
+    summary = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "urls": len(items),
+        "done": sum(i.status == "done" for i in items),
+        "errors": sum(i.status == "error" for i in items),
+        "cancelled": sum(i.status == "cancelled" for i in items),
+        "duplicates": sum(i.status == "duplicate" for i in items),
+        "download_cache": cache.stats(),
+        "total_wall": round(time.perf_counter() - t_start, 3),
+        "results": [asdict(i) for i in items],
+    }
+    out_root.mkdir(parents=True, exist_ok=True)
+    (out_root / "summary.json").write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    return summary
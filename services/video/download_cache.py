@@ -0,0 +1,201 @@
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+import json, os, re, shutil, threading, time
+
+CACHE_DIR = Path(os.getenv("DOWNLOAD_CACHE_DIR", ".cache/downloads"))
+INFO_KEYS = ("id", "ext", "duration", "width", "height", "fps", "title", "uploader",
+             "extractor_key", "webpage_url", "filesize")
+# memo do probe: só o que resolve o ID (as URLs assinadas da info completa expiram em minutos)
+PROBE_KEYS = ("id", "extractor_key", "extractor", "duration", "title")
+PROBE_TTL = float(os.getenv("DOWNLOAD_PROBE_TTL", "300"))
+
+def _default_ydl_factory(opts: Dict):
+    from yt_dlp import YoutubeDL
+    return YoutubeDL(opts)
+
+def normalize_url(url: str) -> str:
+    """Remove query/fragment (parâmetros de compartilhamento do TikTok mudam a cada envio)."""
+    return re.split(r"[?#]", url.strip(), maxsplit=1)[0].rstrip("/")
+
+def video_key(info: Dict) -> str:
+    ie = (info.get("extractor_key") or info.get("extractor") or "video").lower()
+    return re.sub(r"[^a-z0-9_\-]", "_", f"{ie}-{info['id']}".lower())
+
+class DownloadCache:
+    """Cache de downloads do yt-dlp por ID normalizado do vídeo, com eviction LRU por tamanho.
+
+    - `extract_info(download=False)` resolve o ID (memo curto, só id/extractor/duração/título);
+      a mesma URL/ID não baixa de novo. No miss a info é extraída de novo logo antes do download.
+    - Downloads simultâneos do mesmo ID (threads ou processos) viram um só.
+    - `ydl_factory(opts)` é injetável: qualquer objeto com `extract_info(url, download=False)`
+      e `process_ie_result(info, download=True)` serve (ex.: extractor fake nos testes, ou o
+      próprio YoutubeDL apontando p/ um servidor HTTP local).
+    """
+    def __init__(self, cache_dir: Path | None = None, max_bytes: int = 4 * 1024 ** 3,
+                 ydl_factory: Callable[[Dict], object] | None = None, ydl_opts: Dict | None = None,
+                 lock_timeout: float = 600.0):
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.ydl_factory = ydl_factory or _default_ydl_factory
+        self.ydl_opts = {"format": "mp4/bestvideo+bestaudio/best", "quiet": True, "noprogress": True,
+                         **(ydl_opts or {})}
+        self.lock_timeout = lock_timeout
+        self.hits = self.misses = self.collapsed = 0
+        self._infos: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    # ---- metadados ----
+    def probe(self, url: str) -> Dict:
+        """Info resumida (PROBE_KEYS) da URL; memo por PROBE_TTL segundos."""
+        norm = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            hit = self._infos.get(norm)
+            if hit and hit[0] > now:
+                self._infos.move_to_end(norm)
+                return hit[1]
+        with self.ydl_factory(dict(self.ydl_opts)) as ydl:
+            full = ydl.extract_info(url, download=False)
+        info = {k: full[k] for k in PROBE_KEYS if k in full}
+        with self._lock:
+            self._infos[norm] = (now + PROBE_TTL, info)
+            self._infos.move_to_end(norm)
+            while len(self._infos) > 1024:
+                self._infos.popitem(last=False)
+        return info
+
+    def lookup(self, key: str) -> Optional[Tuple[Path, Dict]]:
+        meta = self.cache_dir / f"{key}.info.json"
+        if not meta.exists():
+            return None
+        info = json.loads(meta.read_text(encoding="utf-8"))
+        path = self.cache_dir / info["_file"]
+        if not path.exists():
+            return None
+        now = time.time()
+        os.utime(path, (now, now))  # marca uso p/ LRU
+        return path, info
+
+    # ---- download ----
+    def fetch(self, url: str) -> Tuple[Path, Dict]:
+        """(arquivo no cache, info resumida). Baixa só se o ID ainda não estiver no cache."""
+        info = self.probe(url)
+        key = video_key(info)
+        hit = self.lookup(key)
+        if hit:
+            with self._lock:
+                self.hits += 1
+            return hit
+
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+            else:
+                self.collapsed += 1
+        if not leader:
+            return fut.result()
+
+        try:
+            result = self._download_locked(key, url)
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _download_locked(self, key: str, url: str) -> Tuple[Path, Dict]:
+        # lock entre processos (workers do pool de render): arquivo criado com O_EXCL
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        lock = self.cache_dir / f"{key}.lock"
+        while True:
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    stale = time.time() - lock.stat().st_mtime > self.lock_timeout
+                except FileNotFoundError:
+                    continue  # dono acabou de liberar
+                if stale:
+                    lock.unlink(missing_ok=True)  # dono morreu no meio do download
+                    continue
+                time.sleep(0.2)
+                hit = self.lookup(key)
+                if hit:
+                    with self._lock:
+                        self.collapsed += 1
+                    return hit
+        try:
+            hit = self.lookup(key)
+            if hit:
+                return hit
+            with self._lock:
+                self.misses += 1
+            return self._download(key, url)
+        finally:
+            lock.unlink(missing_ok=True)
+
+    def _download(self, key: str, url: str) -> Tuple[Path, Dict]:
+        tmp = self.cache_dir / f".tmp-{key}-{os.getpid()}-{threading.get_ident()}"
+        tmp.mkdir(parents=True, exist_ok=True)
+        try:
+            opts = {**self.ydl_opts, "outtmpl": str(tmp / "%(id)s.%(ext)s")}
+            with self.ydl_factory(opts) as ydl:
+                info = ydl.extract_info(url, download=False)  # URLs de mídia frescas
+                done = ydl.process_ie_result(info, download=True) or info
+            files = [p for p in tmp.iterdir() if p.is_file() and not p.name.endswith((".part", ".ytdl"))]
+            if not files:
+                raise RuntimeError(f"download sem arquivo de saída: {key}")
+            src = max(files, key=lambda p: p.stat().st_size)
+            dst = self.cache_dir / f"{key}{src.suffix}"
+            os.replace(src, dst)
+            meta = {k: done.get(k, info.get(k)) for k in INFO_KEYS}
+            meta["_file"] = dst.name
+            meta_path = self.cache_dir / f"{key}.info.json"
+            meta_tmp = meta_path.with_suffix(".tmp")
+            meta_tmp.write_text(json.dumps(meta, ensure_ascii=False, default=str), encoding="utf-8")
+            os.replace(meta_tmp, meta_path)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+        return dst, meta
+
+    def evict(self, keep: str | None = None):
+        files = []
+        for meta in self.cache_dir.glob("*.info.json"):
+            key = meta.name[:-len(".info.json")]
+            try:
+                info = json.loads(meta.read_text(encoding="utf-8"))
+                st = (self.cache_dir / info["_file"]).stat()
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+            files.append((st.st_mtime, st.st_size, key, info["_file"]))
+        total = sum(f[1] for f in files)
+        for _, size, key, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            (self.cache_dir / name).unlink(missing_ok=True)
+            (self.cache_dir / f"{key}.info.json").unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses, "collapsed": self.collapsed}
+
+_CACHE: Optional[DownloadCache] = None
+
+def get_download_cache() -> DownloadCache:
+    global _CACHE
+    if _CACHE is None:
+        max_mb = int(os.getenv("DOWNLOAD_CACHE_MAX_MB", "4096"))
+        _CACHE = DownloadCache(max_bytes=max_mb * 1024 * 1024)
+    return _CACHE
@@ -1,8 +1,14 @@
 from pathlib import Path
 import subprocess, json
-from services.video.tts import LocalMockTTS, ensure_ffmpeg
-from services.video.srt import build_srt
-from services.video.assemble import assemble_vertical
+from typing import Dict, List
+from services.video.tts import ensure_ffmpeg
+from services.video.segments import synth_blocks, blocks_from_text, save_timings
+from services.video.srt import build_srt, align_cues, write_srt, parse_visual_cues
+from services.video.ass import build_ass
+from services.video.assets import prepare_broll, prepare_music
+from services.video.profiles import RenderProfile, get_profile
+from services.video.assamble import assemble_vertical
+from services.video.instrument import stage, progress_writer
 
 def _ffprobe_duration(path: Path) -> float:
     cmd = [
@@ -18,10 +24,27 @@ def generate_video(
     script_text: str,
     out_dir: Path,
     broll_path: Path | None = None,
-    duration: int | None = 35
+    duration: int | None = 35,
+    two_pass_subs: bool = False,
+    script_blocks: List[Dict] | None = None,
+    visual_cues: List[str] | None = None,
+    srt_mode: str = "aligned",
+    niche: str | None = None,
+    use_asset_cache: bool = True,
+    profile: "str | RenderProfile | None" = None,
+    cancel_file: Path | None = None,
+    broll_duration: float | None = None
 ) -> Path:
-    """Gera vídeo vertical com TTS + legendas. Se broll_path for passado, usa-o como plano de fundo."""
+    """Gera vídeo vertical com TTS + legendas. Se broll_path for passado, usa-o como plano de fundo.
+    `script_blocks` ([{role, text}]) sintetiza bloco a bloco; sem ele, cada linha do roteiro vira um bloco.
+    `srt_mode`: "aligned" (timings do WAV real) ou "wpm" (estimativa antiga).
+    Com LEGENDAS_KARAOKE=True nos `visual_cues`, gera .ass karaokê com estilos do template/nicho.
+    `use_asset_cache`: b-roll padrão e trilha saem do cache de assets já normalizados.
+    `profile`: "draft" (prévia 540p ultrafast), "review" ou "publish" (padrão/RENDER_PROFILE).
+    `cancel_file`: cancelamento cooperativo (ver RenderQueue.cancel).
+    `broll_duration`: duração já conhecida (ex.: info do yt-dlp) — evita o ffprobe."""
     ensure_ffmpeg()
+    prof = get_profile(profile)
     out_dir.mkdir(parents=True, exist_ok=True)
     voice_wav = out_dir / "voice.wav"
     srt_file  = out_dir / "captions.srt"
@@ -30,20 +53,44 @@ def generate_video(
     out_mp4   = out_dir / "output.mp4"
 
     # dur ação: se veio b-roll custom e não definiram duração, usa a duração dele (cap em 45s)
-    if duration is None and broll.exists():
-        dur = min(int(_ffprobe_duration(broll)), 45)
+    if duration is None and broll_duration:
+        dur = min(int(broll_duration), 45)
+    elif duration is None and broll.exists():
+        with stage("probe"):
+            dur = min(int(_ffprobe_duration(broll)), 45)
     else:
         dur = duration or 35
 
-    # 1) TTS
-    tts = LocalMockTTS()
-    tts.synth(script_text, voice_wav, voice="female_en")
+    # 1) TTS por bloco (cache + workers) -> voice.wav + durações reais
+    blocks = script_blocks or blocks_from_text(script_text)
+    with stage("tts", blocks=len(blocks)):
+        timings = synth_blocks(blocks, voice_wav, voice="female_en")
+    save_timings(timings, out_dir / "segments.json")
 
-    # 2) SRT
-    build_srt(script_text, srt_file, wpm=170)
+    # 2) Legendas (SRT simples ou ASS karaokê)
+    vc = parse_visual_cues(visual_cues)
+    with stage("srt", mode=srt_mode):
+        if srt_mode == "aligned":
+            cues = align_cues(timings, voice_wav, max_chars=vc.get("SUBTITLE_MAX_CHARS_PER_LINE", 28))
+            if vc.get("LEGENDAS_KARAOKE"):
+                srt_file = build_ass(cues, out_dir / "captions.ass", visual_cues=vc, niche=niche)
+            else:
+                write_srt(cues, srt_file)
+        else:
+            build_srt(script_text, srt_file, wpm=170)
 
-    # 3) Montagem
-    final = assemble_vertical(voice_wav, srt_file, out_mp4, broll=broll, music=music, duration=dur)
-    return final
+    # 3) Montagem (assets compartilhados: prepara uma vez, reaproveita em todo render)
+    shared_broll = use_asset_cache and broll_path is None and broll.exists()
+    shared_music = use_asset_cache and music.exists()
+    with stage("assets"):
+        if shared_broll:
+            broll = prepare_broll(broll, width=prof.width, height=prof.height, fps=prof.fps)
+        if shared_music:
+            music = prepare_music(music)
+    # sem stage próprio: o ffmpeg já é medido dentro (assemble/subtitle_pass) — não contar duas vezes
+    return assemble_vertical(voice_wav, srt_file, out_mp4, broll=broll, music=music, duration=dur,
+                             two_pass=two_pass_subs, broll_prepared=shared_broll, music_prepared=shared_music,
+                             profile=prof, cancel_file=cancel_file,
+                             on_progress=progress_writer(out_dir / "progress.json", dur))
 
 
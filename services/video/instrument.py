@@ -0,0 +1,162 @@
+from pathlib import Path
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterator, List, Optional
+import json, os, subprocess, time
+
+STATS_DIR = Path(os.getenv("STATS_DIR", ".cache/stats"))
+STAGES_LOG = STATS_DIR / "stages.jsonl"
+STAGES_MAX_BYTES = int(os.getenv("STATS_MAX_BYTES", str(4 * 1024 * 1024)))  # passa disso: vira stages.jsonl.1
+
+class RenderCancelled(RuntimeError):
+    pass
+
+# ==== progresso do ffmpeg ====
+
+@dataclass
+class ProgressEvent:
+    frame: int = 0
+    fps: float = 0.0
+    out_time_ms: int = 0
+    speed: float = 0.0
+    total_size: int = 0
+    progress: str = "continue"   # continue | end
+
+def parse_progress(lines: Iterator[str]) -> Iterator[ProgressEvent]:
+    """Blocos key=value do `-progress` -> um evento por bloco (fecha em `progress=`)."""
+    cur: Dict[str, str] = {}
+    for line in lines:
+        k, sep, v = line.strip().partition("=")
+        if not sep:
+            continue
+        cur[k] = v
+        if k != "progress":
+            continue
+        def num(key, cast, default=0):
+            try:
+                return cast(cur.get(key, "").rstrip("x") or default)
+            except ValueError:
+                return default
+        # out_time_us e out_time_ms vêm ambos em microssegundos no ffmpeg
+        yield ProgressEvent(
+            frame=num("frame", int), fps=num("fps", float),
+            out_time_ms=num("out_time_us", int) // 1000, speed=num("speed", float),
+            total_size=num("total_size", int), progress=v,
+        )
+        cur = {}
+
+def run_ffmpeg(
+    cmd: List[str],
+    cancel_file: Path | None = None,
+    on_progress: Callable[[ProgressEvent], None] | None = None
+):
+    """Roda o ffmpeg com `-progress pipe:1`, emitindo ProgressEvent; para se `cancel_file` aparecer."""
+    cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, bufsize=1)
+    cancelled = False
+    try:
+        # o ffmpeg escreve um bloco a cada ~0,5s: dá p/ checar o cancelamento entre blocos
+        for ev in parse_progress(proc.stdout):
+            if on_progress:
+                on_progress(ev)
+            if cancel_file and Path(cancel_file).exists():
+                cancelled = True
+                proc.terminate()
+                break
+    finally:
+        rc = proc.wait()
+    if cancelled:
+        raise RenderCancelled(f"render cancelado ({cancel_file})")
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, cmd)
+
+def progress_writer(path: Path, duration_s: float | None = None) -> Callable[[ProgressEvent], None]:
+    """Callback que grava o último evento em JSON (lido pelo bot p/ mostrar % do render)."""
+    def write(ev: ProgressEvent):
+        data = asdict(ev)
+        if duration_s:
+            data["percent"] = min(100.0, round(ev.out_time_ms / 10 / duration_s, 1))
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+    return write
+
+def read_progress(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+# ==== tempo por etapa ====
+
+def _cpu() -> float:
+    # processo + filhos (ffmpeg/yt-dlp); no Windows os campos de filhos vêm zerados
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+@contextmanager
+def stage(name: str, **labels):
+    """Mede parede/CPU de uma etapa e grava em STATS_DIR/stages.jsonl (append, multi-processo).
+    Passando de STAGES_MAX_BYTES o log gira p/ stages.jsonl.1 (só uma geração antiga)."""
+    t0, c0 = time.perf_counter(), _cpu()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        rec = {"stage": name, "ts": time.time(), "wall": round(time.perf_counter() - t0, 4),
+               "cpu": round(_cpu() - c0, 4), "ok": ok, "pid": os.getpid(), **labels}
+        STATS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(STAGES_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            full = f.tell() > STAGES_MAX_BYTES
+        if full:
+            try:
+                os.replace(STAGES_LOG, STAGES_LOG.with_name(STAGES_LOG.name + ".1"))
+            except FileNotFoundError:
+                pass  # outro processo girou primeiro
+
+def _tail(path: Path, max_lines: int) -> List[str]:
+    if not path.exists():
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        block, data = 1 << 16, b""
+        while size > 0 and data.count(b"\n") <= max_lines:
+            step = min(block, size)
+            size -= step
+            f.seek(size)
+            data = f.read(step) + data
+    return data.decode("utf-8", "replace").splitlines()[-max_lines:]
+
+def stats_summary(since: float | None = None, max_records: int = 5000) -> Dict[str, Dict]:
+    """Agrega as últimas `max_records` medições por etapa: n, erros, parede (média/p50/p95/total) e CPU média."""
+    by_stage: Dict[str, List[Dict]] = {}
+    lines = _tail(STAGES_LOG, max_records)
+    if len(lines) < max_records:  # logo depois de girar: completa com a geração anterior
+        lines = _tail(STAGES_LOG.with_name(STAGES_LOG.name + ".1"), max_records - len(lines)) + lines
+    for line in lines:
+        try:
+            r = json.loads(line)
+        except ValueError:
+            continue
+        if since and r["ts"] < since:
+            continue
+        by_stage.setdefault(r["stage"], []).append(r)
+    out = {}
+    for name, recs in by_stage.items():
+        walls = sorted(r["wall"] for r in recs)
+        n = len(walls)
+        out[name] = {
+            "n": n,
+            "errors": sum(not r["ok"] for r in recs),
+            "wall_total": round(sum(walls), 2),
+            "wall_mean": round(sum(walls) / n, 3),
+            "wall_p50": walls[n // 2],
+            "wall_p95": walls[min(n - 1, int(n * 0.95))],
+            "cpu_mean": round(sum(r["cpu"] for r in recs) / n, 3),
+        }
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]["wall_total"]))
@@ -0,0 +1,200 @@
+from pathlib import Path
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio, os, time, traceback, uuid
+
+def default_workers() -> int:
+    """RENDER_WORKERS no .env ou metade dos núcleos (x264 já usa várias threads por render)."""
+    env = os.getenv("RENDER_WORKERS")
+    if env:
+        return max(1, int(env))
+    return max(1, (os.cpu_count() or 2) // 2)
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+class QueueFull(RuntimeError):
+    pass
+
+@dataclass
+class RenderJob:
+    id: str
+    fn: Callable
+    kwargs: Dict
+    owner: Optional[int] = None
+    on_done: Optional[Callable[["RenderJob"], Awaitable]] = None
+    status: str = "queued"          # queued | running | cancelling | done | error | cancelled
+    result: Optional[Path] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_file: Optional[Path] = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at or time.time()
+        return end - (self.started_at or self.created_at)
+
+def _run(fn: Callable, kwargs: Dict):
+    # roda dentro do processo worker; devolve traceback como texto p/ não depender de pickle da exceção
+    try:
+        return True, fn(**kwargs)
+    except Exception:
+        return False, traceback.format_exc(limit=5)
+
+class RenderQueue:
+    """Fila limitada + pool de processos p/ renders (ffmpeg/TTS/yt-dlp) fora do event loop.
+
+    `submit` é não bloqueante: devolve o job (id p/ polling) e chama `on_done(job)`
+    no event loop quando o render termina.
+    """
+    def __init__(self, workers: int | None = None, max_queue: int = 32, keep_finished: int = 200,
+                 cancel_dir: Path | None = None):
+        self.workers = workers or default_workers()
+        self.cancel_dir = Path(cancel_dir or os.getenv("RENDER_CANCEL_DIR", ".cache/jobs"))
+        self.max_queue = max_queue
+        self.keep_finished = keep_finished
+        self.jobs: Dict[str, RenderJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        if self._pool:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._loop = asyncio.get_running_loop()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        self._tasks = []
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _new_job(self, fn: Callable, kwargs: Dict, owner: int | None,
+                 on_done: Callable[[RenderJob], Awaitable] | None, job_id: str | None, cancellable: bool) -> RenderJob:
+        if self._queue is None:
+            raise RuntimeError("RenderQueue não iniciada (chame await start())")
+        job = RenderJob(id=job_id or new_job_id(), fn=fn, kwargs=kwargs, owner=owner, on_done=on_done)
+        if cancellable:
+            self.cancel_dir.mkdir(parents=True, exist_ok=True)
+            job.cancel_file = self.cancel_dir / f"{job.id}.cancel"
+            job.cancel_file.unlink(missing_ok=True)
+            job.kwargs = {**kwargs, "cancel_file": job.cancel_file}
+        return job
+
+    def _register(self, job: RenderJob):
+        self.jobs[job.id] = job
+        self._prune()
+
+    def submit(self, fn: Callable, kwargs: Dict, owner: int | None = None,
+               on_done: Callable[[RenderJob], Awaitable] | None = None, job_id: str | None = None,
+               cancellable: bool = False) -> RenderJob:
+        """`cancellable=True` passa `cancel_file` p/ o render (fn precisa aceitar o kwarg):
+        o ffmpeg é interrompido quando o arquivo aparece."""
+        job = self._new_job(fn, kwargs, owner, on_done, job_id, cancellable)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"fila de render cheia ({self.max_queue})")
+        self._register(job)
+        return job
+
+    def submit_threadsafe(self, fn: Callable, kwargs: Dict, owner: int | None = None,
+                          cancellable: bool = False) -> "Future[RenderJob]":
+        """Enfileira a partir de outra thread (ex.: lote rodando em to_thread), nunca do event loop.
+
+        Em vez de QueueFull, bloqueia a thread até abrir vaga (o lote respeita `max_queue`);
+        devolve um Future resolvido com o job já terminado (done | error | cancelled)."""
+        if self._loop is None:
+            raise RuntimeError("RenderQueue não iniciada (chame await start())")
+        finished: Future = Future()
+
+        async def on_done(job: RenderJob):
+            finished.set_result(job)
+
+        async def put() -> RenderJob:
+            job = self._new_job(fn, kwargs, owner, on_done, None, cancellable)
+            self._register(job)  # já aparece no /job enquanto espera vaga
+            await self._queue.put(job)
+            return job
+
+        asyncio.run_coroutine_threadsafe(put(), self._loop).result()
+        return finished
+
+    def get(self, job_id: str, owner: int | None = None) -> Optional[RenderJob]:
+        """Job pelo id; com `owner`, job de outro dono conta como inexistente."""
+        job = self.jobs.get(job_id)
+        return job if job and (owner is None or job.owner == owner) else None
+
+    def cancel(self, job_id: str, owner: int | None = None) -> bool:
+        """Na fila: sai sem rodar. Rodando: sinaliza o worker (se o job for cancelável).
+        Com `owner`, só cancela job desse dono."""
+        job = self.get(job_id, owner)
+        if not job or job.status not in ("queued", "running"):
+            return False
+        if job.status == "queued":
+            job.status, job.finished_at = "cancelled", time.time()
+            return True
+        if job.cancel_file is None:
+            return False
+        job.cancel_file.touch()
+        job.status = "cancelling"
+        return True
+
+    def position(self, job: RenderJob) -> int:
+        """Posição na fila (0 = rodando ou terminado)."""
+        if job.status != "queued":
+            return 0
+        queued = [j for j in self.jobs.values() if j.status == "queued"]
+        queued.sort(key=lambda j: j.created_at)
+        return queued.index(job) + 1
+
+    def for_owner(self, owner: int) -> List[RenderJob]:
+        return sorted((j for j in self.jobs.values() if j.owner == owner), key=lambda j: j.created_at)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.status == "cancelled":
+                self._queue.task_done()
+                await self._notify(job)
+                continue
+            job.status = "running"; job.started_at = time.time()
+            try:
+                ok, value = await loop.run_in_executor(self._pool, _run, job.fn, job.kwargs)
+            except Exception as e:  # pool quebrado, pickle etc.
+                ok, value = False, repr(e)
+            job.finished_at = time.time()
+            if job.cancel_file and job.cancel_file.exists():
+                job.status = "cancelled"
+                job.cancel_file.unlink(missing_ok=True)
+            elif ok:
+                job.status, job.result = "done", value
+            else:
+                job.status, job.error = "error", value
+            self._queue.task_done()
+            await self._notify(job)
+
+    async def _notify(self, job: RenderJob):
+        if job.on_done:
+            try:
+                await job.on_done(job)
+            except Exception:
+                traceback.print_exc()
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j.status in ("done", "error", "cancelled")]
+        if len(finished) <= self.keep_finished:
+            return
+        finished.sort(key=lambda j: j.finished_at or 0)
+        for j in finished[:len(finished) - self.keep_finished]:
+            self.jobs.pop(j.id, None)
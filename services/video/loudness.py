@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Dict
+import json, os, re, subprocess
+from services.video.assets import asset_key
+
+FFMPEG = "ffmpeg"
+CACHE_DIR = Path(os.getenv("LOUDNESS_CACHE_DIR", ".cache/loudness"))
+
+# alvo padrão (TikTok/Reels ~ -16 LUFS)
+TARGET = dict(I=-16.0, TP=-1.5, LRA=11.0)
+
+_MEMO: Dict[str, Dict] = {}
+_JSON = re.compile(r"\{[^{}]*\"input_i\"[^{}]*\}", re.S)
+
+def measure(path: Path, I: float = TARGET["I"], TP: float = TARGET["TP"], LRA: float = TARGET["LRA"]) -> Dict:
+    """1º passo do loudnorm (print_format=json). Resultado cacheado por hash do arquivo + alvo."""
+    key = asset_key(path, kind="loudnorm", I=I, TP=TP, LRA=LRA)
+    if key in _MEMO:
+        return _MEMO[key]
+    cached = CACHE_DIR / f"{key}.json"
+    if cached.exists():
+        _MEMO[key] = json.loads(cached.read_text(encoding="utf-8"))
+        return _MEMO[key]
+
+    cmd = [
+        FFMPEG, "-hide_banner", "-nostats", "-i", str(path), "-vn",
+        "-af", f"loudnorm=I={I}:TP={TP}:LRA={LRA}:print_format=json",
+        "-f", "null", "-",
+    ]
+    err = subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE).stderr
+    m = _JSON.findall(err.decode("utf-8", "replace"))
+    if not m:
+        raise RuntimeError(f"loudnorm não devolveu medição p/ {path}")
+    data = json.loads(m[-1])
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, cached)
+    _MEMO[key] = data
+    return data
+
+def linear_loudnorm(path: Path, I: float = TARGET["I"], TP: float = TARGET["TP"], LRA: float = TARGET["LRA"],
+                    sample_rate: int = 48000) -> str:
+    """2º passo: loudnorm em modo linear com os valores medidos (+ volta p/ 48 kHz)."""
+    m = measure(path, I, TP, LRA)
+    return (f"loudnorm=I={I}:TP={TP}:LRA={LRA}"
+            f":measured_I={m['input_i']}:measured_TP={m['input_tp']}"
+            f":measured_LRA={m['input_lra']}:measured_thresh={m['input_thresh']}"
+            f":offset={m['target_offset']}:linear=true:print_format=none,"
+            f"aresample={sample_rate}")
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Dict, List
+import os
+
+@dataclass(frozen=True)
+class RenderProfile:
+    name: str
+    width: int
+    height: int
+    preset: str
+    crf: int
+    audio_bitrate: str
+    threads: int = 0            # 0 = x264 decide (auto)
+    tune: str | None = None
+    fps: int = 30
+
+    def x264_args(self) -> List[str]:
+        args = ["-c:v", "libx264", "-profile:v", "high", "-pix_fmt", "yuv420p",
+                "-preset", self.preset, "-crf", str(self.crf)]
+        if self.tune:
+            args += ["-tune", self.tune]
+        if self.threads:
+            args += ["-threads", str(self.threads)]
+        return args
+
+    def audio_args(self) -> List[str]:
+        return ["-c:a", "aac", "-b:a", self.audio_bitrate]
+
+PROFILES: Dict[str, RenderProfile] = {
+    # prévia rápida p/ Telegram
+    "draft":   RenderProfile("draft", 540, 960, "ultrafast", 28, "96k", tune="fastdecode"),
+    # intermediário: revisão interna
+    "review":  RenderProfile("review", 720, 1280, "veryfast", 23, "128k"),
+    # upload final
+    "publish": RenderProfile("publish", 1080, 1920, "medium", 19, "192k"),
+}
+
+def get_profile(profile: "str | RenderProfile | None" = None) -> RenderProfile:
+    """Nome, instância ou None (RENDER_PROFILE do .env, padrão publish)."""
+    if isinstance(profile, RenderProfile):
+        return profile
+    name = (profile or os.getenv("RENDER_PROFILE", "publish")).lower()
+    if name not in PROFILES:
+        raise ValueError(f"perfil de render desconhecido: {name} (opções: {', '.join(PROFILES)})")
+    return PROFILES[name]
@@ -1,59 +1,71 @@
 from pathlib import Path
-import re, subprocess
-from yt_dlp import YoutubeDL
+import re
 from services.video.generate import generate_video
-from services.video.autoscript import build_auto_script
+from services.video.autoscript import auto_script_blocks
+from services.video.instrument import stage
+from services.video.download_cache import DownloadCache, get_download_cache
 
 def sanitize_filename(s: str) -> str:
     return re.sub(r"[^a-zA-Z0-9\-_.]", "_", s)
 
-def download_tiktok(url: str, out_dir: Path) -> Path:
-    out_dir.mkdir(parents=True, exist_ok=True)
-    template = str(out_dir / "%(id)s.%(ext)s")
-    ydl_opts = {
-        "outtmpl": template,
-        "format": "mp4/bestvideo+bestaudio/best",
-        "quiet": True,
-        "noprogress": True,
-    }
-    with YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
-        filepath = Path(out_dir / f"{info['id']}.{info.get('ext','mp4')}")
-    return filepath
-
-def mute_audio(src: Path, dst: Path):
-    cmd = ["ffmpeg","-y","-i",str(src),"-an","-c:v","copy",str(dst)]
-    subprocess.run(cmd, check=True)
-
 def remix_from_tiktok(
     url: str,
     sku: str,
     out_root: Path,
     script_text: str | None = None,
-    autoscript_params: dict | None = None
+    autoscript_params: dict | None = None,
+    profile: str | None = None,
+    cancel_file: Path | None = None,
+    download_cache: DownloadCache | None = None
 ) -> Path:
-    """Baixa um TikTok, silencia o áudio original e gera uma nova versão com TTS/legendas."""
-    dl_dir = out_root / "download"
-    broll = download_tiktok(url, dl_dir)
-    muted = out_root / "broll_muted.mp4"
-    mute_audio(broll, muted)
+    """Baixa um TikTok e gera uma nova versão com TTS/legendas.
+    O arquivo baixado entra direto no grafo do render (só o stream de vídeo é mapeado,
+    então o áudio original já fica de fora — sem passo de mute nem arquivo intermediário).
+    O download passa pelo cache por ID do vídeo: remixar o mesmo viral com outro roteiro não baixa de novo."""
+    cache = download_cache or get_download_cache()
+    with stage("download"):
+        broll, info = cache.fetch(url)
+    return remix_from_file(broll, sku, out_root, broll_duration=info.get("duration"),
+                           script_text=script_text, autoscript_params=autoscript_params,
+                           profile=profile, cancel_file=cancel_file)
 
+def remix_from_file(
+    broll: Path,
+    sku: str,
+    out_root: Path,
+    broll_duration: float | None = None,
+    script_text: str | None = None,
+    autoscript_params: dict | None = None,
+    profile: str | None = None,
+    cancel_file: Path | None = None
+) -> Path:
+    """Parte do remix depois do download (roteiro + render) — usada pelo remix em lote,
+    que baixa em threads e só manda o render p/ o pool de processos.
+    Roteiro automático sai em blocos do template, com os visual_cues/nicho dele (karaokê, Hook/CTA)."""
+    blocks = cues = niche = None
     if script_text is None:
         p = autoscript_params or {}
-        script_text = build_auto_script(
+        tpl, blocks = auto_script_blocks(
             product_sku=sku,
             product_name=p.get("product_name", sku),
             niche=p.get("niche","geral"),
             scenario=p.get("scenario","casa"),
             style=p.get("style","demonstração rápida"),
-            seconds=p.get("seconds",35),
         )
+        script_text = "\n".join(b["text"] for b in blocks)
+        cues, niche = list(tpl.visual_cues), tpl.niche
 
     final = generate_video(
         product_name=sku,
         script_text=script_text,
         out_dir=out_root,
-        broll_path=muted,
-        duration=None  # usa a duração do vídeo baixado (cap 45s)
+        broll_path=broll,
+        duration=None,  # usa a duração do vídeo baixado (cap 45s)
+        broll_duration=broll_duration,
+        script_blocks=blocks,
+        visual_cues=cues,
+        niche=niche,
+        profile=profile,
+        cancel_file=cancel_file
     )
     return final
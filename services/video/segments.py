@@ -0,0 +1,130 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+import atexit, json, multiprocessing, os, wave
+from services.video.tts import LocalMockTTS, CachedTTS
+
+@dataclass
+class SegmentTiming:
+    role: str
+    text: str
+    start: float   # segundos no WAV final
+    end: float
+    wav: str       # WAV do bloco (cache)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+_TTS: Optional[CachedTTS] = None
+_POOL: Optional[ProcessPoolExecutor] = None
+
+def get_tts() -> CachedTTS:
+    """TTS do processo: um engine pyttsx3 persistente + cache por bloco."""
+    global _TTS
+    if _TTS is None:
+        _TTS = CachedTTS(LocalMockTTS())
+    return _TTS
+
+def _worker_synth(text: str, voice: str) -> str:
+    # cada worker mantém o próprio engine (get_tts é global por processo)
+    tts = get_tts()
+    return str(tts.synth(text, tts.path_for(text, voice), voice=voice))
+
+def _init_worker():
+    # sobe o engine já na criação do worker (o LocalMockTTS é preguiçoso)
+    getattr(get_tts().provider, "engine", None)
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    return _POOL
+
+@atexit.register
+def shutdown_pool():
+    """Encerra o pool de TTS (sai junto com o processo; chamável antes p/ liberar os workers)."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=True, cancel_futures=True)
+        _POOL = None
+
+def default_tts_workers() -> int:
+    return max(1, int(os.getenv("TTS_WORKERS", "0")) or min(4, os.cpu_count() or 1))
+
+def blocks_from_text(text: str) -> List[Dict]:
+    """Roteiro livre -> blocos (uma linha não vazia = um bloco)."""
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    return [{"role": "narration", "text": ln} for ln in lines] or [{"role": "narration", "text": text.strip()}]
+
+def warm_cache(texts: List[str], voice: str = "female_en", workers: int | None = None) -> List[str]:
+    """Garante cada texto no cache de TTS (só os que faltam vão pro pool). Devolve os WAVs na ordem.
+    Dentro de um worker (RenderQueue/render em lote) sintetiza em série: o paralelismo já é
+    o do pool de render, e pool dentro de pool só disputa CPU."""
+    tts = get_tts()
+    paths: List[Optional[str]] = []
+    missing = []
+    for i, text in enumerate(texts):
+        p = tts.path_for(text, voice)
+        try:
+            os.utime(p)  # hit marca uso p/ LRU (igual ao CachedTTS.synth)
+            tts.hits += 1
+            paths.append(str(p))
+        except FileNotFoundError:
+            paths.append(None); missing.append(i)
+
+    if len(missing) == 1 or multiprocessing.parent_process() is not None:
+        # ex.: só o CTA mudou — não vale subir pool; ou já estamos num worker
+        for i in missing:
+            paths[i] = _worker_synth(texts[i], voice)
+    elif missing:
+        pool = _pool(workers or default_tts_workers())
+        futs = {i: pool.submit(_worker_synth, texts[i], voice) for i in missing}
+        tts.misses += len(missing)
+        for i, f in futs.items():
+            paths[i] = f.result()
+    return paths
+
+def synth_blocks(
+    blocks: List[Dict],
+    out_wav: Path,
+    voice: str = "female_en",
+    workers: int | None = None,
+    gap_ms: int = 150
+) -> List[SegmentTiming]:
+    """Sintetiza cada bloco separado (cache por bloco), em paralelo só os que faltam,
+    e concatena os PCM num WAV único sem re-encode. Devolve as durações reais."""
+    paths = warm_cache([b["text"] for b in blocks], voice=voice, workers=workers)
+    return concat_wavs(blocks, paths, out_wav, gap_ms=gap_ms)
+
+def concat_wavs(blocks: List[Dict], paths: List[str], out_wav: Path, gap_ms: int = 150) -> List[SegmentTiming]:
+    if not blocks:
+        raise ValueError("concat_wavs: nenhum bloco p/ concatenar (roteiro vazio?)")
+    out_wav.parent.mkdir(parents=True, exist_ok=True)
+    timings: List[SegmentTiming] = []
+    params = None
+    cur = 0
+    with wave.open(str(out_wav), "wb") as out:
+        for idx, (b, p) in enumerate(zip(blocks, paths)):
+            with wave.open(p, "rb") as w:
+                wp = w.getparams()
+                if params is None:
+                    params = wp
+                    out.setnchannels(wp.nchannels); out.setsampwidth(wp.sampwidth); out.setframerate(wp.framerate)
+                    silence = b"\x00" * (int(wp.framerate * gap_ms / 1000) * wp.nchannels * wp.sampwidth)
+                elif (wp.nchannels, wp.sampwidth, wp.framerate) != (params.nchannels, params.sampwidth, params.framerate):
+                    raise ValueError(f"WAV incompatível p/ concat sem re-encode: {p}")
+                frames = w.readframes(wp.nframes)
+            n = len(frames) // (params.nchannels * params.sampwidth)
+            start = cur
+            out.writeframes(frames); cur += n
+            timings.append(SegmentTiming(role=b.get("role", "narration"), text=b["text"],
+                                         start=start / params.framerate, end=cur / params.framerate, wav=p))
+            if idx < len(blocks) - 1 and gap_ms:
+                out.writeframes(silence); cur += len(silence) // (params.nchannels * params.sampwidth)
+    return timings
+
+def save_timings(timings: List[SegmentTiming], path: Path) -> Path:
+    path.write_text(json.dumps([asdict(t) for t in timings], ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
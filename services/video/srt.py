@@ -1,4 +1,8 @@
 from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+import wave
+import numpy as np
 
 def ms_to_ts(ms: int) -> str:
     h = ms//3600000; m=(ms%3600000)//60000; s=(ms%60000)//1000; ms2=ms%1000
@@ -24,3 +28,131 @@ def build_srt(text: str, out_path: Path, wpm: int = 170):
     out_path.write_text("\n".join(lines), encoding="utf-8")
     return out_path
 
+# ==== modo alinhado ao áudio ====
+
+@dataclass
+class Cue:
+    start_ms: int
+    end_ms: int
+    lines: List[str]
+    role: str = ""
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+def parse_visual_cues(cues: Sequence[str] | None) -> Dict:
+    """["SUBTITLE_MAX_CHARS_PER_LINE=28", "LEGENDAS_KARAOKE=True"] -> {"SUBTITLE_MAX_CHARS_PER_LINE": 28, ...}"""
+    out = {}
+    for c in cues or []:
+        if "=" not in c:
+            continue
+        k, v = (x.strip() for x in c.split("=", 1))
+        if v.lower() in ("true", "false"):
+            out[k] = v.lower() == "true"
+            continue
+        try:
+            out[k] = int(v) if v.lstrip("-").isdigit() else float(v)
+        except ValueError:
+            out[k] = v
+    return out
+
+def wrap_text(text: str, max_chars: int) -> List[str]:
+    lines, cur = [], ""
+    for w in text.split():
+        if cur and len(cur) + 1 + len(w) > max_chars:
+            lines.append(cur); cur = w
+        else:
+            cur = f"{cur} {w}" if cur else w
+    if cur:
+        lines.append(cur)
+    return lines
+
+def split_cues(text: str, max_chars: int, max_lines: int = 2) -> List[List[str]]:
+    """Quebra o texto em legendas de até `max_lines` linhas de `max_chars`."""
+    lines = wrap_text(text, max_chars)
+    return [lines[i:i+max_lines] for i in range(0, len(lines), max_lines)]
+
+def read_pcm(wav_path: Path):
+    """WAV -> (amostras float32 mono em [-1, 1], sample rate)."""
+    with wave.open(str(wav_path), "rb") as w:
+        sr, ch, sw = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        raw = w.readframes(w.getnframes())
+    if sw == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sw == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif sw == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"sampwidth não suportado: {sw}")
+    if ch > 1:
+        x = x.reshape(-1, ch).mean(axis=1)
+    return x, sr
+
+def speech_mask(x: np.ndarray, sr: int, frame_ms: int = 10, floor_db: float = -35.0) -> np.ndarray:
+    """Máscara de fala por frame (RMS em dB acima do piso adaptativo)."""
+    hop = max(1, int(sr * frame_ms / 1000))
+    n = len(x) // hop
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    frames = x[:n*hop].reshape(n, hop)
+    db = 20 * np.log10(np.sqrt(np.mean(frames * frames, axis=1)) + 1e-9)
+    thr = max(np.percentile(db, 10) + 6.0, db.max() + floor_db)
+    return db > thr
+
+def _pauses(mask: np.ndarray, min_frames: int):
+    """Trechos de silêncio com pelo menos `min_frames` -> (inícios, fins) em frames."""
+    d = np.diff(np.concatenate(([0], (~mask).astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(d == 1), np.flatnonzero(d == -1)
+    keep = (ends - starts) >= min_frames
+    return starts[keep], ends[keep]
+
+def align_cues(
+    segments: Sequence,
+    wav_path: Path,
+    max_chars: int = 28,
+    max_lines: int = 2,
+    frame_ms: int = 10,
+    snap_ms: int = 300
+) -> List[Cue]:
+    """Timings das legendas a partir do áudio real.
+
+    `segments` vem do TTS por bloco (start/end/text de cada bloco). Dentro de cada
+    bloco o início/fim é recortado pela energia do WAV; blocos com várias legendas
+    dividem o tempo por caracteres e cada corte é puxado p/ a pausa mais próxima.
+    """
+    x, sr = read_pcm(wav_path)
+    mask = speech_mask(x, sr, frame_ms)
+    p_start, p_end = _pauses(mask, max(1, 80 // frame_ms))
+    p_mid = (p_start + p_end) / 2
+    snap = snap_ms / frame_ms
+    cues: List[Cue] = []
+    for seg in segments:
+        f0, f1 = int(seg.start * 1000 / frame_ms), int(np.ceil(seg.end * 1000 / frame_ms))
+        voiced = np.flatnonzero(mask[f0:f1])
+        if voiced.size:
+            f0, f1 = f0 + int(voiced[0]), f0 + int(voiced[-1]) + 1
+        groups = split_cues(seg.text, max_chars, max_lines)
+        if not groups:
+            continue
+        chars = np.array([sum(len(l) for l in g) for g in groups], dtype=np.float64)
+        bounds = f0 + (f1 - f0) * np.concatenate(([0.0], np.cumsum(chars) / chars.sum()))
+        for i in range(1, len(bounds) - 1):
+            if p_mid.size:
+                j = np.argmin(np.abs(p_mid - bounds[i]))
+                if abs(p_mid[j] - bounds[i]) <= snap and bounds[i-1] < p_mid[j] < bounds[i+1]:
+                    bounds[i] = p_mid[j]
+        ms = np.rint(bounds * frame_ms).astype(int)
+        role = getattr(seg, "role", "")
+        cues.extend(Cue(int(ms[i]), int(ms[i+1]), g, role) for i, g in enumerate(groups))
+    return cues
+
+def write_srt(cues: Sequence[Cue], out_path: Path) -> Path:
+    lines = [f"{i}\n{ms_to_ts(c.start_ms)} --> {ms_to_ts(c.end_ms)}\n{c.text}\n" for i, c in enumerate(cues, start=1)]
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text("\n".join(lines), encoding="utf-8")
+    return out_path
+
+def build_srt_aligned(segments: Sequence, wav_path: Path, out_path: Path, max_chars: int = 28, max_lines: int = 2):
+    return write_srt(align_cues(segments, wav_path, max_chars, max_lines), out_path)
@@ -0,0 +1,179 @@
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+import json, os, re, threading, time, unicodedata, warnings
+
+TEMPLATES_PATH = Path(os.getenv("TEMPLATES_PATH", "roteiros_ctas.json"))
+_VAR = re.compile(r"\{([A-Z0-9_]+)\}")
+_CUE = re.compile(r"^\s*\[([^\]]*)\]\s*")  # "[CLOSE-UP] ..." é direção de cena, não fala
+
+class MissingVariables(ValueError):
+    def __init__(self, template_id: str, missing: Iterable[str]):
+        self.template_id, self.missing = template_id, sorted(missing)
+        super().__init__(f"{template_id}: variáveis ausentes {', '.join(self.missing)}")
+
+def fold(s: str) -> str:
+    """minúsculas sem acento (índices por nicho/gancho, dedupe de variantes)."""
+    s = unicodedata.normalize("NFKD", s or "")
+    return "".join(c for c in s if not unicodedata.combining(c)).lower().strip()
+
+def slug(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", fold(s)).strip("_")
+
+# nichos do bot (cozinha, beleza, fitness, pet, casa, gadgets) e dos templates ("Saúde & Bem-estar")
+# -> chave de nicho; única tabela: escolha de template (autoscript) e estilo da legenda (ass) usam esta
+NICHE_TEMPLATES = {"beleza": "beleza", "cabelo": "beleza", "pele": "beleza", "maquiagem": "beleza",
+                   "saude": "saude", "fitness": "saude", "academia": "saude", "pet": "saude",
+                   "tech": "tech", "tecnologia": "tech", "gadgets": "tech", "cozinha": "tech",
+                   "casa": "tech", "eletronicos": "tech"}
+
+def niche_key(niche: str | None) -> str:
+    n = fold(niche or "")
+    return next((v for k, v in NICHE_TEMPLATES.items() if k in n), "tech")
+
+@dataclass(frozen=True)
+class CompiledBlock:
+    role: str
+    fmt: str                  # texto já sem a direção de cena, pronto p/ str.format_map
+    names: Tuple[str, ...]
+    cue: Optional[str] = None
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    id: str
+    niche: str
+    hook_type: str
+    niche_key: str            # "beleza" | "saude" | "tech" (prefixo do id)
+    hook_key: str             # "dor_beneficio" | "prova_social" | "demo_rapida"
+    blocks: Tuple[CompiledBlock, ...]
+    required: FrozenSet[str]
+    visual_cues: Tuple[str, ...]
+    tts_guide: Mapping
+    duration_target_sec: Tuple[float, float]
+    raw: Mapping
+
+    def missing(self, variables: Mapping[str, str]) -> FrozenSet[str]:
+        return self.required.difference(k for k, v in variables.items() if v not in (None, ""))
+
+    def render(self, variables: Mapping[str, str], strict: bool = True) -> List[Dict[str, str]]:
+        """Blocos {role, text}. `strict`: variável ausente/vazia levanta MissingVariables;
+        senão vira texto vazio (espaços normalizados)."""
+        miss = self.missing(variables)
+        if miss:
+            if strict:
+                raise MissingVariables(self.id, miss)
+            variables = {**{k: "" for k in miss}, **{k: v for k, v in variables.items() if v not in (None, "")}}
+            return [{"role": b.role, "text": " ".join(b.fmt.format_map(variables).split())} for b in self.blocks]
+        return [{"role": b.role, "text": b.fmt.format_map(variables)} for b in self.blocks]
+
+    def render_text(self, variables: Mapping[str, str], strict: bool = True) -> str:
+        return "\n".join(b["text"] for b in self.render(variables, strict))
+
+def compile_template(t: Dict) -> CompiledTemplate:
+    blocks, required = [], set()
+    for b in t["script"]:
+        text = b["text"]
+        m = _CUE.match(text)
+        cue = m.group(1) if m else None
+        text = text[m.end():] if m else text
+        parts, names, pos = [], [], 0
+        for v in _VAR.finditer(text):
+            parts.append(text[pos:v.start()].replace("{", "{{").replace("}", "}}"))
+            parts.append("{%s}" % v.group(1))
+            names.append(v.group(1)); pos = v.end()
+        parts.append(text[pos:].replace("{", "{{").replace("}", "}}"))
+        blocks.append(CompiledBlock(role=b["role"], fmt=" ".join("".join(parts).split()),
+                                    names=tuple(names), cue=cue))
+        required.update(names)
+    lo, hi = t.get("duration_target_sec") or (0, 0)
+    return CompiledTemplate(
+        id=t["id"], niche=t.get("niche", ""), hook_type=t.get("hook_type", ""),
+        niche_key=t["id"].split(".", 1)[0], hook_key=slug(t["id"].split(".", 1)[-1]),
+        blocks=tuple(blocks), required=frozenset(required),
+        visual_cues=tuple(t.get("visual_cues", [])), tts_guide=dict(t.get("tts_guide", {})),
+        duration_target_sec=(float(lo), float(hi)), raw=t,
+    )
+
+class TemplateLibrary:
+    """roteiros_ctas.json compilado uma vez; recarrega sozinho quando o arquivo muda (mtime/tamanho).
+
+    Índices: por id, por nicho (chave "beleza"/nome "Beleza & Cuidados"), por gancho
+    (hook_key ou hook_type) e CTAs por categoria.
+    """
+    def __init__(self, path: Path | None = None, check_every: float = 1.0):
+        self.path = Path(path or TEMPLATES_PATH)
+        self.check_every = check_every
+        self.last_error: Optional[str] = None
+        self._sig: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def _stat(self) -> Tuple[int, int]:
+        st = self.path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def load(self):
+        sig = self._stat()
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        templates = tuple(compile_template(t) for t in data["templates"])
+        by_id = {t.id: t for t in templates}
+        by_niche: Dict[str, List[CompiledTemplate]] = {}
+        by_hook: Dict[str, List[CompiledTemplate]] = {}
+        for t in templates:
+            for k in {t.niche_key, fold(t.niche)}:
+                by_niche.setdefault(k, []).append(t)
+            for k in {t.hook_key, fold(t.hook_type)}:
+                by_hook.setdefault(k, []).append(t)
+        # troca atômica: leitores nunca veem índices pela metade
+        self.data, self.templates, self.by_id = data, templates, by_id
+        self.by_niche, self.by_hook = by_niche, by_hook
+        self.cta_library = {k: tuple(v) for k, v in data.get("cta_library", {}).items()}
+        self._sig = sig
+
+    def maybe_reload(self) -> bool:
+        """Recarrega se o arquivo mudou (checa no máximo a cada `check_every` s).
+        Arquivo inválido mantém a versão anterior e guarda o erro em `last_error`."""
+        now = time.monotonic()
+        if now - self._checked < self.check_every:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                if self._stat() == self._sig:
+                    return False
+                self.load()
+                self.last_error = None
+                return True
+            except (OSError, ValueError, KeyError) as e:
+                self.last_error = repr(e)
+                warnings.warn(f"roteiros_ctas.json não recarregado: {e!r}")
+                return False
+
+    def get(self, template_id: str) -> CompiledTemplate:
+        return self.by_id[template_id]
+
+    def find(self, niche: str | None = None, hook: str | None = None) -> List[CompiledTemplate]:
+        out = list(self.templates)
+        if niche:
+            ids = {t.id for t in self.by_niche.get(fold(niche), [])}
+            out = [t for t in out if t.id in ids]
+        if hook:
+            ids = {t.id for t in self.by_hook.get(fold(hook), []) + self.by_hook.get(slug(hook), [])}
+            out = [t for t in out if t.id in ids]
+        return out
+
+    def ctas(self, category: str = "conversion") -> Tuple[str, ...]:
+        return self.cta_library.get(category, ())
+
+_LIBS: Dict[Path, TemplateLibrary] = {}
+
+def get_library(path: Path | None = None) -> TemplateLibrary:
+    """Biblioteca compartilhada do processo (uma por arquivo), já checando mudanças no disco."""
+    p = Path(path or TEMPLATES_PATH)
+    lib = _LIBS.get(p)
+    if lib is None:
+        lib = _LIBS[p] = TemplateLibrary(p)
+    else:
+        lib.maybe_reload()
+    return lib
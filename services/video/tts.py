@@ -1,18 +1,32 @@
 from pathlib import Path
-import subprocess, sys
+import hashlib, json, os, shutil, subprocess, sys, threading
 
 class TTSProvider:
+    rate: int | None = None
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
     def synth(self, text: str, out_wav: Path, voice: str = "female_en") -> Path:
         raise NotImplementedError
 
 class LocalMockTTS(TTSProvider):
     """Mock offline p/ dev. Trocar por XTTS/ElevenLabs na produção."""
-    def __init__(self):
-        import pyttsx3
-        self.engine = pyttsx3.init()
-        # tente ajustar voz/velocidade se quiser
-        # for v in self.engine.getProperty("voices"): print(v.id)
-        self.engine.setProperty("rate", 190)
+    def __init__(self, rate: int = 190):
+        self.rate = rate
+        self._engine = None
+
+    @property
+    def engine(self):
+        # init preguiçoso: hit de cache não paga o pyttsx3.init()
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            # tente ajustar voz/velocidade se quiser
+            # for v in self._engine.getProperty("voices"): print(v.id)
+            self._engine.setProperty("rate", self.rate)
+        return self._engine
 
     def synth(self, text: str, out_wav: Path, voice: str = "female_en") -> Path:
         out_wav.parent.mkdir(parents=True, exist_ok=True)
@@ -20,6 +34,78 @@ class LocalMockTTS(TTSProvider):
         self.engine.runAndWait()
         return out_wav
 
+class CachedTTS(TTSProvider):
+    """Cache em disco (endereçado por conteúdo) na frente de qualquer TTSProvider.
+
+    Chave = sha256(provider, voice, rate, texto). Eviction LRU pelo mtime quando
+    o diretório passa de `max_bytes`.
+    """
+    def __init__(self, provider: TTSProvider, cache_dir: Path | None = None, max_bytes: int = 512 * 1024 * 1024):
+        self.provider = provider
+        self.rate = provider.rate
+        self.cache_dir = Path(cache_dir or os.getenv("TTS_CACHE_DIR", ".cache/tts"))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    def key(self, text: str, voice: str) -> str:
+        raw = json.dumps([self.provider.name, voice, self.provider.rate, text], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, text: str, voice: str = "female_en") -> Path:
+        return self.cache_dir / f"{self.key(text, voice)}.wav"
+
+    def synth(self, text: str, out_wav: Path, voice: str = "female_en") -> Path:
+        cached = self.path_for(text, voice)
+        out_wav.parent.mkdir(parents=True, exist_ok=True)
+        if cached.exists():
+            with self._lock:
+                self.hits += 1
+            os.utime(cached)  # marca uso p/ LRU
+        else:
+            with self._lock:
+                self.misses += 1
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.wav")
+            self.provider.synth(text, tmp, voice=voice)
+            os.replace(tmp, cached)  # atômico: outro processo nunca lê WAV pela metade
+            self.evict()
+        if out_wav.resolve() != cached.resolve():
+            shutil.copyfile(cached, out_wav)
+        return out_wav
+
+    def evict(self):
+        files = []
+        for p in self.cache_dir.glob("*.wav"):
+            if ".tmp." in p.name:
+                continue
+            try:
+                st = p.stat()
+            except FileNotFoundError:  # removido por outro processo
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        total = sum(sz for _, sz, _ in files)
+        if total <= self.max_bytes:
+            return
+        for _, sz, p in sorted(files):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            total -= sz
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0}
+
 def ensure_ffmpeg():
     try:
         subprocess.run(["ffmpeg","-version"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+import hashlib, re, warnings
+
+from services.video.templates import TemplateLibrary, fold, get_library
+
+BLOCK_GAP_S = 0.15   # silêncio entre blocos no concat do TTS (segments.synth_blocks gap_ms=150)
+_PUNCT = re.compile(r"[^\w\s]")
+
+def normalize_script(text: str) -> str:
+    """sem acento, minúsculas, sem pontuação, espaços únicos: "Toque no link!" == "toque no link"."""
+    return " ".join(_PUNCT.sub(" ", fold(text)).split())
+
+def script_key(text: str) -> str:
+    return hashlib.sha1(normalize_script(text).encode("utf-8")).hexdigest()[:12]
+
+def estimate_seconds(blocks: Sequence[Mapping[str, str]], pace_wpm: float) -> float:
+    words = sum(len(b["text"].split()) for b in blocks)
+    return words / max(pace_wpm, 1) * 60 + BLOCK_GAP_S * max(len(blocks) - 1, 0)
+
+@dataclass
+class Variant:
+    sku: str
+    template_id: str
+    cta_category: str
+    cta: str
+    var_index: int
+    blocks: List[Dict[str, str]]
+    est_seconds: float
+    score: float          # 1.0 = duração estimada no centro da janela, 0.0 = na borda
+    key: str
+    niche: str
+    visual_cues: List[str]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(b["text"] for b in self.blocks)
+
+@dataclass
+class VariantStats:
+    combinations: int = 0
+    yielded: int = 0
+    duplicates: int = 0
+    too_short: int = 0
+    too_long: int = 0
+    missing_vars: int = 0
+    blank_filled: int = 0  # strict=False: combinações renderizadas com variável vazia
+    missing: Dict[str, List[str]] = field(default_factory=dict)   # template_id -> variáveis faltando
+
+    def merge(self, other: "VariantStats"):
+        for k in ("combinations", "yielded", "duplicates", "too_short", "too_long", "missing_vars",
+                  "blank_filled"):
+            setattr(self, k, getattr(self, k) + getattr(other, k))
+        for tid, miss in other.missing.items():
+            self.missing.setdefault(tid, miss)
+
+def iter_variants(
+    sku: str,
+    product_name: str,
+    variable_sets: Iterable[Mapping[str, str]] = ({},),
+    template_ids: Sequence[str] | None = None,
+    cta_categories: Sequence[str] = ("conversion",),
+    ctas: Sequence[str] | None = None,
+    library: TemplateLibrary | None = None,
+    window: Tuple[float, float] | None | bool = False,
+    seen: set | None = None,
+    stats: VariantStats | None = None,
+    strict: bool = True
+) -> Iterator[Variant]:
+    """Template x CTA x conjunto de variáveis, gerado sob demanda (nada é renderizado aqui).
+
+    - `ctas` explícitos substituem `cta_categories` (categoria vira "custom").
+    - `window`: False (padrão) = sem filtro; None = `duration_target_sec` do template; (lo, hi) =
+      janela fixa. A duração é estimada por palavras / `tts_guide.pace_wpm` + pausas entre blocos.
+      Template em que nenhuma combinação cabe na janela gera um aviso (warnings) em vez de sumir calado.
+    - Roteiros quase iguais (mesmo texto normalizado) saem uma vez só; passe `seen` p/ deduplicar
+      entre chamadas.
+    - `strict`: conjunto sem alguma variável é pulado e contado em `stats.missing_vars`; com
+      strict=False a variável ausente vira texto vazio (contado em `stats.blank_filled`).
+    Em ambos os casos `stats.missing` guarda as variáveis faltando por template.
+    """
+    lib = library or get_library()
+    stats = stats if stats is not None else VariantStats()
+    seen = seen if seen is not None else set()
+    templates = [lib.get(t) for t in template_ids] if template_ids else list(lib.templates)
+    cta_list = [("custom", c) for c in ctas] if ctas else [(cat, c) for cat in cta_categories for c in lib.ctas(cat)]
+    var_sets = list(variable_sets)
+    for t in templates:
+        lo, hi = (0.0, float("inf")) if window is False else (window or t.duration_target_sec)
+        pace = float(t.tts_guide.get("pace_wpm", 165))
+        fits, outside = 0, []   # estimativas fora da janela deste template
+        for cat, cta in cta_list:
+            for i, vs in enumerate(var_sets):
+                stats.combinations += 1
+                values = {"PRODUTO": product_name, "NICHO": t.niche, **vs, "CTA_VARIACAO": cta}
+                miss = t.missing(values)
+                if miss:
+                    stats.missing.setdefault(t.id, sorted(miss))
+                    if strict:
+                        stats.missing_vars += 1
+                        continue
+                    stats.blank_filled += 1
+                blocks = t.render(values, strict=False)
+                est = estimate_seconds(blocks, pace)
+                if est < lo:
+                    stats.too_short += 1; outside.append(est); continue
+                if est > hi:
+                    stats.too_long += 1; outside.append(est); continue
+                fits += 1
+                key = script_key(" ".join(b["text"] for b in blocks))
+                if key in seen:
+                    stats.duplicates += 1; continue
+                seen.add(key)
+                stats.yielded += 1
+                score = 1.0 if hi == float("inf") else 1 - abs(est - (lo + hi) / 2) / max((hi - lo) / 2, 1e-9)
+                yield Variant(sku=sku, template_id=t.id, cta_category=cat, cta=cta, var_index=i,
+                              blocks=blocks, est_seconds=round(est, 1), score=round(score, 3),
+                              key=key, niche=t.niche,
+                              visual_cues=list(t.visual_cues))
+        if outside and not fits:
+            warnings.warn(f"{t.id}: nenhuma variante na janela {lo:g}–{hi:g}s "
+                          f"(fala estimada {min(outside):.1f}–{max(outside):.1f}s)")
@@ -1,18 +1,28 @@
-import os, requests
+"""Sobe vídeos p/ o TikTok (chunks + retomada) e publica como DRAFT.
+
+Uso: python upload_video.py video1.mp4 [video2.mp4 ...] [--workers 3] [--chunk-mb 10] [--no-publish]
+"""
+import argparse
 from dotenv import load_dotenv
 load_dotenv()
-ACCESS_TOKEN = os.getenv("TIKTOK_ACCESS_TOKEN")
-headers = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
 
-# 1) upload
-with open("video_teste.mp4", "rb") as f:
-    files = {"video": ("video_teste.mp4", f, "video/mp4")}
-    r = requests.post("https://open.tiktokapis.com/v2/video/upload/", headers=headers, files=files)
-    print("UPLOAD:", r.status_code, r.text)
-    video_id = r.json().get("data", {}).get("video_id")
+from services.tiktok.upload import UploadClient
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("files", nargs="*", default=["video_teste.mp4"])
+    ap.add_argument("--workers", type=int, default=3)
+    ap.add_argument("--chunk-mb", type=int, default=10)
+    ap.add_argument("--no-publish", action="store_true")
+    args = ap.parse_args()
 
-# 2) publicar como DRAFT
-payload = {"video_id": video_id, "post_mode": "DRAFT"}
-r2 = requests.post("https://open.tiktokapis.com/v2/video/publish/", headers=headers, json=payload)
-print("PUBLISH:", r2.status_code, r2.text)
+    client = UploadClient(chunk_size=args.chunk_mb * 1024 * 1024)
+    def show(r):
+        extra = f" (retomado do chunk {r.resumed_from})" if r.resumed_from else ""
+        print(f"{r.status.upper()}: {r.path} publish_id={r.publish_id} chunks={r.chunks}{extra} "
+              f"{r.seconds}s" + (f" erro={r.error}" if r.error else ""))
+    results = client.upload_many(args.files, workers=args.workers, publish=not args.no_publish, on_result=show)
+    raise SystemExit(0 if all(r.status != "error" for r in results) else 1)
 
+if __name__ == "__main__":
+    main()